@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks do InternReady (executar a partir da raiz: python -m benchmarks.<modulo>)"""
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Compara o corte antigo texto[:4000] com a compressão por seções
+
+Uso: python -m benchmarks.bench_compressao [--documentos N] [--max-tokens T]
+
+Gera currículos sintéticos com cabeçalho de contato repetido em cada
+página, resumo e habilidades longos antes da experiência e palavras
+hifenizadas na quebra de linha. Para cada documento informa os tokens
+enviados em cada variante, os tokens economizados e quantas linhas de
+experiência chegaram ao modelo.
+"""
+
+import argparse
+import json
+import random
+import time
+
+CONTATO = ("Ana Souza", "ana.souza@email.com | (11) 91234-5678 | São Paulo - SP", "linkedin.com/in/anasouza")
+FRASES = (
+    "Atuação em projetos de análise financeira com foco em resultados",
+    "Elaboração de relatórios gerenciais e apresentações para a diretoria",
+    "Interesse em mercado de capitais, valuation e finanças corporativas",
+    "Participação em processos seletivos e competições de case",
+)
+
+
+def _linhas_curriculo(rng, n_experiencias):
+    """Seções do currículo como lista de (texto, negrito)"""
+    linhas = [("RESUMO PROFISSIONAL", True)]
+    linhas += [(f"{rng.choice(FRASES)}    com   espaços   extras.", False) for _ in range(12)]
+    linhas += [("HABILIDADES", True)]
+    linhas += [(f"- Ferramenta {i}: Excel, Power BI, SQL, Python e Bloomberg em nível avançado", False)
+               for i in range(30)]
+    linhas += [("EXPERIÊNCIA PROFISSIONAL", True)]
+    for i in range(n_experiencias):
+        linhas += [
+            (f"Estagiário de Valuation {i} - Banco Exemplo (2023 - 2024)", False),
+            ("- Modelagem de fluxo de caixa descontado e múltiplos para transações de M&A, com análi-", False),
+            ("se de sensibilidade e apresentação ao comitê", False),
+        ]
+    linhas += [("FORMAÇÃO ACADÊMICA", True), ("Bacharelado em Economia - Universidade de São Paulo", False)]
+    return linhas
+
+
+def gerar_pdf(rng, n_experiencias=8):
+    """PDF em memória com títulos em negrito e contato repetido no topo de cada página"""
+    import fitz
+
+    doc = fitz.open()
+    pagina = None
+    y = 0
+    for texto, negrito in _linhas_curriculo(rng, n_experiencias):
+        if pagina is None or y > 780:
+            pagina = doc.new_page()
+            y = 50
+            for contato in CONTATO:
+                pagina.insert_text((50, y), contato, fontsize=9, fontname="helv")
+                y += 12
+            y += 8
+        pagina.insert_text((50, y), texto, fontsize=12 if negrito else 10, fontname="hebo" if negrito else "helv")
+        y += 16 if negrito else 13
+    dados = doc.tobytes()
+    doc.close()
+    return dados
+
+
+def medir(dados, max_tokens):
+    from internready.extracao import CARACTERES_POR_TOKEN, estimar_tokens, extrair_texto, extrair_texto_com_relatorio
+
+    limite = max_tokens * CARACTERES_POR_TOKEN
+    inicio = time.perf_counter()
+    antigo = extrair_texto(dados, max_caracteres=limite, max_tokens=0, comprimir=False)
+    t_antigo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    novo, relatorio = extrair_texto_com_relatorio(dados, max_caracteres=limite, max_tokens=0, comprimir=True)
+    t_novo = time.perf_counter() - inicio
+
+    return {
+        "tokens_antigo": estimar_tokens(antigo),
+        "tokens_comprimido": relatorio["tokens_enviados"],
+        "tokens_documento": relatorio["tokens_originais"],
+        "tokens_economizados": relatorio["tokens_economizados"],
+        "experiencias_antigo": antigo.count("Estagiário de Valuation"),
+        "experiencias_comprimido": novo.count("Estagiário de Valuation"),
+        "formacao_comprimido": "Bacharelado em Economia" in novo,
+        "hifenizacao_corrigida": "análise de sensibilidade" in novo,
+        "ms_antigo": round(t_antigo * 1000, 2),
+        "ms_comprimido": round(t_novo * 1000, 2),
+        "secoes_cortadas": relatorio["secoes_cortadas"],
+        "secoes_omitidas": relatorio["secoes_omitidas"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documentos", type=int, default=5)
+    parser.add_argument("--max-tokens", type=int, default=1000)
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semente)
+    resultados = []
+    for i in range(args.documentos):
+        dados = gerar_pdf(rng, n_experiencias=4 + 4 * i)
+        resultado = {"documento": i, **medir(dados, args.max_tokens)}
+        resultados.append(resultado)
+        print(json.dumps(resultado, ensure_ascii=False))
+
+    total_antigo = sum(r["tokens_antigo"] for r in resultados)
+    total_novo = sum(r["tokens_comprimido"] for r in resultados)
+    print(json.dumps({
+        "resumo": {
+            "tokens_antigo": total_antigo,
+            "tokens_comprimido": total_novo,
+            "reducao_vs_antigo_pct": round(100 * (1 - total_novo / total_antigo), 1) if total_antigo else 0.0,
+        }
+    }, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
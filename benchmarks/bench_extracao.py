@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""Compara a extração via arquivo temporário com a extração direto da memória
+
+Uso: python -m benchmarks.bench_extracao [--repeticoes N]
+
+Cada variante roda em um subprocesso próprio para que o pico de RSS
+(ru_maxrss) de uma não contamine a medição da outra.
+"""
+
+import argparse
+import io
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PAGINAS = (1, 10, 100)
+VARIANTES = ("arquivo_temporario", "memoria", "orcamento")
+
+TEXTO_PAGINA = (
+    "Experiência Profissional\n"
+    "Analista de Valuation - modelagem de fluxo de caixa descontado, múltiplos e M&A.\n"
+    "Formação Acadêmica\n"
+    "Bacharelado em Economia - participação em liga de mercado financeiro.\n"
+    "Habilidades\n"
+    "Excel avançado, Python, Power BI, Bloomberg, inglês fluente.\n"
+) * 6
+
+
+def gerar_pdf(caminho, paginas):
+    """Gera um currículo sintético com o número de páginas pedido"""
+    import fitz
+
+    doc = fitz.open()
+    for _ in range(paginas):
+        pagina = doc.new_page()
+        pagina.insert_textbox(fitz.Rect(50, 50, 550, 800), TEXTO_PAGINA, fontsize=10)
+    doc.save(caminho)
+    doc.close()
+
+
+def _pico_rss_kb():
+    # Linux reporta ru_maxrss em KB; macOS em bytes
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico // 1024 if sys.platform == "darwin" else pico
+
+
+def _extrair_arquivo_temporario(upload):
+    """Caminho antigo: copia o upload para disco e reabre pelo caminho"""
+    import fitz
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
+        temp_file.write(upload.getvalue())
+        pdf_path = temp_file.name
+    try:
+        doc = fitz.open(pdf_path)
+        texto = ""
+        for pagina in doc:
+            texto += pagina.get_text()
+        doc.close()
+        return texto
+    finally:
+        os.unlink(pdf_path)
+
+
+def _extrair_memoria(upload):
+    """Caminho novo: abre o PDF direto do buffer do upload (sem orçamento, para comparar igual)"""
+    from internready.extracao import extrair_texto
+
+    return extrair_texto(upload.getbuffer(), max_caracteres=0, max_tokens=0, max_paginas=max(PAGINAS))
+
+
+def _extrair_orcamento(upload):
+    """Caminho novo com o orçamento padrão: para de ler páginas ao preencher o prompt"""
+    from internready.extracao import extrair_texto
+
+    return extrair_texto(upload.getbuffer(), max_paginas=max(PAGINAS))
+
+
+def executar_filho(variante, caminho, repeticoes):
+    """Mede uma variante isolada (executado em subprocesso)"""
+    import fitz  # noqa: F401 - importado antes da medição de RSS base
+
+    with open(caminho, "rb") as f:
+        upload = io.BytesIO(f.read())  # mesmo tipo base do UploadedFile do Streamlit
+
+    funcao = {
+        "arquivo_temporario": _extrair_arquivo_temporario,
+        "memoria": _extrair_memoria,
+        "orcamento": _extrair_orcamento,
+    }[variante]
+    funcao(upload)  # aquecimento
+    rss_base = _pico_rss_kb()
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(upload)
+        tempos.append(time.perf_counter() - inicio)
+
+    return {
+        "mediana_ms": statistics.median(tempos) * 1000,
+        "pico_rss_kb": _pico_rss_kb(),
+        "delta_rss_kb": _pico_rss_kb() - rss_base,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--filho", nargs=2, metavar=("VARIANTE", "PDF"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.filho:
+        print(json.dumps(executar_filho(args.filho[0], args.filho[1], args.repeticoes)))
+        return
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        print(f"{'páginas':>8} {'variante':>20} {'mediana (ms)':>14} {'pico RSS (MB)':>14} {'Δ RSS (MB)':>11}")
+        for paginas in PAGINAS:
+            caminho = os.path.join(diretorio, f"cv_{paginas}.pdf")
+            gerar_pdf(caminho, paginas)
+            for variante in VARIANTES:
+                saida = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_extracao",
+                     "--repeticoes", str(args.repeticoes), "--filho", variante, caminho],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                r = json.loads(saida.strip().splitlines()[-1])
+                print(f"{paginas:>8} {variante:>20} {r['mediana_ms']:>14.2f} "
+                      f"{r['pico_rss_kb'] / 1024:>14.1f} {r['delta_rss_kb'] / 1024:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
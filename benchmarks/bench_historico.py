@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Mede gravação em lote e consultas no histórico de análises
+
+Uso: python -m benchmarks.bench_historico [--candidatos 5000] [--lote 500]
+
+Popula um banco temporário com candidatos sintéticos (competências e
+seções qualitativas) em transações de --lote registros e mede consultas
+típicas: competência acima de um corte, busca por hash e leitura completa
+de um candidato.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+AREAS = ("Valuation", "Modelagem Financeira", "Excel", "Mercado de Capitais", "Contabilidade", "Python",
+         "Comunicação", "Inglês", "M&A", "Análise de Crédito")
+
+
+def registro_sintetico(rng, i):
+    return {
+        "hash_documento": hashlib.sha256(str(i).encode()).hexdigest(),
+        "arquivo": f"cv_{i}.pdf",
+        "competencias": [{"Área": area, "Pontuação": round(rng.uniform(20, 100), 1)}
+                         for area in rng.sample(AREAS, rng.randint(4, len(AREAS)))],
+        "qualitativa": {"Pontos Fortes": [f"Ponto forte {j}" for j in range(3)],
+                        "Recomendações": [f"Recomendação {j}" for j in range(2)]},
+    }
+
+
+def _mediana_ms(funcao, repeticoes=20):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return round(statistics.median(tempos), 3)
+
+
+def main(argv=None):
+    from internready.historico import HistoricoAnalises
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidatos", type=int, default=5000)
+    parser.add_argument("--lote", type=int, default=500)
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.semente)
+    registros = [registro_sintetico(rng, i) for i in range(args.candidatos)]
+    with tempfile.TemporaryDirectory() as diretorio:
+        historico = HistoricoAnalises(os.path.join(diretorio, "historico.sqlite3"))
+        inicio = time.perf_counter()
+        for i in range(0, len(registros), args.lote):
+            historico.gravar_lote(registros[i:i + args.lote])
+        gravacao_s = time.perf_counter() - inicio
+
+        alvo = registros[args.candidatos // 2]["hash_documento"]
+        print(json.dumps({
+            "candidatos": args.candidatos,
+            "gravacao_s": round(gravacao_s, 3),
+            "registros_por_s": round(args.candidatos / gravacao_s),
+            "valuation_80_resultados": len(historico.buscar_por_competencia("Valuation", minimo=80)),
+            "valuation_80_ms": _mediana_ms(lambda: historico.buscar_por_competencia("Valuation", minimo=80)),
+            "top10_valuation_ms": _mediana_ms(lambda: historico.buscar_por_competencia("Valuation", limite=10)),
+            "por_hash_ms": _mediana_ms(lambda: historico.por_documento(alvo)),
+            "estatisticas": historico.estatisticas(),
+        }, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Mede o tempo de importação a frio do pacote e das bibliotecas pesadas
+
+Uso: python -m benchmarks.bench_importacao [--repeticoes N] [--relatorio inicializacao.json]
+
+Cada medição roda em um interpretador novo com -X importtime; o valor
+reportado é o tempo cumulativo do módulo de nível mais alto. Com
+--relatorio grava também um relatório de inicialização em JSON: tempos
+por módulo, bibliotecas pesadas carregadas pelo pacote, os módulos de
+maior tempo próprio segundo -X importtime e o custo do primeiro gráfico
+com o cache de fontes do Matplotlib vazio (como em um contêiner novo).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+MODULOS = ("internready", "internready.lote", "internready.graficos", "internready.aquecimento", "openai", "fitz",
+           "pandas", "matplotlib.figure", "matplotlib.pyplot", "streamlit")
+PESADOS = ("streamlit", "matplotlib", "openai", "pandas", "fitz", "pymupdf")
+
+
+def tempo_importacao_us(modulo):
+    """Tempo cumulativo de importação (µs) de um módulo em um processo novo"""
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        check=True, capture_output=True, text=True,
+    ).stderr
+    for linha in reversed(saida.splitlines()):
+        if linha.startswith("import time:") and linha.rsplit("|", 1)[-1].strip() == modulo:
+            return int(linha.split("|")[1])
+    raise RuntimeError(f"módulo {modulo} não encontrado na saída de -X importtime")
+
+
+def maiores_tempos_proprios(modulo, quantidade=15):
+    """Módulos com maior tempo próprio (µs) ao importar o módulo em um processo novo"""
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        check=True, capture_output=True, text=True,
+    ).stderr
+    linhas = []
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, cumulativo, nome = linha[len("import time:"):].split("|")
+        linhas.append({"modulo": nome.strip(), "proprio_us": int(proprio), "cumulativo_us": int(cumulativo)})
+    return sorted(linhas, key=lambda l: l["proprio_us"], reverse=True)[:quantidade]
+
+
+def primeiro_grafico_ms(cache_fontes_vazio=True):
+    """Importação do Matplotlib + primeiro PNG, opcionalmente com MPLCONFIGDIR vazio"""
+    codigo = (
+        "import time; inicio = time.perf_counter(); "
+        "from internready import graficos; graficos.aquecer(); "
+        "print((time.perf_counter() - inicio) * 1000)"
+    )
+    with tempfile.TemporaryDirectory() as diretorio:
+        env = dict(os.environ, MPLCONFIGDIR=diretorio) if cache_fontes_vazio else None
+        saida = subprocess.run([sys.executable, "-c", codigo], check=True, capture_output=True, text=True,
+                               env=env).stdout
+    return float(saida.strip())
+
+
+def modulos_pesados_carregados(modulo):
+    """Bibliotecas pesadas presentes em sys.modules após importar o módulo"""
+    codigo = f"import sys, {modulo}; print(','.join(m for m in {PESADOS!r} if m in sys.modules))"
+    saida = subprocess.run([sys.executable, "-c", codigo], check=True, capture_output=True, text=True).stdout
+    return [m for m in saida.strip().split(",") if m]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--relatorio", help="grava o relatório de inicialização (JSON) neste arquivo")
+    args = parser.parse_args(argv)
+
+    relatorio = {"python": sys.version.split()[0], "modulos": {}}
+    print(f"{'módulo':>24} {'mediana (ms)':>14}  pesados carregados")
+    for modulo in MODULOS:
+        try:
+            tempos = [tempo_importacao_us(modulo) for _ in range(args.repeticoes)]
+        except subprocess.CalledProcessError:
+            print(f"{modulo:>24} {'n/d':>14}  (não instalado)")
+            relatorio["modulos"][modulo] = None
+            continue
+        pesados = modulos_pesados_carregados(modulo) if modulo.startswith("internready") else []
+        mediana_ms = statistics.median(tempos) / 1000
+        print(f"{modulo:>24} {mediana_ms:>14.1f}  {', '.join(pesados) or '-'}")
+        relatorio["modulos"][modulo] = {"mediana_ms": round(mediana_ms, 2), "pesados_carregados": pesados}
+
+    if not args.relatorio:
+        return
+
+    for modulo in ("openai", "fitz", "matplotlib.figure"):
+        try:
+            relatorio.setdefault("maiores_tempos_proprios", {})[modulo] = maiores_tempos_proprios(modulo)
+        except subprocess.CalledProcessError:
+            pass
+    try:
+        relatorio["primeiro_grafico_ms"] = {
+            "cache_fontes_vazio": round(primeiro_grafico_ms(cache_fontes_vazio=True), 1),
+            "cache_fontes_pronto": round(primeiro_grafico_ms(cache_fontes_vazio=False), 1),
+        }
+    except subprocess.CalledProcessError:
+        relatorio["primeiro_grafico_ms"] = None
+
+    with open(args.relatorio, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"Relatório de inicialização gravado em {args.relatorio}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Compara separar_resposta e o parser em trechos com a extração antiga por regex
+
+Uso: python -m benchmarks.bench_parser [--repeticoes N]
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import time
+
+from benchmarks.respostas import gerar_resposta
+from internready.parser_incremental import ParserIncremental, separar_resposta
+
+
+def extrair_regex(texto):
+    """Implementação anterior (regex + split), mantida só para comparação"""
+    dados = None
+    try:
+        match = re.search(r"\[(.*?)\]", texto, re.DOTALL)
+        if match:
+            dados = json.loads("[" + match.group(1) + "]")
+    except (json.JSONDecodeError, AttributeError):
+        pass
+    if dados is None:
+        dados = []
+        for obj in re.findall(r'\{[^{}]*\}', texto):
+            try:
+                dados.append(json.loads(obj))
+            except json.JSONDecodeError:
+                continue
+        dados = dados or None
+    partes = texto.split("]")
+    return dados, (partes[-1].strip() if len(partes) > 1 else None)
+
+
+def _em_trechos(texto, tamanho=16):
+    parser = ParserIncremental()
+    for i in range(0, len(texto), tamanho):
+        parser.alimentar(texto[i:i + tamanho])
+    return parser.competencias(), parser.texto_qualitativo()
+
+
+def medir(funcao, texto, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(texto)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    casos = {
+        "típica": gerar_resposta(8, 4)[0],
+        "grande": gerar_resposta(600, 60, rng=random.Random(1))[0],
+        "enorme": gerar_resposta(6000, 600, rng=random.Random(2))[0],
+        "grande sem array": gerar_resposta(600, 60, rng=random.Random(3))[0].replace("[\n", "\n", 1),
+    }
+    print(f"{'resposta':>22} {'KB':>7} {'regex (ms)':>11} {'inteira (ms)':>15} {'trechos de 16 (ms)':>19}")
+    for nome, texto in casos.items():
+        print(f"{nome:>22} {len(texto) / 1024:>7.1f} "
+              f"{medir(extrair_regex, texto, args.repeticoes):>11.3f} "
+              f"{medir(separar_resposta, texto, args.repeticoes):>15.3f} "
+              f"{medir(_em_trechos, texto, max(1, args.repeticoes // 4)):>19.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Mede o motor de percentis com um histórico sintético grande
+
+Uso: python -m benchmarks.bench_percentis [--candidatos 100000] [--incrementos 100]
+
+Carrega --candidatos análises sintéticas no MotorPercentis e mede a
+consulta de todas as competências de um candidato (com o array já
+consolidado), a primeira consulta depois de --incrementos novos
+candidatos (intercalação incluída) e a conferência contra o cálculo
+direto por ordenação.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from benchmarks.bench_historico import registro_sintetico
+
+
+def _mediana_us(funcao, repeticoes=200):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1e6)
+    return round(statistics.median(tempos), 2)
+
+
+def percentil_direto(pontuacoes, valor):
+    abaixo = sum(p < valor for p in pontuacoes)
+    iguais = sum(p == valor for p in pontuacoes)
+    return (abaixo + 0.5 * iguais) / len(pontuacoes) * 100
+
+
+def main(argv=None):
+    from internready.percentis import ESCALA, MotorPercentis, normalizar_area
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidatos", type=int, default=100000)
+    parser.add_argument("--incrementos", type=int, default=100)
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.semente)
+    competencias = [registro_sintetico(rng, i)["competencias"] for i in range(args.candidatos)]
+
+    motor = MotorPercentis(min_amostras=1)
+    inicio = time.perf_counter()
+    for candidato in competencias:
+        motor.registrar_candidato(candidato)
+    motor.amostras("Valuation")  # força a consolidação
+    carga_s = time.perf_counter() - inicio
+
+    alvo = registro_sintetico(rng, args.candidatos)["competencias"]
+    areas = [c["Área"] for c in alvo]
+    pontuacoes = [c["Pontuação"] for c in alvo]
+    consulta_us = _mediana_us(lambda: motor.percentis(areas, pontuacoes))
+
+    def incremento():
+        for _ in range(args.incrementos):
+            motor.registrar_candidato(registro_sintetico(rng, 0)["competencias"])
+        inicio = time.perf_counter()
+        motor.percentis(areas, pontuacoes)
+        return (time.perf_counter() - inicio) * 1e6
+
+    incremento_us = round(statistics.median([incremento() for _ in range(20)]), 2)
+
+    # Conferência com o cálculo direto (inclui os candidatos dos incrementos)
+    area = areas[0]
+    indice = motor._indices[normalizar_area(area)]
+    faixa = [chave for chave in motor._chaves.tolist() if indice * ESCALA <= chave < (indice + 1) * ESCALA]
+    esperado = percentil_direto(faixa, indice * ESCALA + pontuacoes[0])
+
+    print(json.dumps({
+        "candidatos": args.candidatos,
+        "pontuacoes": int(motor._chaves.size),
+        "carga_s": round(carga_s, 3),
+        "competencias_consultadas": len(areas),
+        "consulta_us": consulta_us,
+        "consulta_apos_incremento_us": incremento_us,
+        "percentil_media": round(motor.percentil_media(sum(pontuacoes) / len(pontuacoes)), 2),
+        "confere_calculo_direto": abs(float(motor.percentis([area], [pontuacoes[0]])[0]) - esperado) < 1e-9,
+    }, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""Compara a leitura atual da parte qualitativa com a implementação anterior
+
+Uso: python -m benchmarks.bench_qualitativa [--repeticoes N]
+
+Mede respostas típicas e de ~100 KB nos três formatos de seção gerados
+por benchmarks.respostas, além de uma resposta grande sem nenhum cabeçalho
+(caminho por linhas) e uma com muitos cabeçalhos repetidos.
+"""
+
+import argparse
+import random
+import re
+import statistics
+import time
+
+from benchmarks.respostas import gerar_resposta
+from internready.analise import SECOES_CONFIG, separar_texto_qualitativo
+from internready.parser_qualitativo import analisar_qualitativa
+
+
+def processar_legado(texto_analise):
+    """Implementação anterior (quatro re.search + laço por linhas), mantida só para comparação"""
+    if not texto_analise:
+        return None
+
+    secoes_config = SECOES_CONFIG
+
+    # Separar o texto em seções
+    secoes = {}
+
+    # Padrões mais flexíveis para identificar seções
+    patterns_gerais = [
+        r"\*\*Pontos Fortes:\*\*(.*?)(?=\*\*Pontos de Melhoria:\*\*|\*\*Sugestões:\*\*|$)",
+        r"\*\*Pontos de Melhoria:\*\*(.*?)(?=\*\*Sugestões:\*\*|\*\*Recomendações:\*\*|$)",
+        r"\*\*Sugestões:\*\*(.*?)(?=\*\*Recomendações:\*\*|$)",
+        r"\*\*Recomendações:\*\*(.*?)$"
+    ]
+
+    # Aplicar padrões
+    match_pontos_fortes = re.search(patterns_gerais[0], texto_analise, re.IGNORECASE | re.DOTALL)
+    match_pontos_melhoria = re.search(patterns_gerais[1], texto_analise, re.IGNORECASE | re.DOTALL)
+    match_sugestoes = re.search(patterns_gerais[2], texto_analise, re.IGNORECASE | re.DOTALL)
+    match_recomendacoes = re.search(patterns_gerais[3], texto_analise, re.IGNORECASE | re.DOTALL)
+
+    if match_pontos_fortes:
+        secoes["pontos fortes"] = {
+            "conteudo": match_pontos_fortes.group(1).strip(),
+            "config": secoes_config["pontos fortes"]
+        }
+
+    if match_pontos_melhoria:
+        secoes["pontos de melhoria"] = {
+            "conteudo": match_pontos_melhoria.group(1).strip(),
+            "config": secoes_config["pontos de melhoria"]
+        }
+
+    if match_sugestoes:
+        secoes["sugestões"] = {
+            "conteudo": match_sugestoes.group(1).strip(),
+            "config": secoes_config["sugestões"]
+        }
+
+    if match_recomendacoes:
+        secoes["recomendações"] = {
+            "conteudo": match_recomendacoes.group(1).strip(),
+            "config": secoes_config["recomendações"]
+        }
+
+    # Se não encontrou seções, tenta uma abordagem mais simples baseada em linhas
+    if not secoes:
+        linhas = texto_analise.split('\n')
+        secao_atual = None
+        conteudo_atual = []
+
+        for linha in linhas:
+            linha = linha.strip()
+            if not linha:
+                continue
+
+            # Identificar início de seção
+            if "pontos fortes" in linha.lower() and "**" in linha:
+                if secao_atual and conteudo_atual:
+                    secoes[secao_atual] = {
+                        "conteudo": '\n'.join(conteudo_atual),
+                        "config": secoes_config[secao_atual]
+                    }
+                secao_atual = "pontos fortes"
+                conteudo_atual = []
+            elif "pontos de melhoria" in linha.lower() and "**" in linha:
+                if secao_atual and conteudo_atual:
+                    secoes[secao_atual] = {
+                        "conteudo": '\n'.join(conteudo_atual),
+                        "config": secoes_config[secao_atual]
+                    }
+                secao_atual = "pontos de melhoria"
+                conteudo_atual = []
+            elif "sugestões" in linha.lower() and "**" in linha:
+                if secao_atual and conteudo_atual:
+                    secoes[secao_atual] = {
+                        "conteudo": '\n'.join(conteudo_atual),
+                        "config": secoes_config[secao_atual]
+                    }
+                secao_atual = "sugestões"
+                conteudo_atual = []
+            elif secao_atual:
+                conteudo_atual.append(linha)
+
+        # Adicionar última seção
+        if secao_atual and conteudo_atual:
+            secoes[secao_atual] = {
+                "conteudo": '\n'.join(conteudo_atual),
+                "config": secoes_config[secao_atual]
+            }
+
+    return secoes if secoes else None
+
+
+def dividir_pontos_legado(conteudo):
+    """Implementação anterior (replace encadeado + split), mantida só para comparação"""
+    pontos = []
+    if "•" in conteudo or "-" in conteudo or "\n" in conteudo:
+        # Tentar separar por marcadores
+        linhas = conteudo.replace("•", "\n-").replace("- ", "\n- ").split('\n')
+        for linha in linhas:
+            linha = linha.strip()
+            if linha and not linha.startswith('-'):
+                if pontos:  # Se já tem pontos, adiciona à lista atual
+                    pontos[-1] += " " + linha
+                else:
+                    pontos.append(linha)
+            elif linha.startswith('- '):
+                pontos.append(linha[2:].strip())
+    else:
+        pontos = [conteudo]
+    return pontos
+
+
+def analisar_legado(texto):
+    """{seção: [pontos]} pelo caminho anterior"""
+    secoes = processar_legado(texto) or {}
+    return {secao: dividir_pontos_legado(dados["conteudo"]) for secao, dados in secoes.items()}
+
+
+def _qualitativo_de(n_pontos, semente, formato):
+    return separar_texto_qualitativo(gerar_resposta(8, n_pontos, rng=random.Random(semente), formato=formato)[0])
+
+
+def medir(funcao, texto, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(texto)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    casos = {f"típica (formato {f})": _qualitativo_de(4, f, f) for f in range(3)}
+    # ~600 pontos por seção dão ~100 KB de texto qualitativo
+    casos.update({f"100 KB (formato {f})": _qualitativo_de(600, 10 + f, f) for f in range(3)})
+    casos["100 KB sem cabeçalhos"] = "\n".join(f"- ponto {i} com algum texto de preenchimento" for i in range(2500))
+    casos["cabeçalhos repetidos"] = "**Pontos Fortes:** a\n" * 3000 + "**Recomendações:** fim"
+
+    print(f"{'resposta':>24} {'KB':>7} {'anterior (ms)':>14} {'atual (ms)':>15} {'iguais':>7}")
+    for nome, texto in casos.items():
+        print(f"{nome:>24} {len(texto.encode('utf-8')) / 1024:>7.1f} "
+              f"{medir(analisar_legado, texto, args.repeticoes):>14.3f} "
+              f"{medir(analisar_qualitativa, texto, args.repeticoes):>15.3f} "
+              f"{str(analisar_legado(texto) == analisar_qualitativa(texto)):>7}")
+
+
+if __name__ == "__main__":
+    main()
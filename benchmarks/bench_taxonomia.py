@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Mede a conversão de rótulos de área em nomes canônicos
+
+Uso: python -m benchmarks.bench_taxonomia [--rotulos 20000] [--distintos 2000]
+
+Gera rótulos no estilo das respostas do modelo (variantes da taxonomia
+com caixa, acentos, complementos entre parênteses e prefixos trocados,
+além de rótulos fora da taxonomia) e mede rótulos por segundo sem
+memória, com memória e a fração reconhecida.
+"""
+
+import argparse
+import json
+import random
+import time
+
+COMPLEMENTOS = ("(Excel)", "(avançado)", "(Python/SQL)", "[básico]", "(CFA Level I)")
+PREFIXOS = ("Conhecimento em ", "Noções de ", "Habilidades em ", "")
+FORA_DA_TAXONOMIA = ("Culinária", "Fotografia", "Pacote Office", "Marketing Digital", "Design Gráfico",
+                     "Logística", "Recursos Humanos", "Direito Civil")
+
+
+def rotulos_sinteticos(rng, quantidade):
+    """Rótulos variados: variantes da taxonomia reescritas e alguns fora dela"""
+    from internready.taxonomia import TAXONOMIA
+
+    variantes = [v for canonica, outras in TAXONOMIA.items() for v in (canonica, *outras)]
+    rotulos = []
+    for _ in range(quantidade):
+        if rng.random() < 0.1:
+            rotulos.append(rng.choice(FORA_DA_TAXONOMIA))
+            continue
+        rotulo = rng.choice(PREFIXOS) + rng.choice(variantes)
+        rotulo = rng.choice((str.title, str.lower, str.upper, str.strip))(rotulo)
+        if rng.random() < 0.3:
+            rotulo += " " + rng.choice(COMPLEMENTOS)
+        rotulos.append(rotulo)
+    return rotulos
+
+
+def main(argv=None):
+    from internready.taxonomia import IndiceTaxonomia
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rotulos", type=int, default=20000)
+    parser.add_argument("--distintos", type=int, default=2000)
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.semente)
+    distintos = rotulos_sinteticos(rng, args.distintos)
+    rotulos = [rng.choice(distintos) for _ in range(args.rotulos)]
+
+    indice = IndiceTaxonomia(max_memoria=0)
+    inicio = time.perf_counter()
+    resultados = [indice.canonizar(r) for r in rotulos]
+    sem_memoria_s = time.perf_counter() - inicio
+
+    indice = IndiceTaxonomia()
+    inicio = time.perf_counter()
+    for rotulo in rotulos:
+        indice.canonizar(rotulo)
+    com_memoria_s = time.perf_counter() - inicio
+
+    print(json.dumps({
+        "rotulos": args.rotulos,
+        "distintos": len(set(distintos)),
+        "rotulos_por_s_sem_memoria": round(args.rotulos / sem_memoria_s),
+        "rotulos_por_s_com_memoria": round(args.rotulos / com_memoria_s),
+        "reconhecidos": round(sum(r["canonica"] is not None for r in resultados) / len(resultados), 3),
+        "canonicas_distintas": len({r["canonica"] for r in resultados if r["canonica"]}),
+        "estatisticas": indice.estatisticas(),
+    }, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
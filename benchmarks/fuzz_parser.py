@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Fuzz do parser de uma passada: invariantes em respostas aleatórias e malformadas
+
+Uso: python -m benchmarks.fuzz_parser [--casos N] [--semente S]
+
+Invariantes verificadas:
+- nunca lança exceção, para qualquer texto;
+- ler em trechos aleatórios dá o mesmo resultado que ler tudo de uma vez;
+- em respostas bem formadas recupera exatamente as competências e o texto qualitativo,
+  inclusive com ``]``, ``}``, aspas e barras dentro dos nomes das áreas;
+- em respostas truncadas devolve um prefixo das competências completas;
+- onde a regex antiga funcionava (sem ``]`` nas strings), as competências são as mesmas.
+"""
+
+import argparse
+import random
+import sys
+
+from benchmarks.bench_parser import extrair_regex
+from benchmarks.respostas import gerar_resposta, malformar
+from internready.parser_incremental import ParserIncremental, separar_resposta
+
+ALFABETO = '[]{}",:\\ \n\tabcÁé0123456789-*•'
+
+
+def _em_trechos(texto, rng):
+    parser = ParserIncremental()
+    i = 0
+    while i < len(texto):
+        n = rng.randint(1, 12)
+        parser.alimentar(texto[i:i + n])
+        i += n
+    return parser.competencias() or None, parser.texto_qualitativo()
+
+
+def verificar(casos, semente):
+    rng = random.Random(semente)
+    for caso in range(casos):
+        tipo = caso % 4
+        if tipo == 0:
+            texto = "".join(rng.choice(ALFABETO) for _ in range(rng.randrange(200)))
+            esperado = None
+        else:
+            texto, competencias, qualitativo = gerar_resposta(
+                rng.randint(0, 12), rng.randint(1, 5), rng=rng,
+                areas_dificeis=tipo == 2, formato=rng.randrange(3),
+            )
+            esperado = (competencias or None, qualitativo) if tipo in (1, 2) else None
+            if tipo == 3:
+                texto = malformar(texto, rng)
+
+        inteiro = separar_resposta(texto)
+        trechos = _em_trechos(texto, rng)
+        assert inteiro == trechos, (caso, texto)
+
+        if esperado is not None:
+            assert inteiro == esperado, (caso, texto, inteiro)
+            if tipo == 1:
+                assert (extrair_regex(texto)[0] or None) == inteiro[0], (caso, texto)
+            # Truncar em qualquer ponto deve devolver um prefixo das competências
+            corte = texto[:rng.randrange(len(texto) + 1)]
+            parcial = ParserIncremental()
+            parcial.alimentar(corte)
+            assert parcial.objetos == (esperado[0] or [])[:len(parcial.objetos)], (caso, corte)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--casos", type=int, default=20000)
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args(argv)
+    verificar(args.casos, args.semente)
+    print(f"{args.casos} casos OK (semente {args.semente})")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
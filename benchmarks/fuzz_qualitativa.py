@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Fuzz da leitura da parte qualitativa: mesmo resultado da implementação anterior
+
+Uso: python -m benchmarks.fuzz_qualitativa [--casos N] [--semente S]
+
+Propriedades verificadas, comparando com benchmarks.bench_qualitativa:
+- nos três formatos de seção gerados por benchmarks.respostas (e nas
+  respostas do stub local), as seções e os pontos são idênticos;
+- idem para respostas malformadas e para textos aleatórios montados com
+  cabeçalhos, marcadores, quebras de linha e espaços em qualquer ordem;
+- dividir_pontos é idêntico para qualquer texto.
+"""
+
+import argparse
+import random
+import sys
+
+from benchmarks.bench_qualitativa import analisar_legado, dividir_pontos_legado, processar_legado
+from benchmarks.respostas import gerar_resposta, malformar
+from internready.analise import processar_analise_qualitativa, separar_texto_qualitativo
+from internready.parser_qualitativo import analisar_qualitativa, dividir_pontos
+from internready.stub_openai import formatar_texto_livre, gerar_analise
+
+PEDACOS = (
+    "**Pontos Fortes:**", "**Pontos de Melhoria:**", "**Sugestões:**", "**Recomendações:**",
+    "**PONTOS FORTES:**", "**sugestões:**", "### **Pontos Fortes**", "- **Pontos de Melhoria**",
+    "**Sugestões**", "Pontos fortes", "**", "*", "- ", "-", " - ", "•", "• ", "\n", "\n\n", "  ", "\t",
+    "ponto", "texto com - hífen", "1. item", "-5%", " ", "\r\n",
+)
+
+
+def _texto_aleatorio(rng):
+    return "".join(rng.choice(PEDACOS) for _ in range(rng.randrange(40)))
+
+
+def verificar(casos, semente):
+    rng = random.Random(semente)
+    for caso in range(casos):
+        tipo = caso % 4
+        if tipo == 0:
+            texto = _texto_aleatorio(rng)
+        elif tipo == 3:
+            texto = formatar_texto_livre(gerar_analise(_texto_aleatorio(rng)))
+            texto = separar_texto_qualitativo(texto)
+        else:
+            resposta = gerar_resposta(rng.randint(0, 8), rng.randint(1, 6), rng=rng, formato=rng.randrange(3))[0]
+            if tipo == 2:
+                resposta = malformar(resposta, rng)
+            texto = separar_texto_qualitativo(resposta)
+
+        assert processar_analise_qualitativa(texto) == processar_legado(texto), (caso, texto)
+        assert analisar_qualitativa(texto) == analisar_legado(texto), (caso, texto)
+        if texto:
+            assert dividir_pontos(texto) == dividir_pontos_legado(texto), (caso, texto)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--casos", type=int, default=20000)
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args(argv)
+    verificar(args.casos, args.semente)
+    print(f"{args.casos} casos OK (semente {args.semente})")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Gerador de respostas sintéticas do modelo (bem formadas, grandes e malformadas)"""
+
+import json
+import random
+
+AREAS = [
+    "Valuation", "Modelagem Financeira", "Excel Avançado", "Python", "Contabilidade",
+    "Mercado de Capitais", "M&A", "Comunicação", "Inglês", "Power BI", "Análise de Crédito",
+]
+PONTOS = [
+    "Sólida formação em economia com ênfase em finanças corporativas",
+    "Experiência prática com modelagem de fluxo de caixa descontado",
+    "Participação ativa em liga de mercado financeiro",
+    "Desenvolver certificações como CPA-20 ou CFA Level I",
+    "Aprofundar conhecimentos em M&A e reestruturação",
+]
+
+
+def gerar_resposta(n_competencias=6, n_pontos=4, rng=None, areas_dificeis=False, formato=0):
+    """Resposta no formato pedido pelo prompt; devolve (texto, competencias, texto_qualitativo)"""
+    rng = rng or random.Random(0)
+    competencias = []
+    for _ in range(n_competencias):
+        area = rng.choice(AREAS)
+        if areas_dificeis:
+            area += rng.choice([" [Excel]", " {VBA}", ' "Sênior"', " \\ backslash", " ]}", ""])
+        competencias.append({"Área": area, "Pontuação": rng.randint(0, 100)})
+
+    linhas_json = ",\n".join("  " + json.dumps(c, ensure_ascii=rng.random() < 0.5) for c in competencias)
+    secoes = []
+    for titulo in ("Pontos Fortes", "Pontos de Melhoria", "Sugestões"):
+        pontos = [rng.choice(PONTOS) for _ in range(n_pontos)]
+        if formato == 0:
+            secoes.append(f"- **{titulo}:**\n" + "\n".join(f"  - {p}" for p in pontos))
+        elif formato == 1:
+            secoes.append(f"**{titulo}:**\n" + "\n".join(f"• {p}" for p in pontos))
+        else:
+            secoes.append(f"### **{titulo}**\n" + "\n".join(f"{i}. {p}" for i, p in enumerate(pontos, 1)))
+    qualitativo = "**Parte 2 – Análise Qualitativa**\n\n" + "\n\n".join(secoes)
+    texto = (
+        "**Parte 1 – Análise Quantitativa (JSON)**\n\n```json\n[\n" + linhas_json + "\n]\n```\n\n" + qualitativo
+    )
+    return texto, competencias, qualitativo
+
+
+def malformar(texto, rng):
+    """Aplica uma corrupção aleatória típica de respostas reais"""
+    escolha = rng.randrange(5)
+    if escolha == 0:  # truncada (max_tokens atingido)
+        return texto[:rng.randrange(len(texto) + 1)]
+    if escolha == 1:  # caractere removido
+        i = rng.randrange(len(texto))
+        return texto[:i] + texto[i + 1:]
+    if escolha == 2:  # vírgula sobrando
+        return texto.replace("}\n]", "},\n]", 1)
+    if escolha == 3:  # sem o array, só objetos soltos
+        return texto.replace("[\n", "\n", 1).replace("\n]", "\n", 1)
+    return texto.replace('"Pontuação": ', '"Pontuação": "', 1)  # aspas sem fechar
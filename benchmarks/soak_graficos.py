@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Teste de resistência dos gráficos: RSS ao longo de muitas análises
+
+Uso: python -m benchmarks.soak_graficos [--analises 1000] [--amostras 10] [--legado]
+
+Cada análise desenha os três gráficos da tela de resultado (barras, radar
+e níveis) e os converte em PNG. Por padrão usa internready.graficos; com
+--legado repete o caminho antigo via pyplot, sem fechar as figuras, para
+comparação. Imprime uma linha JSON por amostra de RSS e um resumo.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+import warnings
+
+
+def _rss_kb():
+    # RSS atual (não o pico), para enxergar crescimento e liberação de memória
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico // 1024 if sys.platform == "darwin" else pico
+
+
+def _dados(rng):
+    import pandas as pd
+
+    from internready.analise import NIVEIS_BINS, NIVEIS_LABELS
+
+    n = rng.randint(3, 10)
+    df = pd.DataFrame({
+        "Área": [f"Competência {i}" for i in range(n)],
+        "Pontuação": [rng.uniform(30, 100) for _ in range(n)],
+    }).sort_values(by="Pontuação", ascending=False)
+    niveis = pd.cut(df["Pontuação"], bins=NIVEIS_BINS, labels=NIVEIS_LABELS).value_counts()
+    return df, niveis
+
+
+def _analise_graficos(df, niveis):
+    from internready import graficos
+
+    return len(graficos.png_barras(df)) + len(graficos.png_radar(df.head(8)) or b"") + len(graficos.png_niveis(niveis))
+
+
+def _analise_legado(df, niveis):
+    """Caminho anterior: plt.subplots sem plt.close, como no app original"""
+    import io
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    from internready.graficos import desenhar_niveis, desenhar_radar, desenhar_barras
+
+    total = 0
+    for figsize, desenhar, dados in (((10, 6), desenhar_barras, df), ((8, 8), desenhar_radar, df.head(8)),
+                                     ((8, 6), desenhar_niveis, niveis)):
+        fig = plt.figure(figsize=figsize)
+        desenhar(fig, dados)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=200, bbox_inches="tight")
+        total += len(buffer.getvalue())
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--analises", type=int, default=1000)
+    parser.add_argument("--amostras", type=int, default=10, help="número de medições de RSS ao longo do teste")
+    parser.add_argument("--legado", action="store_true", help="usa pyplot sem fechar figuras")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    # Emojis nos títulos não existem na fonte padrão; o aviso se repetiria a cada figura
+    warnings.filterwarnings("ignore", message="Glyph .* missing from font")
+    warnings.filterwarnings("ignore", message=".*tight_layout.*")
+    rng = random.Random(args.semente)
+    analisar = _analise_legado if args.legado else _analise_graficos
+
+    # Aquecimento: caches de fontes e de texto do Matplotlib não contam como vazamento
+    for _ in range(20):
+        analisar(*_dados(rng))
+    base = _rss_kb()
+    intervalo = max(args.analises // args.amostras, 1)
+    inicio = time.perf_counter()
+    amostras = []
+    for i in range(1, args.analises + 1):
+        analisar(*_dados(rng))
+        if i % intervalo == 0 or i == args.analises:
+            rss = _rss_kb()
+            amostras.append(rss)
+            print(json.dumps({"analise": i, "rss_kb": rss, "delta_kb": rss - base}))
+
+    metade = amostras[len(amostras) // 2:]
+    print(json.dumps({
+        "resumo": {
+            "variante": "legado" if args.legado else "graficos",
+            "analises": args.analises,
+            "ms_por_analise": round((time.perf_counter() - inicio) * 1000 / args.analises, 2),
+            "rss_base_kb": base,
+            "rss_final_kb": amostras[-1],
+            "crescimento_kb": amostras[-1] - base,
+            "crescimento_segunda_metade_kb": metade[-1] - metade[0],
+            "pyplot_carregado": "matplotlib.pyplot" in sys.modules,
+        }
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""Suíte de benchmarks de todas as etapas do pipeline, com resultados em JSON
+
+Uso:
+    python -m benchmarks.suite [--saida resultados.json] [--repeticoes N] [--etapas extracao,parser,...]
+    python -m benchmarks.suite --comparar base.json [--limiar 1.2]
+
+Gera currículos sintéticos em PDF de vários tamanhos (PyMuPDF) e respostas
+do modelo de vários comprimentos e malformações (benchmarks.respostas), e
+mede cada etapa separadamente: extração, leitura do JSON, parte
+qualitativa, parser incremental, nomes canônicos das áreas, chamada ao
+stub local da API, montagem e estilo do DataFrame e renderização dos
+gráficos. Etapas cujas dependências
+não estão instaladas são registradas como indisponíveis.
+
+Com --comparar, a execução atual é comparada à base (de outro commit) e o
+código de saída é 1 se alguma medição ficar mais lenta que --limiar vezes.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+from benchmarks.respostas import gerar_resposta, malformar
+
+TAMANHOS_PDF = {"1_pagina": 2, "5_paginas": 40, "20_paginas": 170}  # experiências por currículo
+TAMANHOS_RESPOSTA = {"curta": (6, 3), "media": (15, 6), "longa": (60, 20)}  # (competências, pontos)
+
+
+def _medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return {
+        "mediana_ms": round(statistics.median(tempos), 4),
+        "p95_ms": round(tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))], 4),
+        "repeticoes": repeticoes,
+    }
+
+
+def _respostas(rng):
+    """Respostas sintéticas por tamanho, bem formadas e malformadas"""
+    casos = {}
+    for nome, (n_competencias, n_pontos) in TAMANHOS_RESPOSTA.items():
+        texto, _, _ = gerar_resposta(n_competencias, n_pontos, rng=rng, formato=rng.randrange(3))
+        casos[nome] = texto
+        casos[f"{nome}_malformada"] = malformar(texto, rng)
+    return casos
+
+
+def etapa_extracao(rng, repeticoes):
+    from benchmarks.bench_compressao import gerar_pdf
+    from internready.extracao import extrair_texto_com_relatorio
+
+    resultados = {}
+    for nome, experiencias in TAMANHOS_PDF.items():
+        dados = gerar_pdf(rng, experiencias)
+        resultados[nome] = _medir(lambda: extrair_texto_com_relatorio(dados), repeticoes)
+        resultados[f"{nome}_sem_compressao"] = _medir(
+            lambda: extrair_texto_com_relatorio(dados, comprimir=False), repeticoes
+        )
+    return resultados
+
+
+def etapa_parser(rng, repeticoes):
+    from internready.analise import extrair_json_robusto
+
+    return {nome: _medir(lambda: extrair_json_robusto(texto), repeticoes * 10)
+            for nome, texto in _respostas(rng).items()}
+
+
+def etapa_qualitativa(rng, repeticoes):
+    from internready.analise import processar_analise_qualitativa, separar_texto_qualitativo
+
+    return {nome: _medir(lambda: processar_analise_qualitativa(separar_texto_qualitativo(texto)), repeticoes * 10)
+            for nome, texto in _respostas(rng).items()}
+
+
+def etapa_parser_incremental(rng, repeticoes):
+    from internready.parser_incremental import ParserIncremental
+
+    def alimentar(trechos):
+        parser = ParserIncremental()
+        for trecho in trechos:
+            parser.alimentar(trecho)
+
+    resultados = {}
+    for nome, texto in _respostas(rng).items():
+        trechos = [texto[i:i + 16] for i in range(0, len(texto), 16)]
+        resultados[nome] = _medir(lambda: alimentar(trechos), repeticoes * 5)
+    return resultados
+
+
+def etapa_stub(rng, repeticoes):
+    from openai import OpenAI
+
+    from internready.pipeline import analyze, analyze_stream
+    from internready.stub_openai import iniciar_stub
+
+    texto = "Experiência com valuation, modelagem, Excel e Python. Inglês fluente. " * 40
+    servidor = iniciar_stub()
+    try:
+        client = OpenAI(api_key="stub", base_url=servidor.url_base)
+        return {
+            "analyze": _medir(lambda: analyze(texto, client=client), repeticoes),
+            "analyze_stream": _medir(lambda: analyze_stream(texto, client=client), repeticoes),
+            "analyze_estruturado": _medir(lambda: analyze(texto, client=client, estruturado=True), repeticoes),
+        }
+    finally:
+        servidor.shutdown()
+
+
+def etapa_taxonomia(rng, repeticoes):
+    from benchmarks.bench_taxonomia import rotulos_sinteticos
+    from internready.taxonomia import IndiceTaxonomia
+
+    rotulos = rotulos_sinteticos(rng, 1000)
+
+    def canonizar_todos(indice):
+        for rotulo in rotulos:
+            indice.canonizar(rotulo)
+
+    memorizado = IndiceTaxonomia()
+    canonizar_todos(memorizado)
+    return {
+        "1000_rotulos_frio": _medir(lambda: canonizar_todos(IndiceTaxonomia()), repeticoes),
+        "1000_rotulos_memorizados": _medir(lambda: canonizar_todos(memorizado), repeticoes),
+    }
+
+
+def _dataframe(rng, n):
+    import pandas as pd
+
+    return pd.DataFrame({
+        "Área": [f"Competência {i}" for i in range(n)],
+        "Pontuação": [rng.uniform(20, 100) for _ in range(n)],
+    }).sort_values(by="Pontuação", ascending=False)
+
+
+def etapa_dataframe(rng, repeticoes):
+    import pandas as pd
+
+    from internready import graficos
+    from internready.analise import NIVEIS_BINS, NIVEIS_LABELS, validar_competencias
+
+    resultados = {}
+    for nome, (n_competencias, _) in TAMANHOS_RESPOSTA.items():
+        competencias = [{"Área": f"Competência {i}", "Pontuação": rng.randint(0, 100)} for i in range(n_competencias)]
+
+        def montar():
+            df = pd.DataFrame(validar_competencias(competencias)).sort_values(by="Pontuação", ascending=False)
+            df["Nível"] = pd.cut(df["Pontuação"], bins=NIVEIS_BINS, labels=NIVEIS_LABELS)
+            return df
+
+        df = montar()
+        resultados[f"{nome}_montagem"] = _medir(montar, repeticoes * 5)
+        resultados[f"{nome}_estilo"] = _medir(lambda: graficos.estilizar_competencias(df).to_html(), repeticoes)
+    return resultados
+
+
+def etapa_graficos(rng, repeticoes):
+    import pandas as pd
+
+    from internready import graficos
+    from internready.analise import NIVEIS_BINS, NIVEIS_LABELS
+
+    # Emojis nos títulos não existem na fonte padrão; o aviso se repetiria a cada figura
+    warnings.filterwarnings("ignore", message="Glyph .* missing from font")
+    df = _dataframe(rng, 10)
+    niveis = pd.cut(df["Pontuação"], bins=NIVEIS_BINS, labels=NIVEIS_LABELS).value_counts()
+    graficos.aquecer()
+    return {
+        "barras": _medir(lambda: graficos.png_barras(df), repeticoes),
+        "radar": _medir(lambda: graficos.png_radar(df.head(8)), repeticoes),
+        "niveis": _medir(lambda: graficos.png_niveis(niveis), repeticoes),
+    }
+
+
+ETAPAS = {
+    "extracao": etapa_extracao,
+    "parser": etapa_parser,
+    "qualitativa": etapa_qualitativa,
+    "parser_incremental": etapa_parser_incremental,
+    "taxonomia": etapa_taxonomia,
+    "stub": etapa_stub,
+    "dataframe": etapa_dataframe,
+    "graficos": etapa_graficos,
+}
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], check=True, capture_output=True,
+                              text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(etapas, repeticoes, semente):
+    resultado = {
+        "commit": _commit(),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "semente": semente,
+        "etapas": {},
+    }
+    for nome in etapas:
+        # Cada etapa tem a própria semente: os dados não mudam ao escolher outras etapas
+        rng = random.Random(f"{semente}:{nome}")
+        try:
+            resultado["etapas"][nome] = ETAPAS[nome](rng, repeticoes)
+        except ImportError as e:
+            resultado["etapas"][nome] = {"indisponivel": str(e)}
+        print(f"{nome}: {'ok' if 'indisponivel' not in resultado['etapas'][nome] else 'indisponível'}",
+              file=sys.stderr)
+    return resultado
+
+
+def comparar(base, atual, limiar):
+    """Linhas (etapa, caso, base_ms, atual_ms, razão) e se houve regressão acima do limiar"""
+    linhas = []
+    regressao = False
+    for etapa, casos in atual["etapas"].items():
+        casos_base = base.get("etapas", {}).get(etapa, {})
+        for caso, medicao in casos.items():
+            anterior = casos_base.get(caso)
+            if not isinstance(medicao, dict) or not isinstance(anterior, dict) or not anterior.get("mediana_ms"):
+                continue
+            razao = medicao["mediana_ms"] / anterior["mediana_ms"]
+            regressao = regressao or razao > limiar
+            linhas.append((etapa, caso, anterior["mediana_ms"], medicao["mediana_ms"], razao))
+    return linhas, regressao
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--saida", help="grava os resultados (JSON) neste arquivo")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--etapas", default=",".join(ETAPAS), help=f"subconjunto de: {', '.join(ETAPAS)}")
+    parser.add_argument("--comparar", help="resultados de outro commit para comparação")
+    parser.add_argument("--limiar", type=float, default=1.2, help="razão atual/base considerada regressão")
+    args = parser.parse_args(argv)
+
+    etapas = [e for e in args.etapas.split(",") if e]
+    desconhecidas = set(etapas) - set(ETAPAS)
+    if desconhecidas:
+        parser.error(f"etapas desconhecidas: {', '.join(sorted(desconhecidas))}")
+
+    resultado = executar(etapas, args.repeticoes, args.semente)
+    conteudo = json.dumps(resultado, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            f.write(conteudo + "\n")
+    elif not args.comparar:
+        print(conteudo)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        linhas, regressao = comparar(base, resultado, args.limiar)
+        print(f"base {base.get('commit')} -> atual {resultado['commit']}")
+        print(f"{'etapa':>20} {'caso':>28} {'base (ms)':>10} {'atual (ms)':>10} {'razão':>7}")
+        for etapa, caso, anterior, atual, razao in linhas:
+            marca = "  <- regressão" if razao > args.limiar else ""
+            print(f"{etapa:>20} {caso:>28} {anterior:>10.3f} {atual:>10.3f} {razao:>7.2f}{marca}")
+        return 1 if regressao else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
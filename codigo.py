@@ -3,12 +3,13 @@
 
 import streamlit as st
 import pandas as pd
-import json
 import re
-import tempfile
-import os
-from math import pi
 import sys
+import os
+import io
+import asyncio
+import zipfile
+import time
 
 # Configuração da página (deve estar no topo)
 st.set_page_config(
@@ -21,31 +22,18 @@ st.set_page_config(
 # Função para verificar dependências
 @st.cache_data
 def verificar_dependencias():
-    """Verifica e reporta status das dependências"""
-    deps_status = {}
-    
-    try:
-        from openai import OpenAI
-        deps_status['openai'] = True
-    except ImportError:
-        deps_status['openai'] = False
-    
-    try:
-        import fitz  # PyMuPDF
-        deps_status['pymupdf'] = True
-    except ImportError:
-        deps_status['pymupdf'] = False
-    
-    try:
-        import matplotlib.pyplot as plt
-        deps_status['matplotlib'] = True
-        # Configurações visuais do Matplotlib
-        plt.rcParams['figure.figsize'] = [10, 6]
-        plt.rcParams['font.size'] = 12
-    except ImportError:
-        deps_status['matplotlib'] = False
-    
-    return deps_status
+    """Verifica e reporta status das dependências sem importá-las
+
+    openai, PyMuPDF e Matplotlib só são carregados no primeiro uso (ou pelo
+    pré-aquecimento), para não atrasar a renderização da página inicial.
+    """
+    from importlib.util import find_spec
+
+    return {
+        'openai': find_spec("openai") is not None,
+        'pymupdf': find_spec("fitz") is not None,
+        'matplotlib': find_spec("matplotlib") is not None,
+    }
 
 # Interface principal
 st.title("🚀 Assistente de Análise InternReady")
@@ -70,10 +58,110 @@ numpy>=1.21.0,<2.0.0
 pillow>=8.0.0,<11.0.0""")
     st.stop()
 
-# Imports condicionais (só após verificação)
-from openai import OpenAI
-import fitz  # PyMuPDF
-import matplotlib.pyplot as plt
+# Imports do pacote (openai, fitz e matplotlib continuam preguiçosos)
+from internready.cache import CacheAnalises, hash_documento
+from internready.historico import HistoricoAnalises
+from internready.percentis import MotorPercentis
+from internready.clientes import RegistroClientes
+from internready.limites import AgendadorLimites, LimiteExcedido
+from internready.metricas import Rastreador, RegistroMetricas
+from internready.voo_unico import VooUnico
+from internready.tarefas import ErroTarefa, FilaCheia, FilaTarefas
+from internready.roteador import Roteador, chave_cache as chave_cache_analise, chaves_cascata, obter_do_cache
+from internready.sessao import ResultadosSessao, chave_resultado
+from internready.extracao import ErroExtracao, LimitePDFExcedido
+from internready.analise import (
+    MODELO, NIVEIS_BINS, NIVEIS_LABELS, SECOES_CONFIG,
+    interpretar_estruturada, validar_competencias,
+    versao_prompt,
+)
+from internready.parser_incremental import ParserIncremental, separar_resposta
+from internready.parser_qualitativo import analisar_qualitativa
+from internready.taxonomia import canonizar_competencias
+from internready.pipeline import extract_text, interpretar_resposta
+from internready import aquecimento, graficos, lote, tarefas
+from internready.config import LOTE_DIRETORIO_RAIZ, LOTE_MAX_CONCORRENCIA, METRICAS_PORTA, PREAQUECER
+
+@st.cache_resource
+def iniciar_preaquecimento():
+    """Pré-aquecimento em segundo plano, uma vez por servidor"""
+    return aquecimento.iniciar_preaquecimento()
+
+if PREAQUECER:
+    iniciar_preaquecimento()
+
+@st.cache_resource
+def obter_cache_analises():
+    """Cache de análises compartilhado entre sessões do servidor"""
+    return CacheAnalises()
+
+cache_analises = obter_cache_analises()
+
+@st.cache_resource
+def obter_historico():
+    """Histórico persistente de análises compartilhado entre sessões"""
+    return HistoricoAnalises()
+
+historico = obter_historico()
+
+@st.cache_resource
+def obter_motor_percentis():
+    """Distribuições do histórico por competência, carregadas uma vez por servidor"""
+    motor = MotorPercentis()
+    motor.carregar_historico(historico)
+    return motor
+
+motor_percentis = obter_motor_percentis()
+
+@st.cache_resource
+def obter_registro_clientes():
+    """Clientes OpenAI e pool HTTP compartilhados entre sessões e reruns"""
+    return RegistroClientes()
+
+registro_clientes = obter_registro_clientes()
+
+@st.cache_resource
+def obter_agendador():
+    """Fila de chamadas com os limites de RPM/TPM, única por servidor"""
+    return AgendadorLimites()
+
+agendador = obter_agendador()
+
+@st.cache_resource
+def obter_voo_unico():
+    """Análises em andamento, para coalescer envios simultâneos do mesmo currículo"""
+    return VooUnico()
+
+voo_unico = obter_voo_unico()
+
+@st.cache_resource
+def obter_metricas():
+    """Métricas por etapa do servidor (log JSON lines e /metrics na porta configurada)"""
+    registro = RegistroMetricas()
+    if METRICAS_PORTA:
+        registro.servir(METRICAS_PORTA)
+    return registro
+
+metricas = obter_metricas()
+
+@st.cache_resource
+def obter_fila_tarefas():
+    """Análises em segundo plano do servidor, com o limite de análises simultâneas"""
+    return FilaTarefas()
+
+fila_tarefas = obter_fila_tarefas()
+
+@st.cache_resource
+def obter_roteador():
+    """Cascata de backends com as estatísticas de escalação do servidor"""
+    roteador = Roteador(registro_clientes=registro_clientes)
+    metricas.adicionar_coletor(roteador.linhas_prometheus)
+    return roteador
+
+roteador = obter_roteador()
+
+MODO_UNICO = "📄 Currículo único"
+MODO_LOTE = "📚 Lote de currículos"
 
 # Sidebar com configurações
 with st.sidebar:
@@ -86,6 +174,25 @@ with st.sidebar:
     
     if api_key:
         st.success("✅ Chave inserida")
+
+    # Escalar é opcional (INTERNREADY_ROTEADOR_BACKENDS), mas quando ligado o usuário vê para onde vai a chave
+    if len(roteador.backends) > 1:
+        st.info(
+            "🔁 Cascata de modelos: " + " → ".join(b["nome"] for b in roteador.backends) +
+            f". Respostas com menos de {roteador.min_competencias} competências são refeitas no próximo "
+            "modelo; os da OpenAI usam a sua chave."
+        )
+
+    modo = st.radio(
+        "🗂️ Modo de análise:",
+        [MODO_UNICO, MODO_LOTE],
+        help="O modo lote analisa vários PDFs (ou ZIPs) em paralelo"
+    )
+
+    saida_estruturada = st.checkbox(
+        "🧩 Saída estruturada (JSON Schema)",
+        help="O modelo responde em um JSON validado por esquema, sem depender da leitura do texto livre"
+    )
     
     st.markdown("---")
     st.markdown("### 📖 Como usar:")
@@ -96,164 +203,243 @@ with st.sidebar:
     4. **Aguarde a análise** completa
     """)
 
-def extrair_json_robusto(texto):
-    """Extrai JSON de forma mais robusta do texto da resposta"""
-    try:
-        # Tenta encontrar JSON entre colchetes
-        match = re.search(r"\[(.*?)\]", texto, re.DOTALL)
-        if match:
-            json_str = "[" + match.group(1) + "]"
-            return json.loads(json_str)
-    except (json.JSONDecodeError, AttributeError):
-        pass
-    
-    try:
-        # Tenta encontrar objetos JSON individuais
-        objetos = re.findall(r'\{[^{}]*\}', texto)
-        dados = []
-        for obj in objetos:
-            try:
-                dados.append(json.loads(obj))
-            except json.JSONDecodeError:
-                continue
-        if dados:
-            return dados
-    except Exception:
-        pass
-    
-    return None
+    st.markdown("---")
+    st.markdown("### 🗄️ Cache de análises:")
+    cache_placeholder = st.empty()
 
 def criar_grafico_radar_seguro(df):
-    """Cria gráfico radar com verificações de segurança"""
+    """PNG do gráfico radar com verificações de segurança: (png ou None, aviso ou None)"""
     if len(df) < 3:
-        st.warning("⚠️ Necessário pelo menos 3 competências para gráfico radar")
-        return None
+        return None, "⚠️ Necessário pelo menos 3 competências para gráfico radar"
     
     try:
-        labels = df["Área"].tolist()
-        values = df["Pontuação"].tolist()
-        
-        # Adiciona o primeiro ponto no final para fechar o polígono
-        labels += [labels[0]]
-        values += [values[0]]
-        
-        angles = [n / float(len(labels)-1) * 2 * pi for n in range(len(labels))]
-        
-        fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(polar=True))
-        ax.plot(angles, values, linewidth=2, color='#1f77b4')
-        ax.fill(angles, values, alpha=0.25, color='#1f77b4')
-        ax.set_xticks(angles[:-1])
-        ax.set_xticklabels(labels[:-1], fontsize=10)
-        ax.set_ylim(0, 100)
-        ax.set_title("🕸️ Radar de Competências", fontsize=14, pad=20)
-        ax.grid(True)
-        
-        return fig
+        return graficos.png_radar(df), None
     except Exception as e:
-        st.error(f"Erro ao criar gráfico radar: {str(e)}")
-        return None
+        return None, f"Erro ao criar gráfico radar: {str(e)}"
 
-def processar_analise_qualitativa(texto_analise):
-    """Processa e formata a análise qualitativa de forma mais visual"""
-    if not texto_analise:
-        return None
-    
-    # Dicionário para mapear seções para ícones e cores
-    secoes_config = {
-        "pontos fortes": {"icone": "💪", "cor": "#28a745", "titulo": "Pontos Fortes"},
-        "pontos de melhoria": {"icone": "📈", "cor": "#ffc107", "titulo": "Pontos de Melhoria"},
-        "sugestões": {"icone": "💡", "cor": "#17a2b8", "titulo": "Sugestões"},
-        "recomendações": {"icone": "🎯", "cor": "#6f42c1", "titulo": "Recomendações"}
+def renderizar_qualitativa_parcial(placeholder, texto_analise):
+    """Mostra as seções qualitativas já recebidas enquanto a resposta ainda chega"""
+    secoes = analisar_qualitativa(texto_analise)
+    if not secoes:
+        return
+    with placeholder.container():
+        tabs = st.tabs([f"{SECOES_CONFIG[s]['icone']} {SECOES_CONFIG[s]['titulo']}" for s in secoes])
+        for tab, pontos in zip(tabs, secoes.values()):
+            with tab:
+                for ponto in pontos:
+                    if ponto.strip():
+                        st.markdown(f"- {ponto}")
+
+def renderizar_abas_qualitativas(tab_contents):
+    """Cria uma aba por seção com os pontos em cartões coloridos"""
+    tabs = st.tabs([f"{config['icone']} {config['titulo']}" for config, _ in tab_contents])
+
+    for i, (tab, (config, pontos)) in enumerate(zip(tabs, tab_contents)):
+        with tab:
+            st.markdown(f"#### {config['icone']} {config['titulo']}")
+
+            for j, ponto in enumerate(pontos, 1):
+                if ponto.strip():
+                    # Criar container com estilo
+                    with st.container():
+                        st.markdown(f"""
+                        <div style="
+                            background-color: {config['cor']}15;
+                            border-left: 4px solid {config['cor']};
+                            padding: 15px;
+                            margin: 10px 0;
+                            border-radius: 5px;
+                        ">
+                            <p style="margin: 0; color: #333;">
+                                <strong>{j}.</strong> {ponto}
+                            </p>
+                        </div>
+                        """, unsafe_allow_html=True)
+
+def renderizar_rodape():
+    """Contadores do cache (preenchidos ao final para refletir esta execução) e rodapé"""
+    with cache_placeholder.container():
+        stats_cache = cache_analises.estatisticas()
+        col_hit, col_miss = st.columns(2)
+        col_hit.metric("Acertos", stats_cache["acertos_memoria"] + stats_cache["acertos_disco"])
+        col_miss.metric("Falhas", stats_cache["falhas"])
+        st.caption(f"Memória: {stats_cache['itens_memoria']} itens · Disco: {stats_cache['itens_disco']} itens")
+        st.caption(f"🤝 Análises coalescidas: {voo_unico.estatisticas()['coalescidas']}")
+        st.caption(f"🗃️ Histórico: {historico.estatisticas()['candidatos']} candidatos analisados")
+        stats_tarefas = fila_tarefas.estatisticas()
+        st.caption(
+            f"🧵 Análises: {stats_tarefas['executando']}/{stats_tarefas['max_simultaneas']} em andamento · "
+            f"{stats_tarefas['na_fila']} na fila"
+        )
+        stats_clientes = registro_clientes.estatisticas()
+        st.caption(
+            f"🔌 Conexões: {stats_clientes['conexoes_novas']} novas · "
+            f"{stats_clientes['conexoes_reusadas']} reutilizadas · "
+            f"{stats_clientes['conexao_s'] * 1000:.0f} ms em TCP/TLS"
+        )
+        st.caption("🔁 Escalação: " + " · ".join(
+            f"{nome} {e['taxa_escalacao']:.0%} de {e['chamadas']}" for nome, e in roteador.estatisticas().items()
+        ))
+        stats_prefixo = metricas.estatisticas_cache_prefixo()
+        st.caption(
+            f"🧩 Cache de prefixo: {stats_prefixo['acertos']}/{stats_prefixo['chamadas']} chamadas · "
+            f"{stats_prefixo['fracao_tokens']:.0%} dos tokens de prompt"
+        )
+
+    # Footer
+    st.markdown("---")
+    st.markdown("🚀 **InternReady** - Análise inteligente de currículos para o mercado financeiro")
+
+STATUS_LOTE = {
+    lote.NA_FILA: "⏳ Na fila",
+    lote.EXTRAINDO: "📝 Extraindo texto",
+    lote.ANALISANDO: "🤖 Analisando",
+    lote.CONCLUIDO: "✅ Concluído",
+    lote.ERRO: "❌ Erro",
+}
+
+def preparar_resultado_lote(linhas, resultados):
+    """Tabela de status e arquivos de download do lote, guardados na sessão para os reruns"""
+    df_lote = lote.resultados_para_dataframe(resultados)
+    buffer = io.BytesIO()
+    try:
+        df_lote.to_parquet(buffer, index=False)
+        parquet = buffer.getvalue()
+    except ImportError:
+        parquet = None
+    return {
+        "linhas": [dict(linha) for linha in linhas],
+        "concluidos": sum(r["status"] == lote.CONCLUIDO for r in resultados),
+        "total": len(resultados),
+        "csv": df_lote.to_csv(index=False, encoding='utf-8'),
+        "parquet": parquet,
     }
-    
-    # Separar o texto em seções
-    secoes = {}
-    
-    # Padrões mais flexíveis para identificar seções
-    patterns_gerais = [
-        r"\*\*Pontos Fortes:\*\*(.*?)(?=\*\*Pontos de Melhoria:\*\*|\*\*Sugestões:\*\*|$)",
-        r"\*\*Pontos de Melhoria:\*\*(.*?)(?=\*\*Sugestões:\*\*|\*\*Recomendações:\*\*|$)",
-        r"\*\*Sugestões:\*\*(.*?)(?=\*\*Recomendações:\*\*|$)",
-        r"\*\*Recomendações:\*\*(.*?)$"
+
+def renderizar_resultado_lote(resultado_lote):
+    """Resumo e downloads do último lote da sessão"""
+    concluidos = resultado_lote["concluidos"]
+    if concluidos:
+        st.success(f"✅ **{concluidos} de {resultado_lote['total']} currículos analisados com sucesso**")
+    else:
+        st.error("❌ Nenhum currículo pôde ser analisado.")
+        return
+
+    # Download dos resultados combinados
+    st.markdown("### 💾 **Download dos Resultados**")
+    col_csv, col_parquet = st.columns(2)
+    with col_csv:
+        st.download_button(
+            label="📥 Baixar dados em CSV",
+            data=resultado_lote["csv"],
+            file_name="analise_lote.csv",
+            mime="text/csv"
+        )
+    with col_parquet:
+        if resultado_lote["parquet"] is None:
+            st.caption("Instale `pyarrow` para exportar em Parquet.")
+        else:
+            st.download_button(
+                label="📥 Baixar dados em Parquet",
+                data=resultado_lote["parquet"],
+                file_name="analise_lote.parquet",
+                mime="application/octet-stream"
+            )
+
+def renderizar_modo_lote():
+    """Interface da análise em lote: vários PDFs, ZIPs ou um diretório do servidor"""
+    st.header("📚 Análise em Lote")
+    uploads = st.file_uploader(
+        "📎 Envie os currículos em PDF ou arquivos ZIP",
+        type=["pdf", "zip"],
+        accept_multiple_files=True,
+        help="Arquivos ZIP são percorridos em busca de PDFs"
+    )
+    # Ler diretórios do servidor só dentro da raiz configurada (sem ela, só uploads)
+    diretorio = st.text_input(
+        f"📁 ...ou informe um diretório dentro de `{LOTE_DIRETORIO_RAIZ}` com PDFs (opcional)",
+        help="Todos os PDFs do diretório e subdiretórios serão analisados"
+    ) if LOTE_DIRETORIO_RAIZ else ""
+    max_concorrencia = st.slider("⚡ Chamadas simultâneas à API", 1, 32, LOTE_MAX_CONCORRENCIA)
+
+    if not api_key:
+        st.warning("⚠️ **Insira sua chave de API** para continuar com a análise.")
+        return
+    if not uploads and not diretorio:
+        st.info("📤 **Envie os currículos**" + (" ou informe um diretório" if LOTE_DIRETORIO_RAIZ else "") +
+                " para iniciar a análise em lote.")
+        return
+    if not st.button("🔍 Analisar Lote", type="primary", use_container_width=True):
+        # Reruns (ex.: clique em um download) redesenham o último lote da sessão
+        resultado_lote = st.session_state.get("resultado_lote")
+        if resultado_lote is not None:
+            st.dataframe(pd.DataFrame(resultado_lote["linhas"]), use_container_width=True)
+            renderizar_resultado_lote(resultado_lote)
+        return
+
+    try:
+        if diretorio and not lote.diretorio_permitido(diretorio, LOTE_DIRETORIO_RAIZ).is_dir():
+            st.error(f"❌ Diretório não encontrado: `{diretorio}`")
+            return
+        itens = lote.coletar_pdfs(uploads, diretorio, diretorio_raiz=LOTE_DIRETORIO_RAIZ or None)
+    except lote.DiretorioNaoPermitido:
+        st.error(f"❌ Só é possível ler diretórios dentro de `{LOTE_DIRETORIO_RAIZ}`")
+        return
+    except zipfile.BadZipFile as e:
+        st.error(f"❌ Arquivo ZIP inválido: {str(e)}")
+        return
+    if not itens:
+        st.warning("⚠️ Nenhum PDF encontrado.")
+        return
+
+    progress_bar = st.progress(0)
+    tabela_status = st.empty()
+    linhas = [
+        {"Arquivo": nome, "Status": STATUS_LOTE[lote.NA_FILA], "Competências": None,
+         "Pontuação Média": None, "Tokens Economizados": None, "Detalhes": ""}
+        for nome, _ in itens
     ]
-    
-    # Aplicar padrões
-    match_pontos_fortes = re.search(patterns_gerais[0], texto_analise, re.IGNORECASE | re.DOTALL)
-    match_pontos_melhoria = re.search(patterns_gerais[1], texto_analise, re.IGNORECASE | re.DOTALL)
-    match_sugestoes = re.search(patterns_gerais[2], texto_analise, re.IGNORECASE | re.DOTALL)
-    match_recomendacoes = re.search(patterns_gerais[3], texto_analise, re.IGNORECASE | re.DOTALL)
-    
-    if match_pontos_fortes:
-        secoes["pontos fortes"] = {
-            "conteudo": match_pontos_fortes.group(1).strip(),
-            "config": secoes_config["pontos fortes"]
-        }
-    
-    if match_pontos_melhoria:
-        secoes["pontos de melhoria"] = {
-            "conteudo": match_pontos_melhoria.group(1).strip(),
-            "config": secoes_config["pontos de melhoria"]
-        }
-    
-    if match_sugestoes:
-        secoes["sugestões"] = {
-            "conteudo": match_sugestoes.group(1).strip(),
-            "config": secoes_config["sugestões"]
-        }
-    
-    if match_recomendacoes:
-        secoes["recomendações"] = {
-            "conteudo": match_recomendacoes.group(1).strip(),
-            "config": secoes_config["recomendações"]
-        }
-    
-    # Se não encontrou seções, tenta uma abordagem mais simples baseada em linhas
-    if not secoes:
-        linhas = texto_analise.split('\n')
-        secao_atual = None
-        conteudo_atual = []
-        
-        for linha in linhas:
-            linha = linha.strip()
-            if not linha:
-                continue
-                
-            # Identificar início de seção
-            if "pontos fortes" in linha.lower() and "**" in linha:
-                if secao_atual and conteudo_atual:
-                    secoes[secao_atual] = {
-                        "conteudo": '\n'.join(conteudo_atual),
-                        "config": secoes_config[secao_atual]
-                    }
-                secao_atual = "pontos fortes"
-                conteudo_atual = []
-            elif "pontos de melhoria" in linha.lower() and "**" in linha:
-                if secao_atual and conteudo_atual:
-                    secoes[secao_atual] = {
-                        "conteudo": '\n'.join(conteudo_atual),
-                        "config": secoes_config[secao_atual]
-                    }
-                secao_atual = "pontos de melhoria"
-                conteudo_atual = []
-            elif "sugestões" in linha.lower() and "**" in linha:
-                if secao_atual and conteudo_atual:
-                    secoes[secao_atual] = {
-                        "conteudo": '\n'.join(conteudo_atual),
-                        "config": secoes_config[secao_atual]
-                    }
-                secao_atual = "sugestões"
-                conteudo_atual = []
-            elif secao_atual:
-                conteudo_atual.append(linha)
-        
-        # Adicionar última seção
-        if secao_atual and conteudo_atual:
-            secoes[secao_atual] = {
-                "conteudo": '\n'.join(conteudo_atual),
-                "config": secoes_config[secao_atual]
-            }
-    
-    return secoes if secoes else None
+    finalizados = [0]
+
+    def ao_atualizar(resultado):
+        linha = linhas[resultado["indice"]]
+        linha["Status"] = STATUS_LOTE[resultado["status"]]
+        if resultado["status"] == lote.CONCLUIDO:
+            pontuacoes = [c["Pontuação"] for c in resultado["competencias"]]
+            linha["Competências"] = len(pontuacoes)
+            linha["Pontuação Média"] = round(sum(pontuacoes) / len(pontuacoes), 1)
+            linha["Detalhes"] = "⚡ cache" if resultado["do_cache"] else ""
+            if resultado["compressao"]:
+                linha["Tokens Economizados"] = resultado["compressao"]["tokens_economizados"]
+        elif resultado["status"] == lote.ERRO:
+            linha["Detalhes"] = resultado["erro"]
+        if resultado["status"] in (lote.CONCLUIDO, lote.ERRO):
+            finalizados[0] += 1
+            progress_bar.progress(finalizados[0] / len(linhas))
+        tabela_status.dataframe(pd.DataFrame(linhas), use_container_width=True)
+
+    tabela_status.dataframe(pd.DataFrame(linhas), use_container_width=True)
+    rastreador = Rastreador(metricas, modo="lote", estruturado=saida_estruturada, arquivos=len(itens))
+    with rastreador.etapa("lote"):
+        resultados = asyncio.run(lote.analisar_lote(
+            itens, api_key, max_concorrencia=max_concorrencia, cache=cache_analises, ao_atualizar=ao_atualizar,
+            estruturado=saida_estruturada, roteador=roteador, agendador=agendador
+        ))
+    for resultado in resultados:
+        for chamada in resultado["chamadas"]:
+            rastreador.chamada(**chamada)
+    rastreador.finalizar("ok" if any(r["status"] == lote.CONCLUIDO for r in resultados) else "erro")
+
+    registros = lote.registros_historico(resultados, saida_estruturada)
+    historico.gravar_lote(registros)
+    for registro in registros:
+        motor_percentis.registrar_candidato(registro["competencias"])
+    st.session_state["resultado_lote"] = preparar_resultado_lote(linhas, resultados)
+    renderizar_resultado_lote(st.session_state["resultado_lote"])
+
+if modo == MODO_LOTE:
+    renderizar_modo_lote()
+    renderizar_rodape()
+    st.stop()
 
 # Upload de arquivo
 st.header("📄 Upload do Currículo")
@@ -271,363 +457,511 @@ elif uploaded_file and not api_key:
 elif api_key and not uploaded_file:
     st.info("📤 **Faça upload de um currículo** em PDF para iniciar a análise.")
 
-# Processamento principal
-if uploaded_file and api_key:
-    # Botão de análise
-    if st.button("🔍 Analisar Currículo", type="primary", use_container_width=True):
-        # Container para progresso
-        progress_container = st.container()
-        
-        with progress_container:
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
+def executar_analise(tarefa, dados_pdf, nome_arquivo, api_key, estruturado):
+    """Análise de um currículo na fila de tarefas: roda fora do script, sem chamar o Streamlit
+
+    O progresso e os resultados parciais vão para tarefa.atualizar; falhas
+    esperadas viram ErroTarefa com a mensagem e a dica mostradas na tela.
+    """
+    voo = None
+    rastreador = Rastreador(metricas, modo="unico", estruturado=estruturado)
+    resultado_metricas = "erro"
+    try:
+        # Consultar o cache antes de qualquer processamento
+        rastreador.iniciar("cache")
+        hash_doc = hash_documento(dados_pdf)
+        chaves_cache = chaves_cascata(dados_pdf, estruturado, roteador)
+        _, resposta_completa = obter_do_cache(cache_analises, chaves_cache)
+        resposta_do_cache = resposta_completa is not None
+        tempos_resposta = conexao_chamada = None
+        relatorio_compressao = []
+
+        # Outra sessão já analisando o mesmo currículo: aguardar a resposta dela
+        resposta_coalescida = False
+        if not resposta_do_cache:
+            def ao_aguardar_lider():
+                rastreador.iniciar("aguardando_analise_identica")
+                tarefa.atualizar(40, "🤝 Este currículo já está sendo analisado em outra sessão, aguardando...")
+
+            # Se a líder desistir, entra de novo: vira líder ou aguarda quem a substituiu
+            # A chave do voo cobre a cascata inteira: só análises com os mesmos backends se juntam
+            voo, resposta_completa = voo_unico.participar(">".join(chaves_cache), ao_aguardar_lider)
+            resposta_coalescida = voo is None
+            if voo is not None:
+                # Outra líder pode ter gravado a resposta entre a consulta ao cache e a entrada no voo
+                _, resposta_completa = obter_do_cache(cache_analises, chaves_cache)
+                resposta_do_cache = resposta_completa is not None
+                if resposta_do_cache:
+                    voo.concluir(resposta_completa)
+
+        if resposta_do_cache:
+            tarefa.atualizar(60, "⚡ Análise recuperada do cache...")
+        elif resposta_coalescida:
+            tarefa.atualizar(60)
+        else:
+            # Etapa 1: Configurar clientes dos backends da cascata
+            rastreador.iniciar("cliente")
+            tarefa.atualizar(10, "🔧 Configurando cliente OpenAI...")
             try:
-                # Etapa 1: Configurar cliente
-                status_text.text("🔧 Configurando cliente OpenAI...")
-                progress_bar.progress(10)
-                
-                try:
-                    client = OpenAI(api_key=api_key)
-                except Exception as e:
-                    st.error(f"❌ Erro ao configurar cliente OpenAI: {str(e)}")
-                    st.info("Verifique se sua chave de API está correta.")
-                    st.stop()
-                
-                # Etapa 2: Processar PDF
-                status_text.text("📄 Processando arquivo PDF...")
-                progress_bar.progress(25)
-                
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                    temp_file.write(uploaded_file.getvalue())
-                    pdf_path = temp_file.name
-
-                # Etapa 3: Extrair texto
-                status_text.text("📝 Extraindo texto do currículo...")
-                progress_bar.progress(40)
-                
-                texto_curriculo = ""
-                try:
-                    doc = fitz.open(pdf_path)
-                    for page_num, page in enumerate(doc):
-                        texto_curriculo += page.get_text()
-                        # Atualizar progresso para páginas
-                        progress_bar.progress(40 + (page_num + 1) * 10 // len(doc))
-                    doc.close()
-                except Exception as e:
-                    st.error(f"❌ Erro ao processar PDF: {str(e)}")
-                    st.info("Verifique se o arquivo não está corrompido ou protegido por senha.")
-                    st.stop()
-                finally:
-                    # Limpar arquivo temporário
-                    try:
-                        if os.path.exists(pdf_path):
-                            os.unlink(pdf_path)
-                    except:
-                        pass
-
-                if not texto_curriculo.strip():
-                    st.error("❌ Não foi possível extrair texto do PDF. Verifique se o arquivo não está protegido.")
-                    st.stop()
-
-                # Etapa 4: Análise com IA
-                status_text.text("🤖 Analisando com inteligência artificial...")
-                progress_bar.progress(60)
-
-                # Prompt otimizado
-                prompt = f"""
-Você é um consultor de carreira especializado em perfis voltados para o setor financeiro. Analise o currículo abaixo.
-
-**IMPORTANTE: Responda EXATAMENTE no formato especificado.**
-
-**Parte 1 – Análise Quantitativa (JSON)**
-Identifique as principais áreas de competência e atribua notas de 0 a 100:
-
-[
-  {{"Área": "Nome da Competência", "Pontuação": número}},
-  {{"Área": "Outra Competência", "Pontuação": número}}
-]
-
-**Parte 2 – Análise Qualitativa**
-- **Pontos Fortes:** principais qualidades identificadas (liste 3-5 pontos específicos)
-- **Pontos de Melhoria:** áreas que podem ser desenvolvidas (liste 3-4 sugestões práticas)
-- **Sugestões:** recomendações específicas para o mercado financeiro (liste 4-6 ações concretas)
-
-Currículo:
-\"\"\"
-{texto_curriculo[:4000]}  # Limitar texto para evitar tokens excessivos
-\"\"\"
-"""
-
-                try:
-                    response = client.chat.completions.create(
-                        model="gpt-4o-mini",  # Modelo mais estável e econômico
-                        messages=[{"role": "user", "content": prompt}],
-                        temperature=0.3,
-                        max_tokens=2500
-                    )
-                    resposta_completa = response.choices[0].message.content
-                except Exception as api_error:
-                    st.error(f"❌ Erro na API OpenAI: {str(api_error)}")
-                    st.info("Possíveis soluções:\n- Verifique sua chave de API\n- Confirme se você tem créditos disponíveis\n- Tente novamente em alguns minutos")
-                    st.stop()
-
-                # Etapa 5: Processar resultados
-                status_text.text("📊 Processando resultados...")
-                progress_bar.progress(80)
-
-                # Processar JSON
-                dados_json = extrair_json_robusto(resposta_completa)
-                
-                if not dados_json:
-                    st.error("❌ Erro: Não foi possível extrair os dados de competências.")
-                    with st.expander("🔍 Ver resposta completa da IA"):
-                        st.text(resposta_completa)
-                    st.stop()
-                
-                # Validar e limpar dados
-                dados_validos = []
-                for item in dados_json:
-                    if isinstance(item, dict) and "Área" in item and "Pontuação" in item:
-                        try:
-                            pontuacao = float(item["Pontuação"])
-                            if 0 <= pontuacao <= 100:
-                                dados_validos.append({
-                                    "Área": str(item["Área"]).strip(),
-                                    "Pontuação": pontuacao
-                                })
-                        except (ValueError, TypeError):
-                            continue
-                
-                if not dados_validos:
-                    st.error("❌ Nenhum dado válido encontrado na análise.")
-                    st.stop()
-
-                # Finalizar progresso
-                status_text.text("✅ Análise concluída!")
-                progress_bar.progress(100)
-                
-                # Limpar containers de progresso
-                progress_container.empty()
-                
-                # Criar DataFrame
-                df = pd.DataFrame(dados_validos)
-                df = df.sort_values(by="Pontuação", ascending=False)  # Ordenar por pontuação
-                
-                st.success(f"✅ **Currículo analisado com sucesso:** `{uploaded_file.name}`")
-                
-                # === RESULTADOS ===
-                
-                # Tabela de competências
-                st.markdown("### 📊 **Competências Identificadas**")
-                
-                # Colorir tabela baseado na pontuação
-                def color_pontuacao(val):
-                    if val >= 80:
-                        return 'background-color: lightgreen'
-                    elif val >= 60:
-                        return 'background-color: lightyellow'
-                    else:
-                        return 'background-color: lightcoral'
-                
-                styled_df = df.style.applymap(color_pontuacao, subset=['Pontuação'])
-                st.dataframe(styled_df, use_container_width=True)
-                
-                # Métricas principais
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    pontuacao_media = round(df["Pontuação"].mean(), 1)
-                    st.metric("📈 Pontuação Média", f"{pontuacao_media}%")
-                
-                with col2:
-                    competencias_altas = len(df[df["Pontuação"] >= 80])
-                    st.metric("🏆 Competências Altas (≥80%)", competencias_altas)
-                
-                with col3:
-                    total_competencias = len(df)
-                    st.metric("📝 Total de Competências", total_competencias)
-                
-                with col4:
-                    pontuacao_maxima = df["Pontuação"].max()
-                    st.metric("⭐ Maior Pontuação", f"{pontuacao_maxima}%")
-
-                # Gráficos
-                col_left, col_right = st.columns(2)
-                
-                with col_left:
-                    st.markdown("### 📊 **Distribuição de Competências**")
-                    
-                    fig1, ax1 = plt.subplots(figsize=(10, 6))
-                    colors = ['#2E8B57' if x >= 80 else '#DAA520' if x >= 60 else '#DC143C' for x in df["Pontuação"]]
-                    
-                    bars = ax1.barh(df["Área"], df["Pontuação"], color=colors)
-                    ax1.set_xlabel("Pontuação (%)")
-                    ax1.set_title("Competências por Área")
-                    ax1.grid(axis='x', alpha=0.3)
-                    
-                    # Adicionar valores nas barras
-                    for bar, valor in zip(bars, df["Pontuação"]):
-                        ax1.text(bar.get_width() + 1, bar.get_y() + bar.get_height()/2, 
-                                f'{valor:.0f}%', va='center', fontsize=9)
-                    
-                    plt.tight_layout()
-                    st.pyplot(fig1)
-                
-                with col_right:
-                    st.markdown("### 🕸️ **Radar de Competências**")
-                    fig_radar = criar_grafico_radar_seguro(df.head(8))  # Limitar a 8 competências
-                    if fig_radar:
-                        st.pyplot(fig_radar)
-                    else:
-                        st.info("Gráfico radar não disponível para este perfil.")
-
-                # Distribuição por níveis
-                st.markdown("### 📈 **Análise por Níveis**")
-                
-                df['Nível'] = pd.cut(
-                    df['Pontuação'], 
-                    bins=[-1, 59.9, 79.9, 100], 
-                    labels=["🔴 Baixo (0-59%)", "🟡 Médio (60-79%)", "🟢 Alto (80-100%)"]
+                roteador.preparar_clientes(api_key)
+            except Exception as e:
+                raise ErroTarefa(f"Erro ao configurar cliente OpenAI: {str(e)}",
+                                 "Verifique se sua chave de API está correta.")
+
+            # Etapa 2: Extrair texto direto da memória (sem arquivo temporário)
+            rastreador.iniciar("extracao")
+            tarefa.atualizar(25, "📝 Extraindo texto do currículo...")
+
+            def progresso_paginas(pagina, total):
+                # Atualizar progresso para páginas
+                tarefa.atualizar(25 + pagina * 25 // total)
+
+            try:
+                texto_curriculo = extract_text(
+                    dados_pdf, ao_progredir=progresso_paginas, ao_relatorio=relatorio_compressao.append
                 )
-                nivel_counts = df['Nível'].value_counts()
-                
-                col_a, col_b = st.columns([1, 1])
-                
-                with col_a:
-                    st.dataframe(nivel_counts.reset_index(), use_container_width=True)
-                
-                with col_b:
-                    fig2, ax2 = plt.subplots(figsize=(8, 6))
-                    colors_pie = ['#DC143C', '#DAA520', '#2E8B57']
-                    wedges, texts, autotexts = ax2.pie(
-                        nivel_counts.values, 
-                        labels=nivel_counts.index,
-                        colors=colors_pie,
-                        autopct='%1.1f%%',
-                        startangle=90
+            except LimitePDFExcedido as e:
+                raise ErroTarefa(str(e), "Envie um currículo menor ou ajuste os limites de tamanho configurados.")
+            except ErroExtracao as e:
+                raise ErroTarefa(f"Erro ao processar PDF: {str(e)}",
+                                 "Verifique se o arquivo não está corrompido ou protegido por senha.")
+
+            if not texto_curriculo.strip():
+                raise ErroTarefa("Não foi possível extrair texto do PDF. Verifique se o arquivo não está protegido.")
+
+            # Etapa 3: Análise com IA
+            rastreador.iniciar("modelo")
+            tarefa.atualizar(60, "🤖 Analisando com inteligência artificial...")
+
+            # Resultados parciais aparecem enquanto a resposta chega
+            parser_stream = ParserIncremental()
+            competencias_parciais = []
+            ultima_atualizacao = [0.0]
+
+            def ao_fragmento(trecho):
+                novas = validar_competencias(parser_stream.alimentar(trecho))
+                if novas:
+                    competencias_parciais.extend(novas)
+                    tarefa.atualizar(
+                        mensagem=f"✍️ Recebendo análise... {len(competencias_parciais)} competências identificadas",
+                        competencias=list(competencias_parciais),
                     )
-                    ax2.set_title("Distribuição por Níveis de Competência")
-                    plt.tight_layout()
-                    st.pyplot(fig2)
-
-                # === ANÁLISE QUALITATIVA MELHORADA ===
-                st.markdown("### 📝 **Análise Qualitativa Detalhada**")
-                
-                # Extrair texto após JSON
-                partes = resposta_completa.split("]")
-                if len(partes) > 1:
-                    texto_analise = partes[-1].strip()
-                    
-                    if texto_analise:
-                        # Processar análise qualitativa
-                        secoes_processadas = processar_analise_qualitativa(texto_analise)
-                        
-                        if secoes_processadas:
-                            # Criar tabs para cada seção
-                            tab_names = []
-                            tab_contents = []
-                            
-                            for secao_key, secao_data in secoes_processadas.items():
-                                config = secao_data["config"]
-                                tab_names.append(f"{config['icone']} {config['titulo']}")
-                                
-                                # Processar conteúdo da seção
-                                conteudo = secao_data["conteudo"]
-                                
-                                # Dividir em pontos se houver listas
-                                pontos = []
-                                if "•" in conteudo or "-" in conteudo or "\n" in conteudo:
-                                    # Tentar separar por marcadores
-                                    linhas = conteudo.replace("•", "\n-").replace("- ", "\n- ").split('\n')
-                                    for linha in linhas:
-                                        linha = linha.strip()
-                                        if linha and not linha.startswith('-'):
-                                            if pontos:  # Se já tem pontos, adiciona à lista atual
-                                                pontos[-1] += " " + linha
-                                            else:
-                                                pontos.append(linha)
-                                        elif linha.startswith('- '):
-                                            pontos.append(linha[2:].strip())
-                                else:
-                                    pontos = [conteudo]
-                                
-                                tab_contents.append((config, pontos))
-                            
-                            # Criar tabs se houver seções processadas
-                            if tab_names:
-                                tabs = st.tabs(tab_names)
-                                
-                                for i, (tab, (config, pontos)) in enumerate(zip(tabs, tab_contents)):
-                                    with tab:
-                                        st.markdown(f"#### {config['icone']} {config['titulo']}")
-                                        
-                                        for j, ponto in enumerate(pontos, 1):
-                                            if ponto.strip():
-                                                # Criar container com estilo
-                                                with st.container():
-                                                    st.markdown(f"""
-                                                    <div style="
-                                                        background-color: {config['cor']}15;
-                                                        border-left: 4px solid {config['cor']};
-                                                        padding: 15px;
-                                                        margin: 10px 0;
-                                                        border-radius: 5px;
-                                                    ">
-                                                        <p style="margin: 0; color: #333;">
-                                                            <strong>{j}.</strong> {ponto}
-                                                        </p>
-                                                    </div>
-                                                    """, unsafe_allow_html=True)
-                        else:
-                            # Fallback: mostrar texto original de forma mais organizada
-                            st.markdown(f"""
-                            <div style="
-                                background-color: #f8f9fa;
-                                border-radius: 10px;
-                                padding: 20px;
-                                border: 1px solid #dee2e6;
-                            ">
-                                {texto_analise.replace('\n', '<br>')}
-                            </div>
-                            """, unsafe_allow_html=True)
-                    else:
-                        st.info("📋 Análise qualitativa não foi gerada nesta resposta.")
+                # Parte qualitativa parcial no máximo a cada 0,3 s
+                # (no modo estruturado o texto após o array ainda é JSON)
+                if not estruturado and parser_stream.array_fechado and time.monotonic() - ultima_atualizacao[0] > 0.3:
+                    ultima_atualizacao[0] = time.monotonic()
+                    tarefa.atualizar(texto_qualitativo=parser_stream.texto_qualitativo())
+
+            def ao_escalar(backend, proximo):
+                # A resposta descartada não vale mais: recomeçar os parciais com o próximo backend
+                nonlocal parser_stream
+                parser_stream = ParserIncremental()
+                competencias_parciais.clear()
+                tarefa.atualizar(mensagem=f"🔁 Resposta de {backend} incompleta, consultando {proximo}...",
+                                 competencias=[], texto_qualitativo=None)
+
+            def ao_aguardar(posicao, espera):
+                if posicao == 0:
+                    tarefa.atualizar(mensagem=f"⏳ Limite da API atingido, nova tentativa em {espera:.0f} s...")
+                elif posicao == 1:
+                    tarefa.atualizar(mensagem=f"⏳ Aguardando cota da API (~{espera:.0f} s)...")
                 else:
-                    # Mostrar resposta completa se não conseguir separar
-                    with st.expander("📄 Ver análise completa"):
-                        st.markdown(f"""
-                        <div style="
-                            background-color: #f8f9fa;
-                            border-radius: 10px;
-                            padding: 20px;
-                            border: 1px solid #dee2e6;
-                        ">
-                            {resposta_completa.replace('\n', '<br>')}
-                        </div>
-                        """, unsafe_allow_html=True)
+                    tarefa.atualizar(mensagem=f"⏳ Na fila: posição {posicao}")
+
+            try:
+                with registro_clientes.medir() as conexao_chamada:
+                    resposta_completa, tempos_resposta = roteador.analisar(
+                        texto_curriculo, api_key, estruturado=estruturado, ao_fragmento=ao_fragmento,
+                        agendador=agendador, ao_aguardar=ao_aguardar, ao_escalar=ao_escalar
+                    )
+                for chamada in tempos_resposta["chamadas"]:
+                    rastreador.chamada(**chamada)
+                rastreador.atributos.update(backend=tempos_resposta["backend"],
+                                            escalacoes=tempos_resposta["escalacoes"])
+            except LimiteExcedido as e:
+                raise ErroTarefa(str(e), "A cota da API continua esgotada. Aguarde alguns minutos e tente novamente.")
+            except Exception as api_error:
+                raise ErroTarefa(
+                    f"Erro na API OpenAI: {str(api_error)}",
+                    "Possíveis soluções:\n- Verifique sua chave de API\n- Confirme se você tem créditos disponíveis\n- Tente novamente em alguns minutos"
+                )
 
-                # Download dos resultados
-                st.markdown("### 💾 **Download dos Resultados**")
-                
-                csv_data = df.to_csv(index=False, encoding='utf-8')
-                st.download_button(
-                    label="📥 Baixar dados em CSV",
-                    data=csv_data,
-                    file_name=f"analise_curriculo_{uploaded_file.name.replace('.pdf', '')}.csv",
-                    mime="text/csv"
+            # Gravar no cache (só respostas aceitas, na chave do backend que respondeu) antes de liberar
+            # quem aguarda a líder: quem chegar depois dela já encontra a resposta
+            competencias_resposta, qualitativa_resposta = interpretar_resposta(resposta_completa, estruturado)
+            if roteador.aceita(competencias_resposta):
+                cache_analises.gravar(
+                    chave_cache_analise(dados_pdf, estruturado, roteador.backend(tempos_resposta["backend"])),
+                    resposta_completa,
                 )
+            voo.concluir(resposta_completa)
+
+        # Etapa 4: Processar resultados
+        rastreador.iniciar("interpretacao")
+        tarefa.atualizar(80, "📊 Processando resultados...")
+
+        # Processar JSON
+        pontos_estruturados = None
+        if estruturado:
+            # Resposta já validada pelo esquema: basta decodificar o JSON
+            dados_json, pontos_estruturados = interpretar_estruturada(resposta_completa)
+            texto_analise = None
+        else:
+            # Uma única leitura localiza o JSON e o início da parte qualitativa
+            dados_json, texto_analise = separar_resposta(resposta_completa)
+
+        if not dados_json:
+            raise ErroTarefa("Erro: Não foi possível extrair os dados de competências.", detalhe=resposta_completa)
+
+        # Validar e limpar dados; áreas com nomes canônicos para comparar candidatos
+        dados_validos = canonizar_competencias(validar_competencias(dados_json))
+
+        if not dados_validos:
+            raise ErroTarefa("Nenhum dado válido encontrado na análise.")
+
+        # Percentis contra o histórico, antes de o próprio candidato entrar nele
+        percentis_coorte = motor_percentis.percentis(
+            [c["Área"] for c in dados_validos], [c["Pontuação"] for c in dados_validos]
+        )
+        percentil_media = motor_percentis.percentil_media(
+            sum(c["Pontuação"] for c in dados_validos) / len(dados_validos)
+        )
+
+        # Histórico e coorte só com análises feitas nesta chamada
+        if not resposta_do_cache and not resposta_coalescida:
+            historico.gravar(
+                hash_doc, dados_validos,
+                qualitativa=qualitativa_resposta,
+                arquivo=nome_arquivo, modelo=tempos_resposta["modelo"] if tempos_resposta else MODELO,
+                versao_prompt=versao_prompt(estruturado),
+            )
+            motor_percentis.registrar_candidato(dados_validos)
+
+        tarefa.atualizar(100, "✅ Análise concluída!")
+        resultado_metricas = "cache" if resposta_do_cache else "coalescida" if resposta_coalescida else "ok"
+        return {
+            "chave_sessao": chave_resultado(hash_doc, estruturado),
+            "arquivo": nome_arquivo,
+            "estruturado": estruturado,
+            "competencias": dados_validos,
+            "percentis": percentis_coorte.tolist(),
+            "percentil_media": percentil_media,
+            "pontos_estruturados": pontos_estruturados,
+            "texto_analise": texto_analise,
+            "resposta": resposta_completa,
+            "do_cache": resposta_do_cache,
+            "coalescida": resposta_coalescida,
+            "tempos": tempos_resposta,
+            "conexao": conexao_chamada,
+            "compressao": relatorio_compressao[0] if relatorio_compressao else None,
+        }
+    finally:
+        # Se a líder parou antes da resposta, quem aguardava é liberado
+        if voo is not None and voo.lider:
+            voo.abandonar()
+        rastreador.finalizar(resultado_metricas)
+
+def preparar_visualizacao(resultado):
+    """Tudo o que a página de resultados desenha, calculado uma vez e guardado na sessão"""
+    # Criar DataFrame
+    df = pd.DataFrame(resultado["competencias"])
+    df["Percentil na coorte"] = pd.Series(resultado["percentis"], dtype="float64").round(0)
+    df = df.sort_values(by="Pontuação", ascending=False)  # Ordenar por pontuação
+
+    png_radar, aviso_radar = criar_grafico_radar_seguro(df.head(8))  # Limitar a 8 competências
+
+    # Distribuição por níveis (a tabela exibida não tem a coluna; o CSV tem)
+    df_niveis = df.assign(**{"Nível": pd.cut(df["Pontuação"], bins=NIVEIS_BINS, labels=NIVEIS_LABELS)})
+    nivel_counts = df_niveis["Nível"].value_counts()
+
+    # Seções e pontos lidos em uma única passada
+    texto_analise = resultado["texto_analise"]
+    if resultado["estruturado"]:
+        secoes = resultado["pontos_estruturados"] or {}
+    else:
+        secoes = analisar_qualitativa(texto_analise) if texto_analise else {}
+
+    return {
+        "resultado": resultado,
+        "df": df,
+        "nivel_counts": nivel_counts,
+        "secoes": secoes,
+        "png_barras": graficos.png_barras(df),
+        "png_radar": png_radar,
+        "aviso_radar": aviso_radar,
+        "png_niveis": graficos.png_niveis(nivel_counts),
+        "csv": df_niveis.to_csv(index=False, encoding='utf-8'),
+    }
 
-            except Exception as e:
-                st.error(f"❌ **Erro durante a análise:** {str(e)}")
-                st.info("Tente novamente ou verifique se o arquivo está correto.")
-                
-                # Debug info
-                with st.expander("🔧 Informações de debug"):
-                    st.text(f"Erro: {type(e).__name__}")
-                    st.text(f"Detalhes: {str(e)}")
-                    st.text(f"Python: {sys.version}")
-
-# Footer
-st.markdown("---")
-st.markdown("🚀 **InternReady** - Análise inteligente de currículos para o mercado financeiro")
+def renderizar_resultado(visualizacao):
+    """Tabela, métricas, gráficos e análise qualitativa de uma análise guardada na sessão"""
+    resultado = visualizacao["resultado"]
+    df = visualizacao["df"]
+    percentil_media = resultado["percentil_media"]
+    tempos_resposta = resultado["tempos"]
+    conexao_chamada = resultado["conexao"]
+
+    st.success(f"✅ **Currículo analisado com sucesso:** `{resultado['arquivo']}`")
+    if resultado["do_cache"]:
+        st.caption("⚡ Resultado recuperado do cache (nenhuma nova chamada à API)")
+    elif resultado["coalescida"]:
+        st.caption("🤝 Resultado compartilhado com uma análise idêntica em andamento")
+    elif tempos_resposta["ttft_s"] is not None:
+        st.caption(
+            (f"🔁 Respondido por {tempos_resposta['backend']} após {tempos_resposta['escalacoes']} escalação(ões) · "
+             if tempos_resposta.get("escalacoes") else "")
+            + f"⏱️ Primeiro token em {tempos_resposta['ttft_s']:.2f} s · "
+            f"resposta completa em {tempos_resposta['ttlt_s']:.2f} s · "
+            + (f"nova conexão em {conexao_chamada['conexao_s'] * 1000:.0f} ms"
+               if conexao_chamada["conexoes_novas"] else "conexão reutilizada")
+        )
+    if tempos_resposta and tempos_resposta["uso"] and tempos_resposta["uso"]["cached"]:
+        st.caption(f"🧩 {tempos_resposta['uso']['cached']} de {tempos_resposta['uso']['prompt']} tokens de prompt "
+                   "servidos do cache de prefixo do provedor")
+    if resultado["compressao"]:
+        compressao = resultado["compressao"]
+        st.caption(
+            f"🗜️ Texto enviado: {compressao['tokens_enviados']} tokens "
+            f"({compressao['tokens_economizados']} economizados de {compressao['tokens_originais']})"
+        )
+
+    # === RESULTADOS ===
+
+    # Tabela de competências
+    st.markdown("### 📊 **Competências Identificadas**")
+
+    # Colorir tabela baseado na pontuação
+    styled_df = graficos.estilizar_competencias(df)
+    st.dataframe(styled_df, use_container_width=True)
+
+    # Métricas principais
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        pontuacao_media = round(df["Pontuação"].mean(), 1)
+        st.metric("📈 Pontuação Média", f"{pontuacao_media}%",
+                  delta=None if pd.isna(percentil_media) else f"P{percentil_media:.0f} da coorte",
+                  delta_color="off")
+
+    with col2:
+        competencias_altas = len(df[df["Pontuação"] >= 80])
+        st.metric("🏆 Competências Altas (≥80%)", competencias_altas)
+
+    with col3:
+        total_competencias = len(df)
+        st.metric("📝 Total de Competências", total_competencias)
+
+    with col4:
+        pontuacao_maxima = df["Pontuação"].max()
+        percentil_maxima = df["Percentil na coorte"].iloc[0]
+        st.metric("⭐ Maior Pontuação", f"{pontuacao_maxima}%",
+                  delta=None if pd.isna(percentil_maxima) else f"P{percentil_maxima:.0f} em {df['Área'].iloc[0]}",
+                  delta_color="off")
+
+    # Gráficos
+    col_left, col_right = st.columns(2)
+
+    with col_left:
+        st.markdown("### 📊 **Distribuição de Competências**")
+
+        st.image(visualizacao["png_barras"])
+
+    with col_right:
+        st.markdown("### 🕸️ **Radar de Competências**")
+        if visualizacao["aviso_radar"]:
+            st.warning(visualizacao["aviso_radar"])
+        if visualizacao["png_radar"]:
+            st.image(visualizacao["png_radar"])
+        else:
+            st.info("Gráfico radar não disponível para este perfil.")
+
+    # Distribuição por níveis
+    st.markdown("### 📈 **Análise por Níveis**")
+
+    col_a, col_b = st.columns([1, 1])
+
+    with col_a:
+        st.dataframe(visualizacao["nivel_counts"].reset_index(), use_container_width=True)
+
+    with col_b:
+        st.image(visualizacao["png_niveis"])
+
+    # === ANÁLISE QUALITATIVA MELHORADA ===
+    st.markdown("### 📝 **Análise Qualitativa Detalhada**")
+
+    texto_analise = resultado["texto_analise"]
+    secoes = visualizacao["secoes"]
+    if resultado["estruturado"]:
+        if secoes:
+            renderizar_abas_qualitativas([
+                (SECOES_CONFIG[secao], pontos) for secao, pontos in secoes.items()
+            ])
+        else:
+            st.info("📋 Análise qualitativa não foi gerada nesta resposta.")
+    # Extrair texto após JSON
+    elif texto_analise is not None:
+
+        if texto_analise:
+            if secoes:
+                # Criar tabs para cada seção
+                tab_contents = [
+                    (SECOES_CONFIG[secao], pontos) for secao, pontos in secoes.items()
+                ]
+                renderizar_abas_qualitativas(tab_contents)
+            else:
+                # Fallback: mostrar texto original de forma mais organizada
+                texto_html = texto_analise.replace('\n', '<br>')
+                st.markdown(f"""
+                <div style="
+                    background-color: #f8f9fa;
+                    border-radius: 10px;
+                    padding: 20px;
+                    border: 1px solid #dee2e6;
+                ">
+                    {texto_html}
+                </div>
+                """, unsafe_allow_html=True)
+        else:
+            st.info("📋 Análise qualitativa não foi gerada nesta resposta.")
+    else:
+        # Mostrar resposta completa se não conseguir separar
+        with st.expander("📄 Ver análise completa"):
+            resposta_html = resultado["resposta"].replace('\n', '<br>')
+            st.markdown(f"""
+            <div style="
+                background-color: #f8f9fa;
+                border-radius: 10px;
+                padding: 20px;
+                border: 1px solid #dee2e6;
+            ">
+                {resposta_html}
+            </div>
+            """, unsafe_allow_html=True)
+
+    # Download dos resultados (o rerun do clique redesenha a partir da sessão)
+    st.markdown("### 💾 **Download dos Resultados**")
+
+    st.download_button(
+        label="📥 Baixar dados em CSV",
+        data=visualizacao["csv"],
+        file_name=f"analise_curriculo_{resultado['arquivo'].replace('.pdf', '')}.csv",
+        mime="text/csv"
+    )
+
+def renderizar_erro(erro):
+    """Mensagem de uma análise que falhou"""
+    if erro["tipo"] is None:
+        st.error(f"❌ {erro['mensagem']}")
+        if erro["dica"]:
+            st.info(erro["dica"])
+        if erro["detalhe"]:
+            with st.expander("🔍 Ver resposta completa da IA"):
+                st.text(erro["detalhe"])
+        return
+
+    st.error(f"❌ **Erro durante a análise:** {erro['mensagem']}")
+    st.info("Tente novamente ou verifique se o arquivo está correto.")
+
+    # Debug info
+    with st.expander("🔧 Informações de debug"):
+        st.text(f"Erro: {erro['tipo']}")
+        st.text(f"Detalhes: {erro['mensagem']}")
+        st.text(f"Python: {sys.version}")
+
+def lembrar_tarefa(tarefa_id):
+    """Guarda a análise da sessão também na URL, para reencontrá-la depois de recarregar a página"""
+    st.session_state["tarefa_analise"] = tarefa_id
+    st.query_params["tarefa"] = tarefa_id
+
+def esquecer_tarefa():
+    st.session_state.pop("tarefa_analise", None)
+    st.query_params.pop("tarefa", None)
+
+def painel_progresso(tarefa_id):
+    """Progresso e resultados parciais da análise em andamento"""
+    tarefa = fila_tarefas.obter(tarefa_id)
+    if tarefa is None or tarefa.encerrada:
+        # Terminou: o rerun completo mostra o resultado final
+        st.rerun()
+    estado = tarefa.instantaneo()
+
+    st.progress(estado["progresso"])
+    if estado["estado"] == tarefas.NA_FILA:
+        st.text(f"⏳ Aguardando vaga no servidor: posição {fila_tarefas.posicao(tarefa_id)} na fila")
+    else:
+        st.text(estado["mensagem"])
+    st.caption("A análise continua no servidor mesmo se você interagir com a página ou recarregá-la.")
+
+    competencias_parciais = estado["parcial"].get("competencias")
+    if competencias_parciais:
+        st.dataframe(pd.DataFrame(competencias_parciais), use_container_width=True)
+    texto_qualitativo = estado["parcial"].get("texto_qualitativo")
+    if texto_qualitativo:
+        renderizar_qualitativa_parcial(st.empty(), texto_qualitativo)
+
+# Com st.fragment só o painel é re-executado a cada consulta; sem ele, o script inteiro
+if hasattr(st, "fragment"):
+    painel_progresso = st.fragment(run_every=0.5)(painel_progresso)
+
+def acompanhar_tarefa(tarefa_id):
+    """Mostra o progresso da análise da sessão ou, quando terminar, o resultado
+
+    Retorna False se a tarefa não existe mais no servidor.
+    """
+    tarefa = fila_tarefas.obter(tarefa_id)
+    if tarefa is None:
+        esquecer_tarefa()
+        return False
+    if not tarefa.encerrada:
+        painel_progresso(tarefa_id)
+        if not hasattr(st, "fragment"):
+            time.sleep(0.5)
+            st.rerun()
+        return True
+
+    estado = tarefa.instantaneo()
+    if estado["erro"]:
+        renderizar_erro(estado["erro"])
+        # Sem dispensar, o id na URL traria o erro de volta a cada rerun e recarga
+        if st.button("Fechar", key=f"fechar_erro_{tarefa_id}"):
+            esquecer_tarefa()
+            st.rerun()
+        return True
+    # Resultado passa para a sessão: daqui em diante os reruns redesenham a partir dela
+    chave = estado["resultado"]["chave_sessao"]
+    if chave not in resultados_sessao:
+        resultados_sessao.guardar(chave, preparar_visualizacao(estado["resultado"]))
+    st.session_state["analise_exibida"] = chave
+    renderizar_resultado(resultados_sessao.obter(chave))
+    return True
+
+resultados_sessao = st.session_state.setdefault("resultados_sessao", ResultadosSessao())
+
+# Processamento principal
+if uploaded_file and api_key:
+    # Botão de análise: a análise roda na fila do servidor e sobrevive aos reruns desta página
+    if st.button("🔍 Analisar Currículo", type="primary", use_container_width=True):
+        chave_upload = chave_resultado(hash_documento(uploaded_file.getbuffer()), saida_estruturada)
+        # Uma nova análise substitui a anterior (inclusive um erro ainda na tela), mesmo se a fila recusar
+        esquecer_tarefa()
+        if chave_upload in resultados_sessao:
+            # Já analisado nesta sessão: só exibir de novo
+            st.session_state["analise_exibida"] = chave_upload
+        else:
+            try:
+                lembrar_tarefa(fila_tarefas.submeter(
+                    executar_analise, uploaded_file.getvalue(), uploaded_file.name, api_key, saida_estruturada,
+                    descricao=uploaded_file.name
+                ))
+            except FilaCheia as e:
+                st.error(f"❌ {str(e)}")
+
+tarefa_atual = st.session_state.get("tarefa_analise") or st.query_params.get("tarefa")
+if not tarefa_atual or not acompanhar_tarefa(tarefa_atual):
+    analise_exibida = resultados_sessao.obter(st.session_state.get("analise_exibida"))
+    if analise_exibida is not None:
+        renderizar_resultado(analise_exibida)
+    elif tarefa_atual:
+        st.info("⌛ A análise anterior não está mais disponível no servidor. Envie o currículo novamente.")
+
+renderizar_rodape()
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""Pacote de apoio do Assistente de Análise InternReady
+
+A API do pipeline pode ser usada sem Streamlit (workers, cron, CLI):
+
+    from internready import extract_text, analyze, parse_competencias, parse_qualitativa
+
+Linha de comando: ``python -m internready --help``.
+"""
+
+from .pipeline import (
+    analyze, analyze_pdf, analyze_stream, extract_text, interpretar_resposta, parse_competencias,
+    parse_qualitativa,
+)
+
+__all__ = [
+    "analyze", "analyze_pdf", "analyze_stream", "extract_text", "interpretar_resposta", "parse_competencias",
+    "parse_qualitativa",
+]
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""Linha de comando: analisa currículos em PDF sem abrir a interface Streamlit
+
+Exemplos:
+    python -m internready cv.pdf
+    python -m internready curriculos.zip --saida resultados.csv
+    python -m internready --diretorio ./turma_2025 --saida resultados.json
+
+Pela Batch API (sem chamadas síncronas):
+    python -m internready --diretorio ./turma_2025 --gerar-lote requisicoes.jsonl
+    python -m internready --ingerir-lote saida.jsonl --manifesto requisicoes.jsonl.manifesto.json \
+        --saida resultados.csv
+
+Cache de prefixo do prompt nas chamadas registradas no log de métricas:
+    python -m internready --relatorio-cache
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+
+def _montar_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m internready",
+        description="Analisa currículos em PDF e grava os resultados em JSON ou CSV.",
+    )
+    parser.add_argument("arquivos", nargs="*", help="PDFs ou arquivos ZIP com PDFs")
+    parser.add_argument("--diretorio", help="diretório com PDFs (percorrido recursivamente)")
+    parser.add_argument("--saida", help="arquivo de saída (.json ou .csv); padrão: JSON na saída padrão")
+    parser.add_argument("--formato", choices=["json", "csv"], help="formato de saída (padrão: pela extensão)")
+    parser.add_argument("--api-key", default=os.environ.get("OPENAI_API_KEY"),
+                        help="chave da API OpenAI (padrão: $OPENAI_API_KEY)")
+    parser.add_argument("--concorrencia", type=int, help="chamadas simultâneas à API")
+    parser.add_argument("--estruturado", action="store_true",
+                        help="usa saída estruturada (JSON Schema) em vez de texto livre")
+    parser.add_argument("--cascata", action="store_true",
+                        help="passa cada currículo pela cascata de backends (INTERNREADY_ROTEADOR_BACKENDS)")
+    parser.add_argument("--sem-cache", action="store_true", help="não consulta nem grava o cache de análises")
+    parser.add_argument("--sem-historico", action="store_true", help="não grava as análises no histórico")
+    parser.add_argument("--gerar-lote", metavar="REQUISICOES",
+                        help="grava as requisições da Batch API (JSONL) e o manifesto, sem chamar o modelo")
+    parser.add_argument("--ingerir-lote", metavar="SAIDA", help="lê o JSONL de saída de um lote da Batch API")
+    parser.add_argument("--manifesto", help="manifesto gerado com --gerar-lote (usado com --ingerir-lote)")
+    parser.add_argument("--relatorio-cache", nargs="?", const="", metavar="LOG",
+                        help="resume o cache de prefixo do prompt no log de métricas "
+                             "(padrão: INTERNREADY_METRICAS_LOG)")
+    return parser
+
+
+def _gerar_lote(args, lote):
+    from . import lote_offline
+
+    itens = lote.coletar_pdfs(caminhos=args.arquivos, diretorio=args.diretorio)
+    if not itens:
+        print("Nenhum PDF encontrado.", file=sys.stderr)
+        return 1
+
+    def ao_extrair(nome, erro):
+        print(f"[{'erro' if erro else 'ok'}] {nome}{': ' + erro if erro else ''}", file=sys.stderr)
+
+    manifesto = lote_offline.gerar_requisicoes(itens, args.gerar_lote, estruturado=args.estruturado,
+                                               ao_extrair=ao_extrair)
+    print(f"{len(manifesto['requisicoes'])} requisições em {args.gerar_lote}; "
+          f"manifesto em {lote_offline.caminho_manifesto(args.gerar_lote)}", file=sys.stderr)
+    return 1 if manifesto["erros"] else 0
+
+
+def _ingerir_lote(args, lote):
+    from . import lote_offline
+
+    manifesto = lote_offline.ler_manifesto(args.manifesto)
+    cache = None
+    if not args.sem_cache:
+        from .cache import CacheAnalises
+        cache = CacheAnalises()
+    historico = None
+    if not args.sem_historico:
+        from .historico import HistoricoAnalises
+        historico = HistoricoAnalises()
+
+    formato = args.formato or ("csv" if args.saida and args.saida.lower().endswith(".csv") else "json")
+    saida = open(args.saida, "w", encoding="utf-8", newline="") if args.saida else sys.stdout
+    falhas = 0
+    pendentes = []  # registros do histórico gravados em blocos
+    json_resultados = []
+    try:
+        resultados = lote_offline.ingerir(args.ingerir_lote, manifesto, cache=cache)
+        if formato == "csv":
+            resultados = lote_offline.gravar_csv(resultados, saida)
+        for resultado in resultados:
+            if resultado["status"] == lote.ERRO:
+                falhas += 1
+                print(f"[erro] {resultado['arquivo']}: {resultado['erro']}", file=sys.stderr)
+            if historico is not None:
+                pendentes.extend(lote.registros_historico([resultado], manifesto["estruturado"]))
+                if len(pendentes) >= 500:
+                    historico.gravar_lote(pendentes)
+                    pendentes = []
+            if formato == "json":
+                json_resultados.append({k: resultado[k] for k in ("arquivo", "status", "erro", "competencias",
+                                                                  "qualitativa")})
+        if historico is not None and pendentes:
+            historico.gravar_lote(pendentes)
+        if formato == "json":
+            saida.write(json.dumps(json_resultados, ensure_ascii=False, indent=2) + "\n")
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+    return 1 if falhas else 0
+
+
+def _relatorio_cache(args):
+    from . import metricas
+
+    try:
+        relatorio = metricas.relatorio_cache_prefixo(metricas.ler_log(args.relatorio_cache or None))
+    except FileNotFoundError as e:
+        print(f"Log de métricas não encontrado: {e.filename}", file=sys.stderr)
+        return 1
+    if args.formato == "json":
+        print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+        return 0
+
+    def linha(nome, r):
+        latencia = r["latencia_economizada_s"]
+        custo = r["custo_economizado_usd"]
+        return (f"{nome}: {r['acertos']}/{r['chamadas']} chamadas com acerto ({r['taxa_acerto']:.0%}) · "
+                f"{r['tokens_cached']}/{r['tokens_prompt']} tokens de prompt em cache ({r['fracao_tokens']:.0%}) · "
+                f"latência economizada {'-' if latencia is None else f'{latencia:.1f} s'} · "
+                f"custo economizado {'-' if custo is None else f'US$ {custo:.4f}'}")
+
+    for modelo, r in relatorio["por_modelo"].items():
+        print(linha(modelo, r))
+    print(linha("total", relatorio))
+    return 0
+
+
+def main(argv=None):
+    args = _montar_parser().parse_args(argv)
+    if args.relatorio_cache is not None:
+        return _relatorio_cache(args)
+    if args.ingerir_lote:
+        if not args.manifesto:
+            _montar_parser().error("--ingerir-lote exige --manifesto")
+        from . import lote
+        return _ingerir_lote(args, lote)
+    if not args.arquivos and not args.diretorio:
+        _montar_parser().error("informe ao menos um arquivo ou --diretorio")
+    if args.gerar_lote:
+        from . import lote
+        return _gerar_lote(args, lote)
+    if not args.api_key:
+        _montar_parser().error("informe --api-key ou defina OPENAI_API_KEY")
+
+    from . import lote
+
+    itens = lote.coletar_pdfs(caminhos=args.arquivos, diretorio=args.diretorio)
+    if not itens:
+        print("Nenhum PDF encontrado.", file=sys.stderr)
+        return 1
+
+    cache = None
+    if not args.sem_cache:
+        from .cache import CacheAnalises
+        cache = CacheAnalises()
+
+    def ao_atualizar(resultado):
+        if resultado["status"] in (lote.CONCLUIDO, lote.ERRO):
+            detalhe = resultado["erro"] or ("cache" if resultado["do_cache"] else "ok")
+            print(f"[{resultado['status']}] {resultado['arquivo']}: {detalhe}", file=sys.stderr)
+
+    roteador = None
+    if args.cascata:
+        from .roteador import Roteador
+        roteador = Roteador()
+
+    from .limites import AgendadorLimites
+    from .metricas import Rastreador, RegistroMetricas
+
+    rastreador = Rastreador(RegistroMetricas(), modo="cli", estruturado=args.estruturado, arquivos=len(itens))
+    with rastreador.etapa("lote"):
+        resultados = asyncio.run(lote.analisar_lote(
+            itens, args.api_key, max_concorrencia=args.concorrencia, cache=cache, ao_atualizar=ao_atualizar,
+            estruturado=args.estruturado, roteador=roteador, agendador=AgendadorLimites(),
+        ))
+    for resultado in resultados:
+        for chamada in resultado["chamadas"]:
+            rastreador.chamada(**chamada)
+    rastreador.finalizar("ok" if any(r["status"] == lote.CONCLUIDO for r in resultados) else "erro")
+    if roteador is not None:
+        for nome, e in roteador.estatisticas().items():
+            print(f"[cascata] {nome}: {e['chamadas']} chamadas, {e['taxa_escalacao']:.0%} escaladas, "
+                  f"p95 {e['latencia_p95_s']:.2f} s", file=sys.stderr)
+
+    if not args.sem_historico:
+        from .historico import HistoricoAnalises
+        HistoricoAnalises().gravar_lote(lote.registros_historico(resultados, args.estruturado))
+
+    formato = args.formato or ("csv" if args.saida and args.saida.lower().endswith(".csv") else "json")
+    if formato == "csv":
+        conteudo = lote.resultados_para_dataframe(resultados).to_csv(index=False)
+    else:
+        conteudo = json.dumps([
+            {
+                "arquivo": r["arquivo"],
+                "status": r["status"],
+                "erro": r["erro"],
+                "do_cache": r["do_cache"],
+                "compressao": r["compressao"],
+                "competencias": r["competencias"],
+                "qualitativa": r["qualitativa"],
+            }
+            for r in resultados
+        ], ensure_ascii=False, indent=2)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8", newline="") as f:
+            f.write(conteudo)
+    else:
+        sys.stdout.write(conteudo + "\n")
+
+    # Código de saída diferente de zero se algum arquivo falhou (útil em cron)
+    return 1 if any(r["status"] == lote.ERRO for r in resultados) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
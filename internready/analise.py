@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""Prompt da análise e interpretação da resposta do modelo"""
+
+import hashlib
+import json
+
+from .parser_incremental import separar_resposta
+from .parser_qualitativo import dividir_pontos, ler_secoes  # noqa: F401 (dividir_pontos é reexportado)
+from .taxonomia import TAXONOMIA
+
+# Configuração do modelo (alterações no prompt devem incrementar PROMPT_VERSAO)
+MODELO = "gpt-4o-mini"  # Modelo mais estável e econômico
+TEMPERATURA = 0.3
+MAX_TOKENS = 2500
+PROMPT_VERSAO = "4"
+
+# O prompt é dividido em um prefixo fixo (mensagem de sistema, idêntica em todas as chamadas) e no
+# currículo (mensagem do usuário). Provedores com cache de prompt reaproveitam o prefixo já processado
+# e cobram esses tokens com desconto, mas só a partir de 1024 tokens de prefixo: por isso tudo o que é
+# estável (critérios de nota, nomes de competência e exemplo de resposta) fica nele, e nada que varie
+# por chamada pode entrar.
+
+# Critérios de nota, alinhados às faixas de NIVEIS_LABELS
+RUBRICA_PONTUACAO = """Critérios de pontuação (use a escala inteira, de 0 a 100):
+- 90-100: domínio comprovado. A competência aparece em experiências profissionais com resultados \
+mensuráveis (valores, prazos, volumes), em cargos ou projetos com responsabilidade própria, e é \
+reforçada por formação ou certificação reconhecida.
+- 80-89: nível alto. Uso recorrente e recente em estágio ou emprego, com entregas concretas descritas, \
+ainda que sem resultados quantificados ou sem certificação.
+- 60-79: nível médio. A competência aparece em projetos acadêmicos, ligas, cursos complementares ou em \
+uma experiência curta; há evidência de uso, mas pouca profundidade ou pouca continuidade.
+- 40-59: nível básico. A competência é apenas mencionada (lista de habilidades, disciplina cursada) sem \
+exemplo de aplicação prática.
+- 0-39: evidência mínima ou indireta. Use só quando a competência for relevante para a vaga em \
+finanças e o currículo mostrar apenas um indício dela.
+Regras gerais:
+- Avalie somente o que está escrito no currículo; não presuma experiências, ferramentas ou \
+certificações que não aparecem no texto.
+- Pontue cada competência de forma independente: uma nota alta em uma área não aumenta as demais.
+- Experiências mais recentes e mais longas pesam mais que as antigas e pontuais.
+- Certificações (CFA, CPA-10, CPA-20, CEA, FRM) elevam a nota da área correspondente e também contam \
+como competência própria.
+- Idiomas: fluente ou com certificado internacional fica acima de 80; intermediário entre 60 e 79; \
+básico abaixo de 60.
+Evidências por tipo de competência:
+- Técnicas de finanças (valuation, modelagem, crédito, riscos): considere o que foi feito, \
+para quem e com que resultado; construir o modelo vale mais que apoiar quem o construiu.
+- Ferramentas (Excel, VBA, Python, SQL, BI): conte a aplicação em tarefas reais, como automações, \
+bases de dados tratadas e painéis entregues; cursos sem aplicação ficam na faixa básica.
+- Comportamentais (comunicação, liderança, trabalho em equipe): exija um exemplo concreto, como \
+liderança de equipe em liga ou empresa júnior, apresentações a clientes ou negociações conduzidas.
+- Formação: considere instituição, curso, desempenho informado e disciplinas ligadas a finanças.
+"""
+
+# Nomes de área da taxonomia, para o modelo já responder com os nomes usados na comparação entre candidatos
+LISTA_COMPETENCIAS = "Nomes de área preferidos (use exatamente estes quando a competência se encaixar):\n" + \
+    "\n".join(f"- {canonica}" for canonica in TAXONOMIA) + "\n"
+
+REGRAS_COMPETENCIAS = """Ao montar a lista de competências:
+- Liste de 6 a 12 competências, da mais forte para a mais fraca.
+- Não repita a mesma competência com nomes diferentes (por exemplo "Modelagem Financeira" e \
+"Financial Modeling"): escolha um nome e dê uma única nota.
+- Ferramentas diferentes são competências diferentes: Excel, VBA, Python, Pandas, SQL, Power BI e \
+Tableau são avaliados separadamente.
+- Quando nenhum nome da lista servir, use um nome curto em português, com inicial maiúscula, sem \
+parênteses nem detalhes de nível.
+"""
+
+PROMPT_SISTEMA = f"""Você é um consultor de carreira especializado em perfis voltados para o setor financeiro. \
+Analise o currículo enviado pelo usuário.
+
+**IMPORTANTE: Responda EXATAMENTE no formato especificado.**
+
+**Parte 1 – Análise Quantitativa (JSON)**
+Identifique as principais áreas de competência e atribua notas de 0 a 100:
+
+[
+  {{"Área": "Nome da Competência", "Pontuação": número}},
+  {{"Área": "Outra Competência", "Pontuação": número}}
+]
+
+**Parte 2 – Análise Qualitativa**
+- **Pontos Fortes:** principais qualidades identificadas (liste 3-5 pontos específicos)
+- **Pontos de Melhoria:** áreas que podem ser desenvolvidas (liste 3-4 sugestões práticas)
+- **Sugestões:** recomendações específicas para o mercado financeiro (liste 4-6 ações concretas)
+
+{RUBRICA_PONTUACAO}
+{REGRAS_COMPETENCIAS}
+{LISTA_COMPETENCIAS}
+Exemplo de resposta completa (para um currículo fictício; o conteúdo deve vir do currículo enviado):
+
+[
+  {{"Área": "Modelagem Financeira", "Pontuação": 85}},
+  {{"Área": "Excel", "Pontuação": 90}},
+  {{"Área": "Valuation", "Pontuação": 75}},
+  {{"Área": "Contabilidade", "Pontuação": 70}},
+  {{"Área": "Python", "Pontuação": 55}},
+  {{"Área": "Inglês", "Pontuação": 80}}
+]
+
+**Pontos Fortes:**
+- Estágio de um ano em banco de investimento com construção de modelos de DCF para três transações
+- Excel avançado aplicado no dia a dia, com automação de relatórios semanais
+- Inglês fluente, com apresentações para clientes estrangeiros
+
+**Pontos de Melhoria:**
+- Python aparece só em disciplina da faculdade, sem projeto aplicado
+- Falta de resultados quantificados nas experiências em contabilidade
+
+**Sugestões:**
+- Iniciar a certificação CFA Nível I para reforçar valuation e análise de investimentos
+- Publicar um projeto de análise de dados financeiros em Python com pandas
+- Incluir números (valores de transações, prazos) na descrição das experiências
+- Buscar um projeto de fusões e aquisições na próxima experiência
+"""
+
+# Parte variável, comum aos dois modos
+PROMPT_USUARIO_TEMPLATE = """Currículo:
+\"\"\"
+{texto_curriculo}
+\"\"\"
+"""
+
+# Modo de saída estruturada: o modelo preenche um JSON Schema estrito em vez de texto livre
+PROMPT_ESTRUTURADO_VERSAO = "4"
+
+PROMPT_ESTRUTURADO_SISTEMA = f"""Você é um consultor de carreira especializado em perfis voltados para o setor \
+financeiro. Analise o currículo enviado pelo usuário.
+
+Identifique as principais áreas de competência e atribua notas de 0 a 100. Liste também:
+- Pontos Fortes: principais qualidades identificadas (3-5 pontos específicos)
+- Pontos de Melhoria: áreas que podem ser desenvolvidas (3-4 sugestões práticas)
+- Sugestões: recomendações específicas para o mercado financeiro (4-6 ações concretas)
+
+{RUBRICA_PONTUACAO}
+{REGRAS_COMPETENCIAS}
+{LISTA_COMPETENCIAS}
+Cada ponto qualitativo é uma frase completa e específica sobre o currículo, por exemplo:
+- Pontos Fortes: "Estágio de um ano em banco de investimento com construção de modelos de DCF para três \
+transações"
+- Pontos de Melhoria: "Python aparece só em disciplina da faculdade, sem projeto aplicado"
+- Sugestões: "Iniciar a certificação CFA Nível I para reforçar valuation e análise de investimentos"
+
+Exemplo de resposta completa (para um currículo fictício; o conteúdo deve vir do currículo enviado):
+{{"competencias": [{{"Área": "Modelagem Financeira", "Pontuação": 85}}, {{"Área": "Excel", "Pontuação": 90}}, \
+{{"Área": "Valuation", "Pontuação": 75}}, {{"Área": "Contabilidade", "Pontuação": 70}}, \
+{{"Área": "Python", "Pontuação": 55}}, {{"Área": "Inglês", "Pontuação": 80}}],
+ "pontos_fortes": ["Estágio de um ano em banco de investimento com construção de modelos de DCF", \
+"Excel avançado com automação de relatórios semanais", "Inglês fluente com apresentações a clientes"],
+ "pontos_de_melhoria": ["Python só em disciplina da faculdade, sem projeto aplicado", \
+"Experiências em contabilidade sem resultados quantificados"],
+ "sugestoes": ["Iniciar a certificação CFA Nível I", "Publicar um projeto de análise de dados em Python", \
+"Incluir números nas experiências", "Buscar um projeto de fusões e aquisições"]}}
+"""
+
+ESQUEMA_ANALISE = {
+    "name": "analise_curriculo",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "additionalProperties": False,
+        "required": ["competencias", "pontos_fortes", "pontos_de_melhoria", "sugestoes"],
+        "properties": {
+            "competencias": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "additionalProperties": False,
+                    "required": ["Área", "Pontuação"],
+                    "properties": {
+                        "Área": {"type": "string"},
+                        "Pontuação": {"type": "number"},
+                    },
+                },
+            },
+            "pontos_fortes": {"type": "array", "items": {"type": "string"}},
+            "pontos_de_melhoria": {"type": "array", "items": {"type": "string"}},
+            "sugestoes": {"type": "array", "items": {"type": "string"}},
+        },
+    },
+}
+
+# Seções qualitativas: ícone, cor e título usados nas abas
+SECOES_CONFIG = {
+    "pontos fortes": {"icone": "💪", "cor": "#28a745", "titulo": "Pontos Fortes"},
+    "pontos de melhoria": {"icone": "📈", "cor": "#ffc107", "titulo": "Pontos de Melhoria"},
+    "sugestões": {"icone": "💡", "cor": "#17a2b8", "titulo": "Sugestões"},
+    "recomendações": {"icone": "🎯", "cor": "#6f42c1", "titulo": "Recomendações"}
+}
+
+# Campo do esquema estruturado correspondente a cada seção
+CAMPOS_ESTRUTURADOS = {
+    "pontos fortes": "pontos_fortes",
+    "pontos de melhoria": "pontos_de_melhoria",
+    "sugestões": "sugestoes",
+}
+
+# Faixas de nível usadas na tabela, nos gráficos e no CSV exportado
+NIVEIS_BINS = [-1, 59.9, 79.9, 100]
+NIVEIS_LABELS = ["🔴 Baixo (0-59%)", "🟡 Médio (60-79%)", "🟢 Alto (80-100%)"]
+
+
+# O prefixo inclui a TAXONOMIA: o resumo dele na versão muda a chave de cache quando ela muda
+_RESUMO_PREFIXO = {
+    estruturado: hashlib.sha256(prefixo.encode("utf-8")).hexdigest()[:8]
+    for estruturado, prefixo in ((False, PROMPT_SISTEMA), (True, PROMPT_ESTRUTURADO_SISTEMA))
+}
+
+
+def versao_prompt(estruturado=False):
+    """Versão do prompt usada na chave de cache de cada modo"""
+    versao = f"estruturado-{PROMPT_ESTRUTURADO_VERSAO}" if estruturado else PROMPT_VERSAO
+    return f"{versao}.{_RESUMO_PREFIXO[estruturado]}"
+
+
+def prefixo_prompt(estruturado=False):
+    """Instruções fixas do modo (mensagem de sistema), o prefixo aproveitado pelo cache de prompt"""
+    return PROMPT_ESTRUTURADO_SISTEMA if estruturado else PROMPT_SISTEMA
+
+
+def montar_prompt(texto_curriculo):
+    """Parte variável do prompt: o texto do currículo entre aspas triplas"""
+    return PROMPT_USUARIO_TEMPLATE.format(texto_curriculo=texto_curriculo)
+
+
+def montar_mensagens(texto_curriculo, estruturado=False):
+    """Mensagens enviadas em chat.completions.create: prefixo fixo primeiro, currículo no final"""
+    return [
+        {"role": "system", "content": prefixo_prompt(estruturado)},
+        {"role": "user", "content": montar_prompt(texto_curriculo)},
+    ]
+
+
+def parametros_chamada(texto_curriculo, estruturado=False, modelo=None, temperatura=None, max_tokens=None):
+    """Argumentos de chat.completions.create para o modo escolhido (modelo e amostragem sobrescrevíveis)"""
+    parametros = {
+        "model": modelo or MODELO,
+        "messages": montar_mensagens(texto_curriculo, estruturado),
+        "temperature": TEMPERATURA if temperatura is None else temperatura,
+        "max_tokens": max_tokens or MAX_TOKENS,
+    }
+    if estruturado:
+        parametros["response_format"] = {"type": "json_schema", "json_schema": ESQUEMA_ANALISE}
+    return parametros
+
+
+def extrair_json_robusto(texto):
+    """Extrai a lista de objetos de competência da resposta em uma única passada"""
+    return separar_resposta(texto)[0]
+
+
+def validar_competencias(dados_json):
+    """Mantém apenas itens com Área e Pontuação numérica entre 0 e 100"""
+    dados_validos = []
+    for item in dados_json or []:
+        if isinstance(item, dict) and "Área" in item and "Pontuação" in item:
+            try:
+                pontuacao = float(item["Pontuação"])
+                if 0 <= pontuacao <= 100:
+                    dados_validos.append({
+                        "Área": str(item["Área"]).strip(),
+                        "Pontuação": pontuacao
+                    })
+            except (ValueError, TypeError):
+                continue
+    return dados_validos
+
+
+def processar_analise_qualitativa(texto_analise):
+    """Seções da análise qualitativa como {seção: {"conteudo", "config"}}, ou None"""
+    secoes = ler_secoes(texto_analise)
+    return {
+        secao: {"conteudo": conteudo, "config": SECOES_CONFIG[secao]} for secao, conteudo in secoes.items()
+    } or None
+
+
+def separar_texto_qualitativo(resposta_completa):
+    """Texto após o JSON de competências, ou None se a resposta não tiver o array"""
+    return separar_resposta(resposta_completa)[1]
+
+
+def interpretar_estruturada(resposta_completa):
+    """Lê a resposta do modo estruturado: (objetos de competência ou None, {seção: [pontos]})"""
+    try:
+        dados = json.loads(resposta_completa)
+    except (json.JSONDecodeError, TypeError):
+        return None, {}
+    if not isinstance(dados, dict):
+        return None, {}
+    secoes = {}
+    for secao, campo in CAMPOS_ESTRUTURADOS.items():
+        pontos = [str(p).strip() for p in dados.get(campo) or [] if str(p).strip()]
+        if pontos:
+            secoes[secao] = pontos
+    return dados.get("competencias") or None, secoes
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""Pré-aquecimento do servidor: bibliotecas pesadas e cache de fontes
+
+Na subida do servidor (INTERNREADY_PREAQUECER=1), uma thread de fundo
+importa openai, fitz, pandas e o Matplotlib e desenha um gráfico mínimo,
+o que monta o cache de fontes. A página inicial não espera por isso; o
+primeiro upload e o primeiro gráfico encontram tudo já carregado.
+"""
+
+import importlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MODULOS_PESADOS = ("openai", "fitz", "pandas", "matplotlib.figure", "matplotlib.backends.backend_agg")
+
+_lock = threading.Lock()
+_thread = None
+tempos = {}
+
+
+def preaquecer(modulos=MODULOS_PESADOS):
+    """Importa os módulos e aquece os gráficos; devolve o tempo (s) de cada etapa"""
+    for modulo in modulos:
+        inicio = time.perf_counter()
+        try:
+            importlib.import_module(modulo)
+        except ImportError as e:
+            logger.warning("pré-aquecimento: %s indisponível (%s)", modulo, e)
+            continue
+        tempos[modulo] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    try:
+        from . import graficos
+        graficos.aquecer()
+    except Exception as e:
+        logger.warning("pré-aquecimento dos gráficos falhou: %s", e)
+    else:
+        tempos["graficos"] = time.perf_counter() - inicio
+
+    logger.info("pré-aquecimento: %s", ", ".join(f"{m}={t:.3f}s" for m, t in tempos.items()))
+    return dict(tempos)
+
+
+def iniciar_preaquecimento(modulos=MODULOS_PESADOS):
+    """Dispara o pré-aquecimento em uma thread daemon (uma única vez por processo)"""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=preaquecer, args=(modulos,), name="internready-preaquecimento",
+                                       daemon=True)
+            _thread.start()
+        return _thread
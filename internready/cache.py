@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Cache de análises em dois níveis: LRU em memória + SQLite em disco"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from . import config
+
+
+def hash_documento(dados_pdf):
+    """SHA-256 do conteúdo do PDF"""
+    return hashlib.sha256(dados_pdf).hexdigest()
+
+
+def chave_analise(dados_pdf, modelo, temperatura, max_tokens, versao_prompt, versao_extracao):
+    """Gera a chave de cache a partir do conteúdo do PDF, da configuração do modelo e dos limites de extração"""
+    h = hash_documento(dados_pdf)
+    return f"{h}:{modelo}:{temperatura}:{max_tokens}:{versao_prompt}:{versao_extracao}"
+
+
+class CacheAnalises:
+    """Guarda respostas do modelo com TTL e limite de tamanho em cada nível"""
+
+    def __init__(self, caminho_db=None, max_memoria=None, max_disco=None, ttl_segundos=None):
+        self.caminho_db = caminho_db or config.CACHE_CAMINHO_DB
+        self.max_memoria = max_memoria if max_memoria is not None else config.CACHE_MAX_MEMORIA
+        self.max_disco = max_disco if max_disco is not None else config.CACHE_MAX_DISCO
+        self.ttl_segundos = ttl_segundos if ttl_segundos is not None else config.CACHE_TTL_SEGUNDOS
+
+        self._lru = OrderedDict()  # chave -> (criado_em, resposta)
+        self._lock = threading.Lock()
+
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+
+        if self.caminho_db != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.caminho_db)), exist_ok=True)
+        self._conn = sqlite3.connect(self.caminho_db, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS analises (
+                chave TEXT PRIMARY KEY,
+                resposta TEXT NOT NULL,
+                criado_em REAL NOT NULL,
+                acessado_em REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_analises_acessado ON analises (acessado_em)")
+        self._conn.commit()
+
+    def _expirado(self, criado_em, agora):
+        return self.ttl_segundos > 0 and agora - criado_em > self.ttl_segundos
+
+    def _guardar_memoria(self, chave, criado_em, resposta):
+        self._lru[chave] = (criado_em, resposta)
+        self._lru.move_to_end(chave)
+        while len(self._lru) > self.max_memoria:
+            self._lru.popitem(last=False)
+
+    def obter(self, chave):
+        """Retorna a resposta guardada ou None em caso de falha/expiração"""
+        agora = time.time()
+        with self._lock:
+            item = self._lru.get(chave)
+            if item is not None:
+                if not self._expirado(item[0], agora):
+                    self._lru.move_to_end(chave)
+                    self.acertos_memoria += 1
+                    return item[1]
+                del self._lru[chave]
+
+            linha = self._conn.execute(
+                "SELECT resposta, criado_em FROM analises WHERE chave = ?", (chave,)
+            ).fetchone()
+            if linha is not None:
+                resposta, criado_em = linha
+                if not self._expirado(criado_em, agora):
+                    self._conn.execute(
+                        "UPDATE analises SET acessado_em = ? WHERE chave = ?", (agora, chave)
+                    )
+                    self._conn.commit()
+                    self._guardar_memoria(chave, criado_em, resposta)
+                    self.acertos_disco += 1
+                    return resposta
+                self._conn.execute("DELETE FROM analises WHERE chave = ?", (chave,))
+                self._conn.commit()
+
+            self.falhas += 1
+            return None
+
+    def gravar(self, chave, resposta):
+        """Grava a resposta nos dois níveis e aplica as políticas de despejo"""
+        agora = time.time()
+        with self._lock:
+            self._guardar_memoria(chave, agora, resposta)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analises (chave, resposta, criado_em, acessado_em) VALUES (?, ?, ?, ?)",
+                (chave, resposta, agora, agora)
+            )
+            if self.ttl_segundos > 0:
+                self._conn.execute(
+                    "DELETE FROM analises WHERE criado_em < ?", (agora - self.ttl_segundos,)
+                )
+            # Despejo por tamanho: remove as entradas acessadas há mais tempo
+            self._conn.execute("""
+                DELETE FROM analises WHERE chave IN (
+                    SELECT chave FROM analises ORDER BY acessado_em DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_disco,))
+            self._conn.commit()
+
+    def limpar(self):
+        """Remove todas as entradas e zera os contadores"""
+        with self._lock:
+            self._lru.clear()
+            self._conn.execute("DELETE FROM analises")
+            self._conn.commit()
+            self.acertos_memoria = self.acertos_disco = self.falhas = 0
+
+    def estatisticas(self):
+        """Contadores de acerto/falha e ocupação de cada nível"""
+        with self._lock:
+            total_disco = self._conn.execute("SELECT COUNT(*) FROM analises").fetchone()[0]
+            return {
+                "acertos_memoria": self.acertos_memoria,
+                "acertos_disco": self.acertos_disco,
+                "falhas": self.falhas,
+                "itens_memoria": len(self._lru),
+                "itens_disco": total_disco,
+            }
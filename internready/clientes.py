@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Registro de clientes OpenAI reutilizáveis com pool HTTP compartilhado
+
+Cada chave de API ganha um cliente OpenAI guardado pelo hash da chave (a
+chave em si não fica como índice). Todos os clientes usam o mesmo
+httpx.Client (o DefaultHttpxClient do SDK, com timeout e limites
+explícitos), de modo que conexões TLS abertas numa análise ficam vivas
+(keep-alive) para as seguintes. Como o pool atende todas as chaves, ele
+não guarda cookies: o que uma conta recebe não acompanha a outra. Clientes ociosos há mais de
+CLIENTE_OCIOSO_SEGUNDOS são descartados.
+
+O transporte registra, via trace do httpcore, quanto tempo cada
+requisição gastou abrindo conexão TCP e negociando TLS; medir() expõe
+esses tempos por chamada.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+
+from . import config
+
+_EVENTOS_CONEXAO = {
+    "connection.connect_tcp": "tcp_s",
+    "connection.start_tls": "tls_s",
+}
+
+
+def hash_chave(api_key):
+    """Identificador do cliente: SHA-256 da chave de API"""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+
+
+def _nova_medicao():
+    return {"requisicoes": 0, "conexoes_novas": 0, "tcp_s": 0.0, "tls_s": 0.0}
+
+
+class RegistroClientes:
+    """Clientes OpenAI por hash de chave, sobre um único pool de conexões"""
+
+    def __init__(self, max_conexoes=None, max_keepalive=None, keepalive_segundos=None, ocioso_segundos=None,
+                 max_clientes=None, timeout_segundos=None, base_url=None):
+        self.max_conexoes = max_conexoes or config.CLIENTE_MAX_CONEXOES
+        self.max_keepalive = max_keepalive or config.CLIENTE_MAX_KEEPALIVE
+        self.keepalive_segundos = keepalive_segundos or config.CLIENTE_KEEPALIVE_SEGUNDOS
+        self.ocioso_segundos = ocioso_segundos if ocioso_segundos is not None else config.CLIENTE_OCIOSO_SEGUNDOS
+        self.max_clientes = max_clientes or config.CLIENTE_MAX
+        self.timeout_segundos = timeout_segundos or config.CLIENTE_TIMEOUT_SEGUNDOS
+        self.base_url = base_url
+
+        self._clientes = OrderedDict()  # hash da chave -> (último uso, cliente)
+        self._lock = threading.Lock()
+        self._http = None
+        self._local = threading.local()
+
+        self.criados = 0
+        self.reutilizados = 0
+        self.descartados = 0
+        self._totais = _nova_medicao()
+
+    # --- pool HTTP -------------------------------------------------------
+
+    def _trace(self, evento, info):
+        # Chamado pelo httpcore na thread da requisição
+        prefixo, _, fase = evento.rpartition(".")
+        campo = _EVENTOS_CONEXAO.get(prefixo)
+        if campo is None:
+            return
+        inicio = self._local.__dict__.setdefault("inicios", {})
+        if fase == "started":
+            inicio[campo] = time.perf_counter()
+        elif fase == "complete" and campo in inicio:
+            duracao = time.perf_counter() - inicio.pop(campo)
+            with self._lock:
+                self._totais[campo] += duracao
+                if campo == "tcp_s":
+                    self._totais["conexoes_novas"] += 1
+            for medicao in getattr(self._local, "medicoes", ()):
+                medicao[campo] += duracao
+                if campo == "tcp_s":
+                    medicao["conexoes_novas"] += 1
+
+    def _registrar_requisicao(self):
+        with self._lock:
+            self._totais["requisicoes"] += 1
+        for medicao in getattr(self._local, "medicoes", ()):
+            medicao["requisicoes"] += 1
+
+    def _cliente_http(self):
+        if self._http is None:
+            import httpx
+            from openai import DefaultHttpxClient
+
+            registro = self
+
+            class TransporteMedido(httpx.HTTPTransport):
+                """HTTPTransport que liga o trace de conexão em cada requisição"""
+
+                def handle_request(self, request):
+                    registro._registrar_requisicao()
+                    request.extensions = {**request.extensions, "trace": registro._trace}
+                    return super().handle_request(request)
+
+            limites = httpx.Limits(
+                max_connections=self.max_conexoes,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_segundos,
+            )
+            self._http = DefaultHttpxClient(
+                transport=TransporteMedido(limits=limites),
+                timeout=httpx.Timeout(self.timeout_segundos, connect=10.0),
+                cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),  # recusa todo cookie
+            )
+        return self._http
+
+    # --- clientes --------------------------------------------------------
+
+    def _descartar_ociosos(self, agora):
+        while self._clientes:
+            chave, (ultimo_uso, _) = next(iter(self._clientes.items()))
+            if len(self._clientes) <= self.max_clientes and agora - ultimo_uso <= self.ocioso_segundos:
+                break
+            # O cliente não é fechado: fechar encerraria o pool HTTP compartilhado
+            del self._clientes[chave]
+            self.descartados += 1
+
+    def obter(self, api_key, base_url=None):
+        """Cliente OpenAI da chave (e do servidor base_url), criado na primeira vez e reutilizado depois"""
+        base_url = base_url or self.base_url
+        chave = hash_chave(api_key) if base_url is None else f"{hash_chave(api_key)}@{base_url}"
+        agora = time.monotonic()
+        with self._lock:
+            self._descartar_ociosos(agora)
+            item = self._clientes.get(chave)
+            if item is not None:
+                self._clientes[chave] = (agora, item[1])
+                self._clientes.move_to_end(chave)
+                self.reutilizados += 1
+                return item[1]
+
+            from openai import OpenAI
+            cliente = OpenAI(api_key=api_key, base_url=base_url, http_client=self._cliente_http())
+            self._clientes[chave] = (agora, cliente)
+            self.criados += 1
+            self._descartar_ociosos(agora)
+            return cliente
+
+    @contextmanager
+    def medir(self):
+        """Tempos de conexão das requisições feitas nesta thread dentro do bloco"""
+        medicao = _nova_medicao()
+        medicoes = self._local.__dict__.setdefault("medicoes", [])
+        medicoes.append(medicao)
+        try:
+            yield medicao
+        finally:
+            medicoes.remove(medicao)
+            medicao["conexao_s"] = medicao["tcp_s"] + medicao["tls_s"]
+
+    def estatisticas(self):
+        """Contadores do registro e do pool de conexões"""
+        with self._lock:
+            totais = dict(self._totais)
+            return {
+                "clientes": len(self._clientes),
+                "criados": self.criados,
+                "reutilizados": self.reutilizados,
+                "descartados": self.descartados,
+                **totais,
+                "conexoes_reusadas": max(totais["requisicoes"] - totais["conexoes_novas"], 0),
+                "conexao_s": totais["tcp_s"] + totais["tls_s"],
+            }
+
+    def fechar(self):
+        """Descarta os clientes e encerra o pool HTTP"""
+        with self._lock:
+            self._clientes.clear()
+            if self._http is not None:
+                self._http.close()
+                self._http = None
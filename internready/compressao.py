@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""Compressão do currículo por seções, priorizando o que mais pesa na análise
+
+As linhas vêm de get_text("dict") do PyMuPDF, com tamanho de fonte e
+negrito de cada linha. Os títulos de seção são reconhecidos pelo texto
+e pelo destaque visual; as seções de maior valor entram primeiro no
+orçamento de tokens e o texto final mantém a ordem do documento.
+"""
+
+import logging
+import re
+import unicodedata
+from collections import Counter
+
+from .extracao import CARACTERES_POR_TOKEN, estimar_tokens
+
+logger = logging.getLogger(__name__)
+
+# Seção -> (prioridade, títulos que a identificam); prioridade menor entra antes no orçamento
+SECOES = {
+    "experiencia": (1, (
+        "experiência profissional", "experiências profissionais", "experiência", "experiências",
+        "histórico profissional", "estágios", "estágio", "work experience", "experience",
+    )),
+    "formacao": (2, (
+        "formação acadêmica", "formação", "educação", "escolaridade", "education",
+    )),
+    "habilidades": (3, (
+        "habilidades", "competências", "conhecimentos técnicos", "conhecimentos", "ferramentas", "skills",
+    )),
+    "certificacoes": (4, (
+        "certificações", "certificados", "cursos complementares", "cursos", "certifications",
+    )),
+    "projetos": (5, ("projetos", "projects")),
+    "idiomas": (6, ("idiomas", "línguas", "languages")),
+    "atividades": (7, (
+        "atividades extracurriculares", "extracurriculares", "atividades", "voluntariado", "ligas",
+    )),
+    "resumo": (8, ("resumo profissional", "resumo", "objetivo", "perfil", "sobre mim", "summary", "objective")),
+}
+PRIORIDADE_CABECALHO = 9  # nome e contato, antes do primeiro título
+
+
+def _sem_acentos(texto):
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+
+
+# Títulos mais longos primeiro, para "experiência profissional" vencer "experiência"
+_TITULOS = sorted(
+    ((_sem_acentos(titulo), chave) for chave, (_, titulos) in SECOES.items() for titulo in titulos),
+    key=lambda item: -len(item[0]),
+)
+_MAX_CARACTERES_TITULO = 50
+# Linhas curtas já vistas em páginas anteriores (contato, cabeçalho e rodapé) aparecem uma só vez
+_MAX_CARACTERES_REPETIDA = 80
+# Abaixo disso uma seção cortada não vale o espaço que ocupa
+_MIN_TOKENS_CORTE = 16
+
+_RE_ESPACOS = re.compile(r"[ \t\u00a0\u2002-\u200b]+")
+_RE_MARCADOR = re.compile(r"^[•▪●◦■►‣∙·\uf0b7\uf0a7]\s*")
+_RE_HIFEN_FINAL = re.compile(r"\w-$")
+_RE_PONTUACAO_TITULO = re.compile(r"^[\s\-–—•|#*]+|[\s:\-–—|#*]+$")
+
+
+def linhas_da_pagina(pagina_dict):
+    """(texto, tamanho da fonte, negrito) de cada linha de texto de get_text("dict")"""
+    linhas = []
+    for bloco in pagina_dict.get("blocks", ()):
+        if bloco.get("type", 0) != 0:
+            continue
+        for linha in bloco.get("lines", ()):
+            spans = [s for s in linha.get("spans", ()) if s.get("text", "").strip()]
+            if not spans:
+                continue
+            texto = "".join(s["text"] for s in linha["spans"])
+            tamanho = max(s.get("size", 0.0) for s in spans)
+            # Bit 4 de flags é negrito; algumas fontes só indicam no nome
+            negrito = all(s.get("flags", 0) & 16 or "bold" in s.get("font", "").lower() for s in spans)
+            linhas.append((texto, tamanho, negrito))
+    return linhas
+
+
+def normalizar_linhas(paginas):
+    """Normaliza espaços e marcadores, junta palavras hifenizadas e remove linhas vazias ou repetidas
+
+    paginas é uma lista com as linhas de cada página; retorna uma lista única de linhas.
+    """
+    saida = []
+    vistas = set()  # linhas curtas de páginas anteriores
+    for linhas in paginas:
+        da_pagina = set()
+        for texto, tamanho, negrito in linhas:
+            texto = _RE_ESPACOS.sub(" ", texto).strip()
+            texto = _RE_MARCADOR.sub("- ", texto)
+            if not texto:
+                continue
+            # "analis-" + "ta de dados" -> "analista de dados"
+            if saida and _RE_HIFEN_FINAL.search(saida[-1][0]) and texto[0].islower():
+                anterior = saida[-1]
+                saida[-1] = (anterior[0][:-1] + texto, anterior[1], anterior[2])
+                continue
+            if len(texto) <= _MAX_CARACTERES_REPETIDA:
+                if texto in vistas:
+                    continue
+                da_pagina.add(texto)
+            saida.append((texto, tamanho, negrito))
+        vistas |= da_pagina
+    return saida
+
+
+def _tamanho_corpo(linhas):
+    # Tamanho de fonte com mais caracteres no documento
+    contagem = Counter()
+    for texto, tamanho, _ in linhas:
+        contagem[round(tamanho * 2) / 2] += len(texto)
+    return contagem.most_common(1)[0][0] if contagem else 0.0
+
+
+def secao_do_titulo(texto, tamanho=0.0, negrito=False, tamanho_corpo=0.0):
+    """Chave da seção se a linha for um título reconhecido, senão None"""
+    titulo = _sem_acentos(_RE_PONTUACAO_TITULO.sub("", texto).lower())
+    if not titulo or len(titulo) > _MAX_CARACTERES_TITULO:
+        return None
+    for nome, chave in _TITULOS:
+        if titulo == nome:
+            return chave
+    # Prefixo de um título só conta com destaque visual, para não confundir com o corpo
+    destaque = negrito or (tamanho_corpo and tamanho >= tamanho_corpo + 1) or (
+        texto.isupper() and any(c.isalpha() for c in texto)
+    )
+    if destaque:
+        for nome, chave in _TITULOS:
+            if titulo.startswith(nome + " ") or titulo.startswith(nome + ":"):
+                return chave
+    return None
+
+
+def dividir_secoes(linhas):
+    """Agrupa as linhas normalizadas em seções, na ordem do documento"""
+    tamanho_corpo = _tamanho_corpo(linhas)
+    secoes = [{"chave": "cabecalho", "titulo": None, "linhas": [], "prioridade": PRIORIDADE_CABECALHO}]
+    for texto, tamanho, negrito in linhas:
+        chave = secao_do_titulo(texto, tamanho, negrito, tamanho_corpo)
+        if chave:
+            secoes.append({"chave": chave, "titulo": texto, "linhas": [], "prioridade": SECOES[chave][0]})
+        else:
+            secoes[-1]["linhas"].append(texto)
+    return [s for s in secoes if s["linhas"] or s["titulo"]]
+
+
+def _texto_secao(secao, linhas=None):
+    linhas = secao["linhas"] if linhas is None else linhas
+    return "\n".join(([secao["titulo"]] if secao["titulo"] else []) + linhas)
+
+
+def _tokens_caracteres(caracteres):
+    # estimar_tokens para um texto de tamanho conhecido
+    return (caracteres + CARACTERES_POR_TOKEN - 1) // CARACTERES_POR_TOKEN
+
+
+def _cortar(secao, orcamento):
+    # Primeiras linhas da seção que cabem no orçamento (a última pode ser cortada no meio)
+    escolhidas = []
+    # Tamanho de _texto_secao(secao, escolhidas), somado linha a linha; -1 porque a
+    # primeira linha de uma seção sem título não tem "\n" antes
+    caracteres = len(secao["titulo"]) if secao["titulo"] else -1
+    for linha in secao["linhas"]:
+        com_linha = caracteres + 1 + len(linha)
+        if _tokens_caracteres(com_linha) <= orcamento:
+            escolhidas.append(linha)
+            caracteres = com_linha
+            continue
+        restante = orcamento - _tokens_caracteres(max(caracteres, 0)) - 1
+        if restante > 0:
+            escolhidas.append(linha[:restante * CARACTERES_POR_TOKEN].rstrip())
+        break
+    return _texto_secao(secao, escolhidas) if escolhidas else None
+
+
+def comprimir(paginas, max_tokens=0, tokens_nao_lidos=0):
+    """Empacota as seções mais valiosas em max_tokens e retorna (texto, relatório)
+
+    paginas traz, para cada página, as tuplas (texto, tamanho da fonte,
+    negrito) de linhas_da_pagina na ordem de leitura.
+    Com max_tokens=0 o texto é apenas normalizado. O relatório traz os
+    tokens do texto bruto (somando tokens_nao_lidos, das páginas que não
+    chegaram a ser lidas), os enviados e os economizados, e as seções
+    incluídas, cortadas e omitidas.
+    """
+    bruto = "\n".join(texto for linhas in paginas for texto, _, _ in linhas)
+    secoes = dividir_secoes(normalizar_linhas(paginas))
+
+    escolhidas = {}  # índice da seção -> texto incluído
+    cortadas, omitidas = [], []
+    restante = max_tokens
+    for i in sorted(range(len(secoes)), key=lambda i: (secoes[i]["prioridade"], i)):
+        secao = secoes[i]
+        texto = _texto_secao(secao)
+        # Separador "\n\n" entre seções conta como um token
+        custo = estimar_tokens(texto) + 1
+        if not max_tokens or custo <= restante:
+            escolhidas[i] = texto
+            restante -= custo
+            continue
+        parcial = _cortar(secao, restante - 1) if restante >= _MIN_TOKENS_CORTE else None
+        if parcial:
+            escolhidas[i] = parcial
+            restante -= estimar_tokens(parcial) + 1
+            cortadas.append(secao["chave"])
+        else:
+            omitidas.append(secao["chave"])
+
+    texto = "\n\n".join(escolhidas[i] for i in sorted(escolhidas))
+    tokens_originais = estimar_tokens(bruto) + tokens_nao_lidos
+    tokens_enviados = estimar_tokens(texto)
+    relatorio = {
+        "tokens_originais": tokens_originais,
+        "tokens_enviados": tokens_enviados,
+        "tokens_economizados": max(tokens_originais - tokens_enviados, 0),
+        "secoes": [secoes[i]["chave"] for i in sorted(escolhidas)],
+        "secoes_cortadas": cortadas,
+        "secoes_omitidas": omitidas,
+    }
+    logger.info(
+        "compressao: %d -> %d tokens (%d economizados), cortadas=%s omitidas=%s",
+        tokens_originais, tokens_enviados, relatorio["tokens_economizados"], cortadas, omitidas,
+    )
+    return texto, relatorio
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Configurações do InternReady (sobrescrevíveis por variáveis de ambiente)"""
+
+import os
+
+
+def _env_int(nome, padrao):
+    try:
+        return int(os.environ.get(nome, padrao))
+    except ValueError:
+        return padrao
+
+
+# Diretório onde ficam os arquivos persistentes (cache, bancos, logs)
+DIRETORIO_DADOS = os.environ.get("INTERNREADY_DADOS", ".internready")
+
+# Cache de análises
+CACHE_CAMINHO_DB = os.environ.get(
+    "INTERNREADY_CACHE_DB", os.path.join(DIRETORIO_DADOS, "cache_analises.sqlite3")
+)
+CACHE_MAX_MEMORIA = _env_int("INTERNREADY_CACHE_MAX_MEMORIA", 128)
+CACHE_MAX_DISCO = _env_int("INTERNREADY_CACHE_MAX_DISCO", 5000)
+CACHE_TTL_SEGUNDOS = _env_int("INTERNREADY_CACHE_TTL", 7 * 24 * 3600)
+
+# Histórico de análises (candidatos, competências e seções qualitativas)
+HISTORICO_CAMINHO_DB = os.environ.get(
+    "INTERNREADY_HISTORICO_DB", os.path.join(DIRETORIO_DADOS, "historico_analises.sqlite3")
+)
+
+# Limites aplicados ao PDF antes de qualquer parsing
+PDF_MAX_BYTES = _env_int("INTERNREADY_PDF_MAX_BYTES", 20 * 1024 * 1024)
+PDF_MAX_PAGINAS = _env_int("INTERNREADY_PDF_MAX_PAGINAS", 50)
+
+# Orçamento de texto do currículo enviado ao modelo (0 desativa o limite)
+TEXTO_MAX_CARACTERES = _env_int("INTERNREADY_TEXTO_MAX_CARACTERES", 4000)
+TEXTO_MAX_TOKENS = _env_int("INTERNREADY_TEXTO_MAX_TOKENS", 0)
+# Compressão por seções (0 volta ao corte simples por caracteres) e quanto ler além do orçamento
+TEXTO_COMPRIMIR = _env_int("INTERNREADY_TEXTO_COMPRIMIR", 1)
+TEXTO_COMPRESSAO_FATOR_LEITURA = _env_int("INTERNREADY_TEXTO_COMPRESSAO_FATOR_LEITURA", 4)
+
+# Análise em lote
+LOTE_MAX_CONCORRENCIA = _env_int("INTERNREADY_LOTE_MAX_CONCORRENCIA", 8)
+LOTE_MAX_WORKERS_EXTRACAO = _env_int("INTERNREADY_LOTE_MAX_WORKERS", 4)
+# Único diretório do servidor que a interface pode ler no modo lote (vazio = só uploads; o CLI lê qualquer um)
+LOTE_DIRETORIO_RAIZ = os.environ.get("INTERNREADY_LOTE_DIRETORIO_RAIZ", "")
+
+# Pré-aquecimento na subida do servidor (importa as bibliotecas pesadas e monta o cache de fontes)
+PREAQUECER = _env_int("INTERNREADY_PREAQUECER", 0)
+
+# Clientes OpenAI reutilizáveis (pool HTTP compartilhado com keep-alive)
+CLIENTE_MAX_CONEXOES = _env_int("INTERNREADY_CLIENTE_MAX_CONEXOES", 32)
+CLIENTE_MAX_KEEPALIVE = _env_int("INTERNREADY_CLIENTE_MAX_KEEPALIVE", 16)
+CLIENTE_KEEPALIVE_SEGUNDOS = _env_int("INTERNREADY_CLIENTE_KEEPALIVE", 120)
+CLIENTE_OCIOSO_SEGUNDOS = _env_int("INTERNREADY_CLIENTE_OCIOSO", 30 * 60)
+CLIENTE_MAX = _env_int("INTERNREADY_CLIENTE_MAX", 256)
+CLIENTE_TIMEOUT_SEGUNDOS = _env_int("INTERNREADY_CLIENTE_TIMEOUT", 600)
+
+# Agendador de chamadas: limites da conta (recalibrados pelos cabeçalhos x-ratelimit-*) e novas tentativas
+LIMITE_RPM = _env_int("INTERNREADY_LIMITE_RPM", 500)
+LIMITE_TPM = _env_int("INTERNREADY_LIMITE_TPM", 200000)
+LIMITE_MAX_TENTATIVAS = _env_int("INTERNREADY_LIMITE_MAX_TENTATIVAS", 6)
+LIMITE_BACKOFF_BASE = _env_int("INTERNREADY_LIMITE_BACKOFF_BASE", 1)
+LIMITE_BACKOFF_MAX = _env_int("INTERNREADY_LIMITE_BACKOFF_MAX", 60)
+
+# Métricas por etapa: log JSON lines (rotacionado ao passar do tamanho máximo, guardando um arquivo
+# anterior), arquivo Prometheus (textfile) e endereço e porta do endpoint /metrics (porta 0 desativa)
+METRICAS_LOG = os.environ.get("INTERNREADY_METRICAS_LOG", os.path.join(DIRETORIO_DADOS, "metricas.jsonl"))
+METRICAS_LOG_MAX_BYTES = _env_int("INTERNREADY_METRICAS_LOG_MAX_BYTES", 50 * 1024 * 1024)
+METRICAS_ARQUIVO_PROM = os.environ.get("INTERNREADY_METRICAS_PROM", "")
+METRICAS_HOST = os.environ.get("INTERNREADY_METRICAS_HOST", "127.0.0.1")
+METRICAS_PORTA = _env_int("INTERNREADY_METRICAS_PORTA", 0)
+
+# Percentis por competência: mínimo de pontuações no histórico para exibir o percentil
+PERCENTIL_MIN_AMOSTRAS = _env_int("INTERNREADY_PERCENTIL_MIN_AMOSTRAS", 20)
+
+# Nomes canônicos das áreas de competência: ativação, similaridade mínima (0-100) e rótulos memorizados
+TAXONOMIA_ATIVA = _env_int("INTERNREADY_TAXONOMIA", 1)
+TAXONOMIA_LIMIAR = _env_int("INTERNREADY_TAXONOMIA_LIMIAR", 80)
+TAXONOMIA_MAX_MEMORIA = _env_int("INTERNREADY_TAXONOMIA_MAX_MEMORIA", 50000)
+
+# Análises em segundo plano: simultâneas por servidor, aguardando na fila e retenção das encerradas
+TAREFAS_MAX_SIMULTANEAS = _env_int("INTERNREADY_TAREFAS_MAX_SIMULTANEAS", 4)
+TAREFAS_MAX_FILA = _env_int("INTERNREADY_TAREFAS_MAX_FILA", 32)
+TAREFAS_RETENCAO_SEGUNDOS = _env_int("INTERNREADY_TAREFAS_RETENCAO", 60 * 60)
+
+# Análises guardadas por sessão da interface para redesenhar os resultados nos reruns
+SESSAO_MAX_ANALISES = _env_int("INTERNREADY_SESSAO_MAX_ANALISES", 5)
+
+# Cascata de modelos: backends em ordem (JSON; vazio = só o modelo padrão, sem escalar) e mínimo de
+# competências válidas para aceitar a resposta sem escalar (e para gravá-la no cache)
+ROTEADOR_BACKENDS = os.environ.get("INTERNREADY_ROTEADOR_BACKENDS", "")
+ROTEADOR_MIN_COMPETENCIAS = _env_int("INTERNREADY_ROTEADOR_MIN_COMPETENCIAS", 3)
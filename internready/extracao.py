@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Extração de texto de PDFs direto da memória, sem arquivo temporário"""
+
+from . import config
+
+
+class ErroExtracao(ValueError):
+    """PDF inválido, corrompido ou protegido"""
+
+
+class LimitePDFExcedido(ErroExtracao):
+    """PDF maior que os limites configurados de bytes ou páginas"""
+
+
+def abrir_pdf(dados, max_bytes=None, max_paginas=None):
+    """Abre o PDF a partir do buffer do upload, validando os limites configurados"""
+    import fitz  # PyMuPDF
+
+    max_bytes = config.PDF_MAX_BYTES if max_bytes is None else max_bytes
+    max_paginas = config.PDF_MAX_PAGINAS if max_paginas is None else max_paginas
+
+    # memoryview evita copiar o conteúdo do upload (bytes, bytearray ou getbuffer())
+    buffer = dados if isinstance(dados, memoryview) else memoryview(dados)
+    if buffer.nbytes > max_bytes:
+        raise LimitePDFExcedido(
+            f"Arquivo com {buffer.nbytes / 1024 / 1024:.1f} MB excede o limite de "
+            f"{max_bytes / 1024 / 1024:.1f} MB"
+        )
+
+    try:
+        doc = fitz.open(stream=buffer, filetype="pdf")
+    except Exception as e:
+        raise ErroExtracao(f"Não foi possível abrir o PDF: {e}") from e
+
+    # A contagem de páginas vem da árvore de páginas, sem interpretar o conteúdo
+    if doc.page_count > max_paginas:
+        total = doc.page_count
+        doc.close()
+        raise LimitePDFExcedido(f"PDF com {total} páginas excede o limite de {max_paginas} páginas")
+    if doc.needs_pass:
+        doc.close()
+        raise ErroExtracao("PDF protegido por senha")
+    return doc
+
+
+# Estimativa grosseira usada para converter orçamento de tokens em caracteres
+CARACTERES_POR_TOKEN = 4
+
+
+def estimar_tokens(texto):
+    """Estimativa local do número de tokens de um texto"""
+    return (len(texto) + CARACTERES_POR_TOKEN - 1) // CARACTERES_POR_TOKEN
+
+
+def versao_extracao():
+    """Limites que mudam o texto enviado ao modelo, na forma usada pela chave de cache"""
+    return (f"texto{config.TEXTO_MAX_CARACTERES}-tokens{config.TEXTO_MAX_TOKENS}"
+            f"-compressao{config.TEXTO_COMPRIMIR}x{config.TEXTO_COMPRESSAO_FATOR_LEITURA}")
+
+
+def flags_somente_texto():
+    """Flags de get_text que não decodificam imagens"""
+    import fitz
+
+    return fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP
+
+
+def iterar_paginas(doc):
+    """Gera o texto de cada página sob demanda, sem processar imagens"""
+    flags = flags_somente_texto()
+    for pagina in doc:
+        yield pagina.get_text("text", flags=flags)
+
+
+def extrair_texto(dados, max_caracteres=None, max_tokens=None, max_bytes=None, max_paginas=None,
+                  ao_progredir=None, comprimir=None, ao_relatorio=None):
+    """Extrai texto página a página até preencher o orçamento de caracteres/tokens
+
+    ao_progredir(pagina, total) é chamado a cada página lida. Páginas depois
+    do orçamento não são extraídas. Com comprimir (padrão: config) o texto
+    passa pela compressão por seções e ao_relatorio(relatorio) recebe os
+    tokens economizados.
+    """
+    limite = config.TEXTO_MAX_CARACTERES if max_caracteres is None else max_caracteres
+    max_tokens = config.TEXTO_MAX_TOKENS if max_tokens is None else max_tokens
+    if max_tokens:
+        limite_tokens = max_tokens * CARACTERES_POR_TOKEN
+        limite = min(limite, limite_tokens) if limite else limite_tokens
+    comprimir = config.TEXTO_COMPRIMIR if comprimir is None else comprimir
+
+    doc = abrir_pdf(dados, max_bytes=max_bytes, max_paginas=max_paginas)
+    try:
+        if comprimir:
+            return _extrair_comprimido(doc, limite, ao_progredir, ao_relatorio)
+        partes = []
+        acumulado = 0
+        total = doc.page_count
+        for num, texto_pagina in enumerate(iterar_paginas(doc)):
+            partes.append(texto_pagina)
+            acumulado += len(texto_pagina)
+            if ao_progredir:
+                ao_progredir(num + 1, total)
+            if limite and acumulado >= limite:
+                break
+        texto = "".join(partes)
+        return texto[:limite] if limite else texto
+    finally:
+        doc.close()
+
+
+def _extrair_comprimido(doc, limite, ao_progredir, ao_relatorio):
+    # Lê além do orçamento para ter seções entre as quais escolher, até um teto proporcional
+    from .compressao import comprimir, linhas_da_pagina
+
+    flags = flags_somente_texto()
+    teto = limite * config.TEXTO_COMPRESSAO_FATOR_LEITURA if limite else 0
+    paginas = []
+    acumulado = 0
+    total = doc.page_count
+    for num, pagina in enumerate(doc):
+        linhas_pagina = linhas_da_pagina(pagina.get_text("dict", flags=flags))
+        paginas.append(linhas_pagina)
+        acumulado += sum(len(texto) for texto, _, _ in linhas_pagina)
+        if ao_progredir:
+            ao_progredir(num + 1, total)
+        if teto and acumulado >= teto:
+            break
+    tokens_nao_lidos = 0
+    if ao_relatorio and len(paginas) < total:
+        # Páginas além do teto não entram na compressão, mas contam no tamanho original do
+        # relatório (get_text("text") é bem mais barato que o "dict" das páginas lidas)
+        tokens_nao_lidos = sum(
+            estimar_tokens(pagina.get_text("text", flags=flags)) for pagina in doc.pages(len(paginas))
+        )
+    texto, relatorio = comprimir(paginas, limite // CARACTERES_POR_TOKEN, tokens_nao_lidos)
+    if ao_relatorio:
+        ao_relatorio(relatorio)
+    return texto
+
+
+def extrair_texto_com_relatorio(dados, **opcoes):
+    """extrair_texto que retorna (texto, relatório da compressão ou None); serializável para pools de processos"""
+    relatorios = []
+    texto = extrair_texto(dados, ao_relatorio=relatorios.append, **opcoes)
+    return texto, (relatorios[0] if relatorios else None)
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""Gráficos da análise com a API orientada a objetos do Matplotlib
+
+Cada gráfico é desenhado em uma Figure própria com canvas Agg, sem passar
+pelo pyplot: nada fica registrado no estado global, sessões concorrentes
+não disputam a "figura atual" e a figura é limpa assim que vira PNG.
+
+O Matplotlib só é importado no primeiro gráfico (ou no pré-aquecimento).
+"""
+
+import io
+import threading
+from contextlib import contextmanager
+from math import pi
+
+CORES_NIVEIS = ['#DC143C', '#DAA520', '#2E8B57']
+COR_RADAR = '#1f77b4'
+# Mesmos padrões que o st.pyplot usa ao salvar a figura
+DPI_PNG = 200
+
+_carregar_lock = threading.Lock()
+_classes = None
+
+
+def _matplotlib():
+    """Importa Figure e o canvas Agg na primeira chamada e aplica o estilo padrão"""
+    global _classes
+    with _carregar_lock:
+        if _classes is None:
+            import matplotlib
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            matplotlib.rcParams['figure.figsize'] = [10, 6]
+            matplotlib.rcParams['font.size'] = 12
+            _classes = (Figure, FigureCanvasAgg)
+        return _classes
+
+
+@contextmanager
+def figura(**opcoes):
+    """Figure isolada do pyplot, limpa ao sair do bloco"""
+    Figure, FigureCanvasAgg = _matplotlib()
+    fig = Figure(**opcoes)
+    FigureCanvasAgg(fig)
+    try:
+        yield fig
+    finally:
+        fig.clear()
+
+
+def para_png(fig):
+    """Renderiza a figura em PNG (bytes)"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=DPI_PNG, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def cor_pontuacao(valor):
+    """Verde a partir de 80, amarelo a partir de 60, vermelho abaixo"""
+    return '#2E8B57' if valor >= 80 else '#DAA520' if valor >= 60 else '#DC143C'
+
+
+def estilo_pontuacao(valor):
+    """CSS de fundo da célula de pontuação na tabela de competências"""
+    if valor >= 80:
+        return 'background-color: lightgreen'
+    elif valor >= 60:
+        return 'background-color: lightyellow'
+    return 'background-color: lightcoral'
+
+
+def estilizar_competencias(df):
+    """Styler da tabela de competências com a pontuação colorida por faixa"""
+    return df.style.applymap(estilo_pontuacao, subset=['Pontuação'])
+
+
+def desenhar_barras(fig, df):
+    """Barras horizontais de pontuação por área"""
+    ax = fig.subplots()
+    bars = ax.barh(df["Área"], df["Pontuação"], color=[cor_pontuacao(x) for x in df["Pontuação"]])
+    ax.set_xlabel("Pontuação (%)")
+    ax.set_title("Competências por Área")
+    ax.grid(axis='x', alpha=0.3)
+
+    # Adicionar valores nas barras
+    for bar, valor in zip(bars, df["Pontuação"]):
+        ax.text(bar.get_width() + 1, bar.get_y() + bar.get_height() / 2,
+                f'{valor:.0f}%', va='center', fontsize=9)
+    fig.tight_layout()
+
+
+def desenhar_radar(fig, df):
+    """Radar das competências (o polígono é fechado repetindo o primeiro ponto)"""
+    labels = df["Área"].tolist()
+    values = df["Pontuação"].tolist()
+    labels += [labels[0]]
+    values += [values[0]]
+    angles = [n / float(len(labels) - 1) * 2 * pi for n in range(len(labels))]
+
+    ax = fig.subplots(subplot_kw=dict(polar=True))
+    ax.plot(angles, values, linewidth=2, color=COR_RADAR)
+    ax.fill(angles, values, alpha=0.25, color=COR_RADAR)
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(labels[:-1], fontsize=10)
+    ax.set_ylim(0, 100)
+    ax.set_title("🕸️ Radar de Competências", fontsize=14, pad=20)
+    ax.grid(True)
+
+
+def desenhar_niveis(fig, nivel_counts):
+    """Pizza com a distribuição das competências por nível"""
+    ax = fig.subplots()
+    ax.pie(
+        nivel_counts.values,
+        labels=nivel_counts.index,
+        colors=CORES_NIVEIS,
+        autopct='%1.1f%%',
+        startangle=90
+    )
+    ax.set_title("Distribuição por Níveis de Competência")
+    fig.tight_layout()
+
+
+def png_barras(df):
+    """PNG do gráfico de barras"""
+    with figura(figsize=(10, 6)) as fig:
+        desenhar_barras(fig, df)
+        return para_png(fig)
+
+
+def png_radar(df):
+    """PNG do radar, ou None com menos de 3 competências"""
+    if len(df) < 3:
+        return None
+    with figura(figsize=(8, 8)) as fig:
+        desenhar_radar(fig, df)
+        return para_png(fig)
+
+
+def png_niveis(nivel_counts):
+    """PNG da distribuição por níveis"""
+    with figura(figsize=(8, 6)) as fig:
+        desenhar_niveis(fig, nivel_counts)
+        return para_png(fig)
+
+
+def aquecer():
+    """Desenha uma figura mínima para montar o cache de fontes e de texto"""
+    with figura(figsize=(2, 2)) as fig:
+        ax = fig.subplots()
+        ax.set_title("Competências por Área")
+        ax.text(0.5, 0.5, "100%", fontsize=9)
+        return len(para_png(fig))
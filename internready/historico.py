@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""Histórico persistente das análises em SQLite, com tabelas normalizadas
+
+Cada análise concluída vira um candidato (documento analisado), suas
+competências e os pontos de cada seção qualitativa. Os índices cobrem o
+hash do documento, a data e o nome da competência, de modo que consultas
+como "todos com Valuation >= 80" não precisam chamar o modelo de novo.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from . import config
+
+
+class HistoricoAnalises:
+    """Grava e consulta análises passadas (seguro para várias threads)"""
+
+    def __init__(self, caminho_db=None):
+        self.caminho_db = caminho_db or config.HISTORICO_CAMINHO_DB
+        self._lock = threading.Lock()
+
+        if self.caminho_db != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.caminho_db)), exist_ok=True)
+        self._conn = sqlite3.connect(self.caminho_db, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS candidatos (
+                id INTEGER PRIMARY KEY,
+                hash_documento TEXT NOT NULL,
+                arquivo TEXT,
+                modelo TEXT,
+                versao_prompt TEXT,
+                criado_em REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS competencias (
+                candidato_id INTEGER NOT NULL REFERENCES candidatos (id) ON DELETE CASCADE,
+                area TEXT NOT NULL,
+                pontuacao REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS secoes_qualitativas (
+                candidato_id INTEGER NOT NULL REFERENCES candidatos (id) ON DELETE CASCADE,
+                secao TEXT NOT NULL,
+                ordem INTEGER NOT NULL,
+                ponto TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_candidatos_hash ON candidatos (hash_documento);
+            CREATE INDEX IF NOT EXISTS idx_candidatos_criado ON candidatos (criado_em);
+            CREATE INDEX IF NOT EXISTS idx_competencias_area ON competencias (area, pontuacao);
+            CREATE INDEX IF NOT EXISTS idx_competencias_candidato ON competencias (candidato_id);
+            CREATE INDEX IF NOT EXISTS idx_secoes_candidato ON secoes_qualitativas (candidato_id);
+        """)
+        self._conn.commit()
+
+    def _inserir(self, registro, agora):
+        cursor = self._conn.execute(
+            "INSERT INTO candidatos (hash_documento, arquivo, modelo, versao_prompt, criado_em) VALUES (?, ?, ?, ?, ?)",
+            (registro["hash_documento"], registro.get("arquivo"), registro.get("modelo"),
+             registro.get("versao_prompt"), registro.get("criado_em") or agora)
+        )
+        candidato_id = cursor.lastrowid
+        self._conn.executemany(
+            "INSERT INTO competencias (candidato_id, area, pontuacao) VALUES (?, ?, ?)",
+            [(candidato_id, c["Área"], float(c["Pontuação"])) for c in registro.get("competencias") or ()]
+        )
+        self._conn.executemany(
+            "INSERT INTO secoes_qualitativas (candidato_id, secao, ordem, ponto) VALUES (?, ?, ?, ?)",
+            [(candidato_id, secao, i, ponto)
+             for secao, pontos in (registro.get("qualitativa") or {}).items()
+             for i, ponto in enumerate(pontos)]
+        )
+        return candidato_id
+
+    def gravar_lote(self, registros):
+        """Grava vários registros em uma única transação; retorna os ids criados
+
+        Cada registro é um dict com hash_documento, competencias ([{"Área",
+        "Pontuação"}]) e opcionalmente arquivo, modelo, versao_prompt,
+        qualitativa ({secao: [pontos]}) e criado_em.
+        """
+        agora = time.time()
+        with self._lock, self._conn:
+            return [self._inserir(registro, agora) for registro in registros]
+
+    def gravar(self, hash_documento, competencias, qualitativa=None, arquivo=None, modelo=None, versao_prompt=None):
+        """Grava uma análise; retorna o id do candidato"""
+        return self.gravar_lote([{
+            "hash_documento": hash_documento, "competencias": competencias, "qualitativa": qualitativa,
+            "arquivo": arquivo, "modelo": modelo, "versao_prompt": versao_prompt,
+        }])[0]
+
+    def buscar_por_competencia(self, area, minimo=None, maximo=None, desde=None, limite=None):
+        """Candidatos com a competência na faixa pedida, da maior para a menor pontuação"""
+        condicoes = ["c.area = ?"]
+        parametros = [area]
+        if minimo is not None:
+            condicoes.append("c.pontuacao >= ?")
+            parametros.append(minimo)
+        if maximo is not None:
+            condicoes.append("c.pontuacao <= ?")
+            parametros.append(maximo)
+        if desde is not None:
+            condicoes.append("d.criado_em >= ?")
+            parametros.append(desde)
+        sql = f"""
+            SELECT d.id, d.hash_documento, d.arquivo, d.criado_em, c.pontuacao
+            FROM competencias c JOIN candidatos d ON d.id = c.candidato_id
+            WHERE {" AND ".join(condicoes)}
+            ORDER BY c.pontuacao DESC
+        """
+        if limite:
+            sql += " LIMIT ?"
+            parametros.append(limite)
+        with self._lock:
+            linhas = self._conn.execute(sql, parametros).fetchall()
+        return [
+            {"id": i, "hash_documento": h, "arquivo": a, "criado_em": t, "pontuacao": p}
+            for i, h, a, t, p in linhas
+        ]
+
+    def por_documento(self, hash_documento):
+        """Análises já feitas para o documento, da mais recente para a mais antiga"""
+        with self._lock:
+            ids = [linha[0] for linha in self._conn.execute(
+                "SELECT id FROM candidatos WHERE hash_documento = ? ORDER BY criado_em DESC", (hash_documento,)
+            )]
+        return [self.obter(candidato_id) for candidato_id in ids]
+
+    def obter(self, candidato_id):
+        """Análise completa de um candidato, ou None"""
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT hash_documento, arquivo, modelo, versao_prompt, criado_em FROM candidatos WHERE id = ?",
+                (candidato_id,)
+            ).fetchone()
+            if linha is None:
+                return None
+            competencias = self._conn.execute(
+                "SELECT area, pontuacao FROM competencias WHERE candidato_id = ? ORDER BY pontuacao DESC",
+                (candidato_id,)
+            ).fetchall()
+            pontos = self._conn.execute(
+                "SELECT secao, ponto FROM secoes_qualitativas WHERE candidato_id = ? ORDER BY secao, ordem",
+                (candidato_id,)
+            ).fetchall()
+        qualitativa = {}
+        for secao, ponto in pontos:
+            qualitativa.setdefault(secao, []).append(ponto)
+        hash_documento, arquivo, modelo, versao, criado_em = linha
+        return {
+            "id": candidato_id, "hash_documento": hash_documento, "arquivo": arquivo, "modelo": modelo,
+            "versao_prompt": versao, "criado_em": criado_em,
+            "competencias": [{"Área": a, "Pontuação": p} for a, p in competencias],
+            "qualitativa": qualitativa,
+        }
+
+    def pontuacoes_por_area(self):
+        """{área: [pontuações]} de todo o histórico (lidas em ordem pelo índice de área)"""
+        distribuicoes = {}
+        with self._lock:
+            for area, pontuacao in self._conn.execute(
+                "SELECT area, pontuacao FROM competencias ORDER BY area, pontuacao"
+            ):
+                distribuicoes.setdefault(area, []).append(pontuacao)
+        return distribuicoes
+
+    def medias_por_candidato(self):
+        """Pontuação média de cada candidato do histórico"""
+        with self._lock:
+            return [linha[0] for linha in self._conn.execute(
+                "SELECT AVG(pontuacao) FROM competencias GROUP BY candidato_id"
+            )]
+
+    def areas(self):
+        """Nomes de competência presentes no histórico"""
+        with self._lock:
+            return [linha[0] for linha in self._conn.execute("SELECT DISTINCT area FROM competencias ORDER BY area")]
+
+    def estatisticas(self):
+        """Quantidade de candidatos e de competências gravadas"""
+        with self._lock:
+            candidatos = self._conn.execute("SELECT COUNT(*) FROM candidatos").fetchone()[0]
+            competencias = self._conn.execute("SELECT COUNT(*) FROM competencias").fetchone()[0]
+        return {"candidatos": candidatos, "competencias": competencias}
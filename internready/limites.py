@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""Agendador de chamadas ao modelo que respeita os limites de RPM e TPM
+
+Um único AgendadorLimites por processo mantém, para cada conta (hash da
+chave de API), dois baldes de fichas (requisições e tokens por minuto).
+Cada chamada entra na fila FIFO da sua conta e só é admitida quando ambos
+os baldes têm saldo; os cabeçalhos x-ratelimit-* das respostas recalibram
+limite e saldo da conta com os números do provedor. Respostas 429 e erros
+transitórios são repetidos com backoff exponencial com jitter, respeitando
+retry-after quando presente.
+
+executar() atende as chamadas síncronas (interface) e executar_async() as
+do lote com AsyncOpenAI, que aguardam no loop de eventos sem ocupar
+threads; ambas passam pelos mesmos baldes.
+"""
+
+import asyncio
+import inspect
+import itertools
+import logging
+import random
+import re
+import threading
+import time
+
+from . import config
+from .clientes import hash_chave
+from .extracao import estimar_tokens
+
+logger = logging.getLogger(__name__)
+
+_DURACAO = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_SEGUNDOS_UNIDADE = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+STATUS_REPETIVEIS = (408, 409, 429, 500, 502, 503, 504)
+
+
+class LimiteExcedido(RuntimeError):
+    """Chamada desistida após esgotar as tentativas por limite de taxa"""
+
+
+def duracao_segundos(texto):
+    """Converte durações dos cabeçalhos da OpenAI ("1s", "6m0s", "20ms") em segundos"""
+    if texto is None:
+        return None
+    try:
+        return float(texto)
+    except ValueError:
+        pass
+    partes = _DURACAO.findall(str(texto))
+    if not partes:
+        return None
+    return sum(float(valor) * _SEGUNDOS_UNIDADE[unidade] for valor, unidade in partes)
+
+
+def tokens_estimados(parametros):
+    """Tokens que a chamada pode consumir do TPM: prompt estimado + max_tokens"""
+    prompt = sum(estimar_tokens(m.get("content") or "") for m in parametros.get("messages", ()))
+    return prompt + (parametros.get("max_tokens") or 0)
+
+
+def conta_do_cliente(client):
+    """Conta de limites de um cliente do SDK: o hash da chave de API dele"""
+    return hash_chave(getattr(client, "api_key", None))
+
+
+async def criar_async(client, parametros, agendador=None):
+    """chat.completions.create de um AsyncOpenAI, pela fila do agendador quando houver"""
+    if agendador is None:
+        return await client.chat.completions.create(**parametros)
+    # As novas tentativas ficam com o agendador, não com o SDK
+    completions = client.with_options(max_retries=0).chat.completions
+    return await agendador.executar_async(
+        lambda: completions.with_raw_response.create(**parametros), tokens_estimados(parametros),
+        conta=conta_do_cliente(client),
+    )
+
+
+class BaldeFichas:
+    """Balde que se reabastece linearmente até a capacidade a cada minuto"""
+
+    def __init__(self, por_minuto):
+        self.capacidade = float(por_minuto)
+        self.nivel = float(por_minuto)
+        self._atualizado = time.monotonic()
+
+    def _reabastecer(self, agora):
+        self.nivel = min(self.capacidade, self.nivel + (agora - self._atualizado) * self.capacidade / 60)
+        self._atualizado = agora
+
+    def espera(self, quantidade, agora):
+        """Segundos até haver saldo para quantidade (0 se já houver)"""
+        self._reabastecer(agora)
+        # Pedidos maiores que a capacidade passam com o balde cheio, para não travar a fila
+        quantidade = min(quantidade, self.capacidade)
+        if self.nivel >= quantidade:
+            return 0.0
+        return (quantidade - self.nivel) * 60 / self.capacidade
+
+    def consumir(self, quantidade, agora):
+        self._reabastecer(agora)
+        self.nivel -= min(quantidade, self.capacidade)
+
+    def calibrar(self, limite, restante, reinicio_s, agora):
+        """Ajusta capacidade e saldo aos valores informados pelo provedor"""
+        self._reabastecer(agora)
+        if limite:
+            self.capacidade = float(limite)
+        if restante is not None:
+            # O saldo do provedor não inclui chamadas ainda em andamento: só reduzimos
+            self.nivel = min(self.nivel, float(restante))
+            if restante <= 0 and reinicio_s:
+                self.nivel = min(self.nivel, -reinicio_s * self.capacidade / 60)
+
+
+class ContaLimites:
+    """Baldes, fila e pausa de uma conta (chave de API): contas diferentes não dividem limites"""
+
+    def __init__(self, rpm, tpm):
+        self.rpm = BaldeFichas(rpm)
+        self.tpm = BaldeFichas(tpm)
+        self.fila = []  # senhas em ordem de chegada
+        self.pausa_ate = 0.0
+        self.usada_em = time.monotonic()
+
+    def espera(self, tokens, agora):
+        return max(self.pausa_ate - agora, self.rpm.espera(1, agora), self.tpm.espera(tokens, agora))
+
+    def ociosa(self, agora):
+        # Depois de um minuto parada, a conta está de novo com os baldes cheios
+        return not self.fila and agora - self.usada_em > 60 and agora >= self.pausa_ate
+
+
+class AgendadorLimites:
+    """Filas com admissão por baldes de RPM/TPM por conta e novas tentativas com backoff
+
+    Cada conta (conta_do_cliente: hash da chave de API) tem os próprios
+    baldes, fila e pausa: os cabeçalhos x-ratelimit-* e os 429 de uma chave
+    não mexem nos limites das outras.
+    """
+
+    def __init__(self, rpm=None, tpm=None, max_tentativas=None, backoff_base=None, backoff_max=None):
+        self.rpm_padrao = rpm or config.LIMITE_RPM
+        self.tpm_padrao = tpm or config.LIMITE_TPM
+        self.max_tentativas = max_tentativas or config.LIMITE_MAX_TENTATIVAS
+        self.backoff_base = backoff_base or config.LIMITE_BACKOFF_BASE
+        self.backoff_max = backoff_max or config.LIMITE_BACKOFF_MAX
+
+        self._cond = threading.Condition()
+        self._contas = {}  # conta -> ContaLimites
+        self._senhas = itertools.count()
+        self._eventos = set()  # (loop, asyncio.Event) de quem aguarda em executar_async
+
+        self.admitidas = 0
+        self.repeticoes = 0
+        self.falhas = 0
+
+    # --- admissão --------------------------------------------------------
+
+    def _conta(self, conta):
+        """ContaLimites da conta, criada na primeira chamada (com self._cond adquirido)"""
+        agora = time.monotonic()
+        limites = self._contas.get(conta)
+        if limites is None:
+            for ociosa in [c for c, l in self._contas.items() if l.ociosa(agora)]:
+                del self._contas[ociosa]
+            limites = self._contas[conta] = ContaLimites(self.rpm_padrao, self.tpm_padrao)
+        limites.usada_em = agora
+        return limites
+
+    def _notificar(self):
+        # Acorda as threads em admitir e, no loop de cada uma, as corrotinas em admitir_async
+        self._cond.notify_all()
+        for loop, evento in self._eventos:
+            loop.call_soon_threadsafe(evento.set)
+
+    def _tentar(self, limites, senha, tokens):
+        """(posição, espera) da senha; espera 0 admite e consome as fichas (com self._cond adquirido)"""
+        agora = time.monotonic()
+        posicao = limites.fila.index(senha)
+        espera = limites.espera(tokens, agora) if posicao == 0 else None
+        if espera == 0:
+            limites.rpm.consumir(1, agora)
+            limites.tpm.consumir(tokens, agora)
+            self.admitidas += 1
+        return posicao, espera
+
+    def admitir(self, tokens, ao_aguardar=None, conta=None):
+        """Bloqueia até a chamada poder sair; ao_aguardar(posicao, espera_s) informa a fila"""
+        with self._cond:
+            limites = self._conta(conta)
+            senha = next(self._senhas)
+            limites.fila.append(senha)
+            ultima_posicao = None
+            try:
+                while True:
+                    posicao, espera = self._tentar(limites, senha, tokens)
+                    if espera == 0:
+                        return
+                    if ao_aguardar and posicao != ultima_posicao:
+                        ultima_posicao = posicao
+                        ao_aguardar(posicao + 1, espera)
+                    # Quem não está na frente acorda quando a fila anda
+                    self._cond.wait(timeout=espera if espera is not None else 1.0)
+            finally:
+                limites.fila.remove(senha)
+                self._notificar()
+
+    async def admitir_async(self, tokens, ao_aguardar=None, conta=None):
+        """Como admitir, aguardando no loop de eventos em vez de ocupar uma thread"""
+        evento = asyncio.Event()
+        registro = (asyncio.get_running_loop(), evento)
+        with self._cond:
+            limites = self._conta(conta)
+            senha = next(self._senhas)
+            limites.fila.append(senha)
+            self._eventos.add(registro)
+        ultima_posicao = None
+        try:
+            while True:
+                # Limpo antes de olhar a fila: um aviso que chegue depois não se perde
+                evento.clear()
+                with self._cond:
+                    posicao, espera = self._tentar(limites, senha, tokens)
+                if espera == 0:
+                    return
+                if ao_aguardar and posicao != ultima_posicao:
+                    ultima_posicao = posicao
+                    ao_aguardar(posicao + 1, espera)
+                try:
+                    await asyncio.wait_for(evento.wait(), espera if espera is not None else 1.0)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._cond:
+                limites.fila.remove(senha)
+                self._eventos.discard(registro)
+                self._notificar()
+
+    def calibrar(self, cabecalhos, conta=None):
+        """Recalibra os baldes da conta com os cabeçalhos x-ratelimit-* de uma resposta dela"""
+        if not cabecalhos:
+            return
+
+        def numero(nome):
+            try:
+                return int(cabecalhos.get(nome))
+            except (TypeError, ValueError):
+                return None
+
+        with self._cond:
+            limites = self._conta(conta)
+            agora = time.monotonic()
+            limites.rpm.calibrar(numero("x-ratelimit-limit-requests"), numero("x-ratelimit-remaining-requests"),
+                                 duracao_segundos(cabecalhos.get("x-ratelimit-reset-requests")), agora)
+            limites.tpm.calibrar(numero("x-ratelimit-limit-tokens"), numero("x-ratelimit-remaining-tokens"),
+                                 duracao_segundos(cabecalhos.get("x-ratelimit-reset-tokens")), agora)
+            self._notificar()
+
+    def _pausar(self, segundos, conta=None):
+        with self._cond:
+            limites = self._conta(conta)
+            limites.pausa_ate = max(limites.pausa_ate, time.monotonic() + segundos)
+
+    def backoff(self, tentativa, retry_after=None):
+        """Espera antes da próxima tentativa: retry-after ou exponencial com jitter total"""
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** tentativa))
+
+    # --- execução --------------------------------------------------------
+
+    def _espera_repeticao(self, erro, tentativa, ao_aguardar, conta):
+        """Segundos até repetir a chamada que falhou com erro; levanta se não houver nova tentativa"""
+        status = getattr(erro, "status_code", None)
+        resposta = getattr(erro, "response", None)
+        cabecalhos = getattr(resposta, "headers", None)
+        transitorio = status in STATUS_REPETIVEIS or type(erro).__name__ in ("APIConnectionError", "APITimeoutError")
+        if not transitorio or tentativa == self.max_tentativas - 1:
+            with self._cond:
+                self.falhas += 1
+            if status == 429:
+                raise LimiteExcedido(f"Limite de taxa da API excedido após {tentativa + 1} tentativas") from erro
+            raise erro
+        self.calibrar(cabecalhos, conta)
+        espera = self.backoff(tentativa, duracao_segundos((cabecalhos or {}).get("retry-after")))
+        if status == 429:
+            # Um 429 vale para toda a fila da conta, não só para esta chamada
+            self._pausar(espera, conta)
+        with self._cond:
+            self.repeticoes += 1
+        logger.info("chamada repetida (status=%s, tentativa %d) em %.2fs", status, tentativa + 1, espera)
+        if ao_aguardar:
+            ao_aguardar(0, espera)
+        return espera
+
+    def executar(self, chamada, tokens, ao_aguardar=None, medicao=None, conta=None):
+        """Executa chamada() respeitando os limites da conta e repetindo em 429/erros transitórios
+
+        chamada deve devolver a resposta crua do SDK (with_raw_response), cujos
+        cabeçalhos recalibram os baldes; o retorno é a resposta já interpretada.
+        Com medicao (dict), medicao["espera_s"] acumula o tempo na fila e
+        nos intervalos entre tentativas, fora da chamada em si.
+        """
+        espera_total = 0.0
+        try:
+            for tentativa in range(self.max_tentativas):
+                inicio = time.perf_counter()
+                self.admitir(tokens, ao_aguardar, conta)
+                espera_total += time.perf_counter() - inicio
+                try:
+                    bruta = chamada()
+                except Exception as e:
+                    espera = self._espera_repeticao(e, tentativa, ao_aguardar, conta)
+                    time.sleep(espera)
+                    espera_total += espera
+                    continue
+                self.calibrar(getattr(bruta, "headers", None), conta)
+                return bruta.parse()
+        finally:
+            if medicao is not None:
+                medicao["espera_s"] = medicao.get("espera_s", 0.0) + espera_total
+
+    async def executar_async(self, chamada, tokens, ao_aguardar=None, medicao=None, conta=None):
+        """Como executar, para chamada() que devolve uma corrotina (AsyncOpenAI)"""
+        espera_total = 0.0
+        try:
+            for tentativa in range(self.max_tentativas):
+                inicio = time.perf_counter()
+                await self.admitir_async(tokens, ao_aguardar, conta)
+                espera_total += time.perf_counter() - inicio
+                try:
+                    bruta = await chamada()
+                except Exception as e:
+                    espera = self._espera_repeticao(e, tentativa, ao_aguardar, conta)
+                    await asyncio.sleep(espera)
+                    espera_total += espera
+                    continue
+                self.calibrar(getattr(bruta, "headers", None), conta)
+                resposta = bruta.parse()
+                return await resposta if inspect.isawaitable(resposta) else resposta
+        finally:
+            if medicao is not None:
+                medicao["espera_s"] = medicao.get("espera_s", 0.0) + espera_total
+
+    def estatisticas(self, conta=None):
+        """Contas ativas, fila total e contadores; com conta, também os saldos dos baldes dela"""
+        with self._cond:
+            resultado = {
+                "contas": len(self._contas),
+                "fila": sum(len(l.fila) for l in self._contas.values()),
+                "admitidas": self.admitidas,
+                "repeticoes": self.repeticoes,
+                "falhas": self.falhas,
+            }
+            limites = self._contas.get(conta)
+            if limites is not None:
+                agora = time.monotonic()
+                limites.rpm._reabastecer(agora)
+                limites.tpm._reabastecer(agora)
+                resultado.update({
+                    "rpm_limite": int(limites.rpm.capacidade), "rpm_saldo": int(limites.rpm.nivel),
+                    "tpm_limite": int(limites.tpm.capacidade), "tpm_saldo": int(limites.tpm.nivel),
+                })
+            return resultado
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""Análise de vários currículos em paralelo com AsyncOpenAI"""
+
+import asyncio
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from . import config
+from .analise import MODELO, NIVEIS_BINS, NIVEIS_LABELS, parametros_chamada, versao_prompt
+from .cache import hash_documento
+from .extracao import ErroExtracao, extrair_texto_com_relatorio
+from .limites import criar_async
+from .metricas import uso_tokens
+from .pipeline import interpretar_resposta
+from .roteador import chave_cache, chaves_cascata, obter_do_cache, resposta_aceita
+
+# Estados possíveis de cada arquivo do lote
+NA_FILA = "na_fila"
+EXTRAINDO = "extraindo"
+ANALISANDO = "analisando"
+CONCLUIDO = "concluido"
+ERRO = "erro"
+
+
+class DiretorioNaoPermitido(ValueError):
+    """Diretório (ou arquivo dentro dele) fora da raiz que a interface pode ler"""
+
+
+def diretorio_permitido(diretorio, diretorio_raiz):
+    """Caminho resolvido de diretorio (relativo à raiz ou absoluto), desde que fique dentro de diretorio_raiz"""
+    raiz = Path(diretorio_raiz).resolve()
+    caminho = (raiz / diretorio).resolve()
+    if not caminho.is_relative_to(raiz):
+        raise DiretorioNaoPermitido(f"o diretório {diretorio} está fora de {raiz}")
+    return caminho
+
+
+def _ler_limitado(arquivo):
+    # Lê no máximo um byte além do limite: o excesso é rejeitado pela extração
+    return arquivo.read(config.PDF_MAX_BYTES + 1)
+
+
+def _pdfs_do_zip(origem, nome_zip):
+    itens = []
+    with zipfile.ZipFile(origem) as zf:
+        for info in zf.infolist():
+            nome = info.filename
+            if info.is_dir() or not nome.lower().endswith(".pdf") or nome.startswith("__MACOSX/"):
+                continue
+            with zf.open(info) as membro:
+                itens.append((f"{nome_zip}/{nome}", _ler_limitado(membro)))
+    return itens
+
+
+def coletar_pdfs(uploads=(), diretorio=None, caminhos=(), diretorio_raiz=None):
+    """Reúne (nome, bytes) de uploads, caminhos (PDF ou ZIP) e de um diretório (recursivo)
+
+    Com diretorio_raiz (a interface usa config.LOTE_DIRETORIO_RAIZ), o
+    diretório e cada PDF, depois de seguir links simbólicos, precisam estar
+    dentro dela; senão levanta DiretorioNaoPermitido.
+    """
+    itens = []
+    for upload in uploads or ():
+        if upload.name.lower().endswith(".zip"):
+            itens.extend(_pdfs_do_zip(upload, upload.name))
+        else:
+            itens.append((upload.name, upload.getvalue()))
+
+    for caminho in caminhos or ():
+        nome = os.path.basename(caminho)
+        if nome.lower().endswith(".zip"):
+            itens.extend(_pdfs_do_zip(caminho, nome))
+        else:
+            with open(caminho, "rb") as f:
+                itens.append((nome, _ler_limitado(f)))
+
+    if diretorio:
+        if diretorio_raiz is not None:
+            diretorio = diretorio_permitido(diretorio, diretorio_raiz)
+        for raiz, _, arquivos in sorted(os.walk(diretorio)):
+            for nome in sorted(arquivos):
+                if nome.lower().endswith(".pdf"):
+                    caminho = os.path.join(raiz, nome)
+                    if diretorio_raiz is not None:
+                        diretorio_permitido(caminho, diretorio_raiz)
+                    with open(caminho, "rb") as f:
+                        itens.append((os.path.relpath(caminho, diretorio), _ler_limitado(f)))
+    return itens
+
+
+def _novo_executor(max_workers):
+    # "spawn" evita fork de um servidor Streamlit com várias threads ativas
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+async def analisar_lote(itens, api_key=None, max_concorrencia=None, max_workers=None, cache=None,
+                        ao_atualizar=None, client=None, executor=None, estruturado=False, roteador=None,
+                        agendador=None):
+    """Extrai e analisa cada (nome, bytes) de itens; retorna um resultado por arquivo
+
+    A extração roda em um pool de processos e as chamadas ao modelo são
+    limitadas por um semáforo de max_concorrencia. ao_atualizar(resultado)
+    é chamado a cada mudança de estado de um arquivo, no loop de eventos.
+    Com estruturado=True usa o modo de saída com JSON Schema. Com roteador
+    (roteador.Roteador) cada currículo passa pela cascata de backends e o
+    resultado registra quem respondeu (backend, modelo e escalacoes). Com
+    agendador (limites.AgendadorLimites) as chamadas à OpenAI dividem a fila
+    de RPM/TPM com as análises individuais.
+    """
+    max_concorrencia = max_concorrencia or config.LOTE_MAX_CONCORRENCIA
+    max_workers = max_workers or config.LOTE_MAX_WORKERS_EXTRACAO
+    if client is None and roteador is None:
+        from openai import AsyncOpenAI
+        client = AsyncOpenAI(api_key=api_key)
+
+    clientes_roteador = {}  # AsyncOpenAI por backend da cascata, válidos neste loop de eventos
+    semaforo = asyncio.Semaphore(max_concorrencia)
+    loop = asyncio.get_running_loop()
+    resultados = [
+        {"indice": i, "arquivo": nome, "status": NA_FILA, "competencias": [], "qualitativa": {},
+         "resposta": None, "erro": None, "do_cache": False, "compressao": None, "hash": None, "uso": None,
+         "modelo": MODELO if roteador is None else None, "chamadas": []}
+        for i, (nome, _) in enumerate(itens)
+    ]
+
+    def atualizar(resultado, **campos):
+        resultado.update(campos)
+        if ao_atualizar:
+            ao_atualizar(resultado)
+
+    async def processar(resultado, dados, pool):
+        try:
+            _, resposta = obter_do_cache(cache, chaves_cascata(dados, estruturado, roteador)) if cache else (None, None)
+            do_cache = resposta is not None
+            compressao = None
+            uso = None
+            detalhes = {}
+
+            if not do_cache:
+                atualizar(resultado, status=EXTRAINDO)
+                texto, compressao = await loop.run_in_executor(pool, extrair_texto_com_relatorio, dados)
+                if not texto.strip():
+                    raise ErroExtracao("Não foi possível extrair texto do PDF")
+
+                async with semaforo:
+                    atualizar(resultado, status=ANALISANDO)
+                    if roteador is not None:
+                        resposta, detalhes = await roteador.analisar_async(
+                            texto, api_key, estruturado, clientes=clientes_roteador, agendador=agendador
+                        )
+                        uso = detalhes.pop("uso")
+                    else:
+                        response = await criar_async(client, parametros_chamada(texto, estruturado), agendador)
+                        resposta = response.choices[0].message.content
+                        uso = uso_tokens(response.usage)
+                        detalhes = {"chamadas": [{"modelo": MODELO, "backend": None, "uso": uso, "ttft_s": None}]}
+
+            competencias, qualitativa = interpretar_resposta(resposta, estruturado)
+            if not competencias:
+                raise ValueError("Não foi possível extrair os dados de competências")
+            # Só respostas aceitas vão para o cache, na chave do backend que respondeu
+            if cache and not do_cache:
+                if roteador is None and resposta_aceita(competencias):
+                    cache.gravar(chave_cache(dados, estruturado), resposta)
+                elif roteador is not None and roteador.aceita(competencias):
+                    cache.gravar(chave_cache(dados, estruturado, roteador.backend(detalhes["backend"])), resposta)
+            atualizar(resultado, status=CONCLUIDO, competencias=competencias, qualitativa=qualitativa,
+                      resposta=resposta, do_cache=do_cache, compressao=compressao, hash=hash_documento(dados), uso=uso,
+                      **detalhes)
+        except Exception as e:
+            atualizar(resultado, status=ERRO, erro=str(e))
+
+    pool = executor or _novo_executor(max_workers)
+    try:
+        await asyncio.gather(*(
+            processar(resultado, dados, pool) for resultado, (_, dados) in zip(resultados, itens)
+        ))
+    finally:
+        if executor is None:
+            pool.shutdown(wait=False)
+    return resultados
+
+
+def resultados_para_dataframe(resultados):
+    """Junta as competências de todos os arquivos no esquema Área/Pontuação/Nível do CSV individual"""
+    import pandas as pd
+
+    linhas = [
+        {"Arquivo": r["arquivo"], **competencia}
+        for r in resultados if r["status"] == CONCLUIDO
+        for competencia in r["competencias"]
+    ]
+    df = pd.DataFrame(linhas, columns=["Arquivo", "Área", "Pontuação"])
+    df = df.sort_values(by=["Arquivo", "Pontuação"], ascending=[True, False])
+    df["Nível"] = pd.cut(df["Pontuação"], bins=NIVEIS_BINS, labels=NIVEIS_LABELS)
+    return df
+
+
+def registros_historico(resultados, estruturado=False):
+    """Resultados concluídos com nova chamada ao modelo, no formato de HistoricoAnalises.gravar_lote
+
+    Respostas vindas do cache já foram registradas quando foram geradas.
+    """
+    return [
+        {"hash_documento": r["hash"], "arquivo": r["arquivo"], "modelo": r.get("modelo") or MODELO,
+         "versao_prompt": versao_prompt(estruturado), "competencias": r["competencias"],
+         "qualitativa": r["qualitativa"]}
+        for r in resultados if r["status"] == CONCLUIDO and not r["do_cache"]
+    ]
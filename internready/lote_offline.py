@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Análise de um conjunto grande de currículos pela Batch API da OpenAI
+
+Em vez de chamadas síncronas, gerar_requisicoes() transforma os PDFs em um
+arquivo JSONL no formato da Batch API (uma linha por documento, com o
+mesmo corpo de chat.completions que a interface monta) e em um manifesto
+que liga cada custom_id aos arquivos de origem. Os custom_id derivam do
+hash do documento: gerar o arquivo de novo produz as mesmas linhas, e
+PDFs idênticos viram uma única requisição.
+
+Depois que o lote termina, ingerir() lê o JSONL de saída linha a linha e
+devolve resultados no mesmo formato de lote.analisar_lote, prontos para
+CSV (gravar_csv, em fluxo) ou para o HistoricoAnalises.
+
+stub_openai.processar_arquivo_lote faz o papel do endpoint de lote
+localmente, a partir do arquivo de requisições.
+"""
+
+import csv
+import json
+import time
+from bisect import bisect_left
+
+from .analise import MODELO, NIVEIS_BINS, NIVEIS_LABELS, parametros_chamada, versao_prompt
+from .cache import hash_documento
+from .extracao import extrair_texto_com_relatorio
+from .lote import CONCLUIDO, ERRO, _novo_executor
+from .metricas import uso_tokens
+from .pipeline import interpretar_resposta
+from .roteador import chave_cache, resposta_aceita
+
+URL_CHAT = "/v1/chat/completions"
+
+
+def custom_id(hash_doc):
+    """Identificador estável da requisição de um documento (limite de 64 caracteres da Batch API)"""
+    return f"cv-{hash_doc[:48]}"
+
+
+def caminho_manifesto(caminho_requisicoes):
+    """Manifesto gravado ao lado do arquivo de requisições"""
+    return f"{caminho_requisicoes}.manifesto.json"
+
+
+def _extrair(dados):
+    try:
+        return extrair_texto_com_relatorio(dados)[0], None
+    except Exception as e:
+        return None, str(e)
+
+
+def gerar_requisicoes(itens, caminho_requisicoes, estruturado=False, max_workers=None, ao_extrair=None):
+    """Grava o JSONL de requisições e o manifesto para os (nome, bytes) de itens; retorna o manifesto
+
+    Documentos repetidos (mesmo hash) geram uma única requisição; arquivos
+    sem texto extraível ficam em manifesto["erros"]. ao_extrair(nome, erro)
+    é chamado para cada arquivo processado.
+    """
+    versao = versao_prompt(estruturado)
+    requisicoes = {}  # custom_id -> entrada do manifesto
+    erros = []
+    pendentes = []  # (custom_id, nome, dados) a extrair
+    for nome, dados in itens:
+        hash_doc = hash_documento(dados)
+        identificador = custom_id(hash_doc)
+        if identificador in requisicoes:
+            requisicoes[identificador]["arquivos"].append(nome)
+            continue
+        requisicoes[identificador] = {
+            "hash": hash_doc, "chave_cache": chave_cache(dados, estruturado), "arquivos": [nome],
+        }
+        pendentes.append((identificador, nome, dados))
+
+    pool = _novo_executor(max_workers) if max_workers != 0 and len(pendentes) > 1 else None
+    try:
+        extraidos = (pool.map(_extrair, (d for _, _, d in pendentes)) if pool
+                     else map(_extrair, (d for _, _, d in pendentes)))
+        with open(caminho_requisicoes, "w", encoding="utf-8") as f:
+            for (identificador, nome, _), (texto, erro) in zip(pendentes, extraidos):
+                if erro is None and not texto.strip():
+                    erro = "Não foi possível extrair texto do PDF"
+                if ao_extrair:
+                    ao_extrair(nome, erro)
+                if erro is not None:
+                    entrada = requisicoes.pop(identificador)
+                    erros.extend({"arquivo": arquivo, "erro": erro} for arquivo in entrada["arquivos"])
+                    continue
+                linha = {"custom_id": identificador, "method": "POST", "url": URL_CHAT,
+                         "body": parametros_chamada(texto, estruturado)}
+                f.write(json.dumps(linha, ensure_ascii=False) + "\n")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    manifesto = {
+        "modelo": MODELO, "versao_prompt": versao, "estruturado": estruturado, "criado_em": time.time(),
+        "requisicoes": requisicoes, "erros": erros,
+    }
+    with open(caminho_manifesto(caminho_requisicoes), "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+    return manifesto
+
+
+def ler_manifesto(caminho):
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _resultado(arquivo, hash_doc, **campos):
+    return {"arquivo": arquivo, "status": CONCLUIDO, "competencias": [], "qualitativa": {}, "resposta": None,
+            "erro": None, "do_cache": False, "compressao": None, "hash": hash_doc, "uso": None, **campos}
+
+
+def _interpretar_linha(linha):
+    """(resposta, uso, erro) de uma linha do JSONL de saída da Batch API"""
+    if linha.get("error"):
+        erro = linha["error"]
+        return None, None, erro.get("message") if isinstance(erro, dict) else str(erro)
+    response = linha.get("response") or {}
+    if response.get("status_code") != 200:
+        mensagem = ((response.get("body") or {}).get("error") or {}).get("message")
+        return None, None, f"HTTP {response.get('status_code')}: {mensagem or 'erro na requisição'}"
+    corpo = response["body"]
+    return corpo["choices"][0]["message"]["content"], uso_tokens(corpo.get("usage")), None
+
+
+def ingerir(caminho_saida, manifesto, cache=None):
+    """Resultados (formato de lote.analisar_lote) de cada arquivo, lendo a saída linha a linha
+
+    Arquivos sem linha na saída (lote expirado ou cancelado) e os que
+    falharam na extração aparecem com status de erro no final. Com cache
+    (CacheAnalises), as respostas aceitas (roteador.resposta_aceita) são
+    gravadas na chave do modelo padrão, que a interface consulta ao
+    percorrer a cascata (roteador.chaves_cascata).
+    """
+    estruturado = manifesto["estruturado"]
+    requisicoes = manifesto["requisicoes"]
+    vistos = set()
+    with open(caminho_saida, encoding="utf-8") as f:
+        for texto_linha in f:
+            if not texto_linha.strip():
+                continue
+            linha = json.loads(texto_linha)
+            entrada = requisicoes.get(linha.get("custom_id"))
+            if entrada is None or linha["custom_id"] in vistos:
+                continue
+            vistos.add(linha["custom_id"])
+
+            resposta, uso, erro = _interpretar_linha(linha)
+            competencias, qualitativa = ([], {}) if erro else interpretar_resposta(resposta, estruturado)
+            if not erro and not competencias:
+                erro = "Não foi possível extrair os dados de competências"
+            if cache is not None and not erro and resposta_aceita(competencias):
+                cache.gravar(entrada["chave_cache"], resposta)
+            for arquivo in entrada["arquivos"]:
+                if erro:
+                    yield _resultado(arquivo, entrada["hash"], status=ERRO, erro=erro, resposta=resposta)
+                else:
+                    yield _resultado(arquivo, entrada["hash"], competencias=competencias, qualitativa=qualitativa,
+                                     resposta=resposta, uso=uso)
+
+    for identificador, entrada in requisicoes.items():
+        if identificador not in vistos:
+            for arquivo in entrada["arquivos"]:
+                yield _resultado(arquivo, entrada["hash"], status=ERRO, erro="sem resposta no arquivo de saída")
+    for falha in manifesto.get("erros", ()):
+        yield _resultado(falha["arquivo"], None, status=ERRO, erro=falha["erro"])
+
+
+def nivel(pontuacao):
+    """Rótulo de NIVEIS_LABELS da pontuação (mesmos intervalos de pd.cut com NIVEIS_BINS)"""
+    return NIVEIS_LABELS[min(bisect_left(NIVEIS_BINS[1:], pontuacao), len(NIVEIS_LABELS) - 1)]
+
+
+def gravar_csv(resultados, arquivo):
+    """Escreve em fluxo as colunas do CSV do lote (Arquivo, Área, Pontuação, Nível); retorna os resultados
+
+    Dentro de cada arquivo as competências saem da maior para a menor pontuação.
+    """
+    escritor = csv.writer(arquivo)
+    escritor.writerow(["Arquivo", "Área", "Pontuação", "Nível"])
+    for resultado in resultados:
+        if resultado["status"] == CONCLUIDO:
+            for c in sorted(resultado["competencias"], key=lambda c: c["Pontuação"], reverse=True):
+                escritor.writerow([resultado["arquivo"], c["Área"], c["Pontuação"], nivel(c["Pontuação"])])
+        yield resultado
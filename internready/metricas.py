@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""Latência por etapa e consumo de tokens, em JSON lines e no formato Prometheus
+
+Cada análise usa um Rastreador: etapa("extracao") mede um span, uso(...)
+registra os tokens de response.usage e finalizar() grava uma linha JSON
+no log e alimenta o RegistroMetricas do processo. O registro mantém um
+histograma por etapa e contadores de tokens, expostos em texto Prometheus
+por um arquivo (METRICAS_ARQUIVO_PROM) e/ou por um endpoint HTTP
+(METRICAS_PORTA) servido em uma thread de fundo.
+
+Cada chamada ao modelo entra no registro com os tokens de prompt que o
+provedor serviu do cache de prefixo (usage.prompt_tokens_details.cached_tokens);
+relatorio_cache_prefixo() resume o log em taxa de acerto, latência e
+custo economizados.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# Limites dos buckets do histograma de duração (segundos)
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+TIPOS_TOKEN = ("prompt", "completion", "cached")
+
+# USD por milhão de tokens de prompt (preço normal, preço dos tokens servidos do cache de prefixo);
+# modelos fora da tabela (ex.: servidores internos) não entram na estimativa de custo
+PRECOS_PROMPT_POR_MILHAO = {
+    "gpt-4o-mini": (0.15, 0.075),
+    "gpt-4o": (2.50, 1.25),
+}
+
+
+def uso_tokens(usage):
+    """Tokens de prompt, resposta e prompt em cache de um response.usage (objeto ou dict)"""
+    if usage is None:
+        return None
+    if not isinstance(usage, dict):
+        usage = usage.model_dump() if hasattr(usage, "model_dump") else vars(usage)
+    detalhes = usage.get("prompt_tokens_details") or {}
+    return {
+        "prompt": usage.get("prompt_tokens") or 0,
+        "completion": usage.get("completion_tokens") or 0,
+        "cached": detalhes.get("cached_tokens") or 0,
+    }
+
+
+class RegistroMetricas:
+    """Histogramas por etapa e contadores de tokens do processo"""
+
+    def __init__(self, caminho_log=None, caminho_prom=None, max_bytes_log=None):
+        self.caminho_log = config.METRICAS_LOG if caminho_log is None else caminho_log
+        self.max_bytes_log = config.METRICAS_LOG_MAX_BYTES if max_bytes_log is None else max_bytes_log
+        self.caminho_prom = config.METRICAS_ARQUIVO_PROM if caminho_prom is None else caminho_prom
+        self._lock = threading.Lock()
+        self._histogramas = {}  # etapa -> ([contagens por bucket..., +Inf], soma)
+        self._tokens = {tipo: 0 for tipo in TIPOS_TOKEN}
+        self._analises = {}  # resultado -> contagem
+        self._cache_prefixo = {"acerto": 0, "falha": 0}  # chamadas ao modelo com/sem tokens em cache
+        self._coletores = []  # funções que devolvem linhas extras (ex.: Roteador.linhas_prometheus)
+        self._servidor = None
+
+        for caminho in (self.caminho_log, self.caminho_prom):
+            if caminho:
+                os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+
+    def registrar(self, registro):
+        """Incorpora o resultado de um Rastreador finalizado"""
+        with self._lock:
+            for etapa, duracao in registro["etapas"].items():
+                contagens, soma = self._histogramas.get(etapa, ([0] * (len(BUCKETS_SEGUNDOS) + 1), 0.0))
+                for i, limite in enumerate(BUCKETS_SEGUNDOS):
+                    if duracao <= limite:
+                        contagens[i] += 1
+                contagens[-1] += 1
+                self._histogramas[etapa] = (contagens, soma + duracao)
+            for tipo, quantidade in (registro.get("tokens") or {}).items():
+                self._tokens[tipo] = self._tokens.get(tipo, 0) + quantidade
+            self._analises[registro["resultado"]] = self._analises.get(registro["resultado"], 0) + 1
+            for chamada in registro.get("chamadas") or ():
+                self._cache_prefixo["acerto" if chamada["cached"] else "falha"] += 1
+
+            if self.caminho_log:
+                self._rotacionar_log()
+                with open(self.caminho_log, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            if self.caminho_prom:
+                # Escrita atômica para o coletor (node_exporter textfile) nunca ler um arquivo pela metade
+                temporario = f"{self.caminho_prom}.tmp"
+                with open(temporario, "w", encoding="utf-8") as f:
+                    f.write(self._texto_prometheus())
+                os.replace(temporario, self.caminho_prom)
+
+    def _rotacionar_log(self):
+        # Um único arquivo anterior (.1): o log ocupa no máximo cerca de 2 x max_bytes_log
+        try:
+            if self.max_bytes_log and os.path.getsize(self.caminho_log) >= self.max_bytes_log:
+                os.replace(self.caminho_log, f"{self.caminho_log}.1")
+        except FileNotFoundError:
+            pass
+
+    def _texto_prometheus(self):
+        linhas = [
+            "# HELP internready_etapa_duracao_segundos Duração de cada etapa da análise",
+            "# TYPE internready_etapa_duracao_segundos histogram",
+        ]
+        for etapa, (contagens, soma) in sorted(self._histogramas.items()):
+            for limite, contagem in zip(BUCKETS_SEGUNDOS, contagens):
+                linhas.append(f'internready_etapa_duracao_segundos_bucket{{etapa="{etapa}",le="{limite}"}} {contagem}')
+            linhas.append(f'internready_etapa_duracao_segundos_bucket{{etapa="{etapa}",le="+Inf"}} {contagens[-1]}')
+            linhas.append(f'internready_etapa_duracao_segundos_sum{{etapa="{etapa}"}} {soma:.6f}')
+            linhas.append(f'internready_etapa_duracao_segundos_count{{etapa="{etapa}"}} {contagens[-1]}')
+        linhas += [
+            "# HELP internready_tokens_total Tokens consumidos nas chamadas ao modelo",
+            "# TYPE internready_tokens_total counter",
+        ]
+        linhas += [f'internready_tokens_total{{tipo="{tipo}"}} {quantidade}' for tipo, quantidade in self._tokens.items()]
+        linhas += [
+            "# HELP internready_analises_total Análises finalizadas por resultado",
+            "# TYPE internready_analises_total counter",
+        ]
+        linhas += [f'internready_analises_total{{resultado="{r}"}} {n}' for r, n in sorted(self._analises.items())]
+        linhas += [
+            "# HELP internready_cache_prefixo_chamadas_total Chamadas ao modelo com e sem prefixo em cache",
+            "# TYPE internready_cache_prefixo_chamadas_total counter",
+        ]
+        linhas += [f'internready_cache_prefixo_chamadas_total{{resultado="{r}"}} {n}'
+                   for r, n in self._cache_prefixo.items()]
+        for coletor in self._coletores:
+            linhas += coletor()
+        return "\n".join(linhas) + "\n"
+
+    def adicionar_coletor(self, coletor):
+        """Inclui na exposição as linhas de coletor() (chamado a cada leitura)"""
+        with self._lock:
+            if coletor not in self._coletores:
+                self._coletores.append(coletor)
+
+    def estatisticas_cache_prefixo(self):
+        """Chamadas com acerto no cache de prefixo, taxa de acerto e fração dos tokens de prompt em cache"""
+        with self._lock:
+            chamadas = self._cache_prefixo["acerto"] + self._cache_prefixo["falha"]
+            return {
+                "chamadas": chamadas,
+                "acertos": self._cache_prefixo["acerto"],
+                "taxa_acerto": self._cache_prefixo["acerto"] / chamadas if chamadas else 0.0,
+                "fracao_tokens": self._tokens["cached"] / self._tokens["prompt"] if self._tokens["prompt"] else 0.0,
+            }
+
+    def texto_prometheus(self):
+        """Métricas no formato de exposição de texto do Prometheus"""
+        with self._lock:
+            return self._texto_prometheus()
+
+    def servir(self, porta=None, host=None):
+        """Serve GET /metrics em uma thread de fundo (uma vez por registro); retorna o servidor
+
+        Por padrão escuta só em METRICAS_HOST (127.0.0.1); para expor a um
+        coletor em outra máquina, configure INTERNREADY_METRICAS_HOST.
+        """
+        # http.server só é importado aqui: importar o pacote não deve pagar por ele
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        with self._lock:
+            if self._servidor is None:
+                registro = self
+
+                class _Handler(BaseHTTPRequestHandler):
+                    def log_message(self, formato, *args):
+                        pass
+
+                    def do_GET(self):
+                        if self.path.rstrip("/") != "/metrics":
+                            self.send_error(404)
+                            return
+                        corpo = registro.texto_prometheus().encode("utf-8")
+                        self.send_response(200)
+                        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                        self.send_header("Content-Length", str(len(corpo)))
+                        self.end_headers()
+                        self.wfile.write(corpo)
+
+                endereco = (config.METRICAS_HOST if host is None else host, porta or config.METRICAS_PORTA)
+                self._servidor = ThreadingHTTPServer(endereco, _Handler)
+                self._servidor.daemon_threads = True
+                threading.Thread(target=self._servidor.serve_forever, name="internready-metricas",
+                                 daemon=True).start()
+            return self._servidor
+
+
+class Rastreador:
+    """Spans e tokens de uma análise; finalizar() envia ao registro"""
+
+    def __init__(self, registro=None, **atributos):
+        self.registro = registro
+        self.id = uuid.uuid4().hex[:16]
+        self.atributos = atributos
+        self.etapas = {}
+        self.tokens = None
+        self.chamadas = []
+        self._inicio = time.time()
+        self._atual = None  # (etapa, início) aberta por iniciar()
+
+    @contextmanager
+    def etapa(self, nome):
+        """Mede o bloco como um span; etapas repetidas acumulam a duração"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapas[nome] = self.etapas.get(nome, 0.0) + time.perf_counter() - inicio
+
+    def iniciar(self, nome):
+        """Encerra a etapa aberta por iniciar() e abre a próxima (para fluxos sequenciais)"""
+        self._encerrar_atual()
+        self._atual = (nome, time.perf_counter())
+
+    def _encerrar_atual(self):
+        if self._atual is not None:
+            nome, inicio = self._atual
+            self.etapas[nome] = self.etapas.get(nome, 0.0) + time.perf_counter() - inicio
+            self._atual = None
+
+    def uso(self, usage):
+        """Soma os tokens de um response.usage (ou do dict de uso_tokens)"""
+        tokens = usage if isinstance(usage, dict) and "prompt" in usage else uso_tokens(usage)
+        if tokens:
+            self.tokens = {tipo: (self.tokens or {}).get(tipo, 0) + tokens[tipo] for tipo in TIPOS_TOKEN}
+
+    def chamada(self, modelo, uso, ttft_s=None, backend=None):
+        """Registra uma chamada ao modelo (tokens, inclusive os do cache de prefixo, e tempo até o 1º token)"""
+        tokens = uso if isinstance(uso, dict) and "prompt" in uso else uso_tokens(uso)
+        if not tokens:
+            return
+        self.uso(tokens)
+        self.chamadas.append({"modelo": modelo, "backend": backend, "ttft_s": ttft_s,
+                              **{tipo: tokens[tipo] for tipo in TIPOS_TOKEN}})
+
+    def finalizar(self, resultado="ok"):
+        """Registro da análise (também gravado no log JSON lines, se houver registro)"""
+        self._encerrar_atual()
+        registro = {
+            "id": self.id,
+            "inicio": self._inicio,
+            "resultado": resultado,
+            "etapas": {nome: round(duracao, 6) for nome, duracao in self.etapas.items()},
+            "tokens": self.tokens,
+            "chamadas": self.chamadas,
+            **self.atributos,
+        }
+        if self.registro is not None:
+            try:
+                self.registro.registrar(registro)
+            except OSError as e:
+                logger.warning("não foi possível gravar as métricas: %s", e)
+        return registro
+
+
+def ler_log(caminho=None):
+    """Registros do log JSON lines de métricas, incluindo o arquivo rotacionado (linhas corrompidas são ignoradas)"""
+    caminho = config.METRICAS_LOG if caminho is None else caminho
+    anterior = f"{caminho}.1"
+    for atual in ((anterior, caminho) if os.path.exists(anterior) else (caminho,)):
+        with open(atual, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    yield json.loads(linha)
+                except json.JSONDecodeError:
+                    continue
+
+
+def _media(valores):
+    return sum(valores) / len(valores) if valores else None
+
+
+def relatorio_cache_prefixo(registros, precos=None):
+    """Resumo do cache de prefixo nas chamadas dos registros (ex.: ler_log())
+
+    A latência economizada compara, por modelo, o tempo até o primeiro
+    token das chamadas com e sem acerto; o custo economizado aplica aos
+    tokens em cache a diferença de preço de PRECOS_PROMPT_POR_MILHAO.
+    """
+    precos = PRECOS_PROMPT_POR_MILHAO if precos is None else precos
+    por_modelo = {}
+    for registro in registros:
+        for chamada in registro.get("chamadas") or ():
+            m = por_modelo.setdefault(chamada["modelo"], {
+                "chamadas": 0, "acertos": 0, "prompt": 0, "cached": 0, "ttft_acerto": [], "ttft_falha": [],
+            })
+            m["chamadas"] += 1
+            m["acertos"] += bool(chamada["cached"])
+            m["prompt"] += chamada["prompt"]
+            m["cached"] += chamada["cached"]
+            if chamada.get("ttft_s") is not None:
+                m["ttft_acerto" if chamada["cached"] else "ttft_falha"].append(chamada["ttft_s"])
+
+    modelos = {}
+    for modelo, m in sorted(por_modelo.items()):
+        ttft_acerto, ttft_falha = _media(m["ttft_acerto"]), _media(m["ttft_falha"])
+        latencia = None
+        if ttft_acerto is not None and ttft_falha is not None:
+            latencia = max(0.0, ttft_falha - ttft_acerto) * len(m["ttft_acerto"])
+        custo = None
+        if modelo in precos:
+            normal, em_cache = precos[modelo]
+            custo = m["cached"] * (normal - em_cache) / 1e6
+        modelos[modelo] = {
+            "chamadas": m["chamadas"],
+            "acertos": m["acertos"],
+            "taxa_acerto": m["acertos"] / m["chamadas"],
+            "tokens_prompt": m["prompt"],
+            "tokens_cached": m["cached"],
+            "fracao_tokens": m["cached"] / m["prompt"] if m["prompt"] else 0.0,
+            "ttft_acerto_s": ttft_acerto,
+            "ttft_falha_s": ttft_falha,
+            "latencia_economizada_s": latencia,
+            "custo_economizado_usd": custo,
+        }
+
+    chamadas = sum(m["chamadas"] for m in modelos.values())
+    acertos = sum(m["acertos"] for m in modelos.values())
+    prompt = sum(m["tokens_prompt"] for m in modelos.values())
+    cached = sum(m["tokens_cached"] for m in modelos.values())
+    return {
+        "chamadas": chamadas,
+        "acertos": acertos,
+        "taxa_acerto": acertos / chamadas if chamadas else 0.0,
+        "tokens_prompt": prompt,
+        "tokens_cached": cached,
+        "fracao_tokens": cached / prompt if prompt else 0.0,
+        "latencia_economizada_s": sum(m["latencia_economizada_s"] or 0.0 for m in modelos.values()),
+        "custo_economizado_usd": sum(m["custo_economizado_usd"] or 0.0 for m in modelos.values()),
+        "por_modelo": modelos,
+    }
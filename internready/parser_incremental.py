@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""Leitura da resposta do modelo: em trechos durante o streaming ou inteira ao final"""
+
+import json
+import re
+
+# Caracteres relevantes em cada estado; o restante do texto é saltado sem inspeção
+_RE_FORA = re.compile(r"[\[{}]")
+_RE_ARRAY = re.compile(r'["{}\]]')
+_RE_STRING = re.compile(r'["\\]')
+_RE_NAO_ESPACO = re.compile(r"\S")
+# Mesmo critério de abertura do array que o ParserIncremental: "[" seguido de "{" ou "]"
+_RE_INICIO_ARRAY = re.compile(r"\[\s*(?=[{\]])")
+_DECODER = json.JSONDecoder()
+
+
+def _limpar_qualitativo(texto):
+    texto = texto.strip()
+    # Fecho do bloco de código quando o modelo envolve o JSON em ```json ... ```
+    if texto.startswith("```"):
+        texto = texto[3:].strip()
+    return texto
+
+
+class ParserIncremental:
+    """Localiza o array de competências e o início da parte qualitativa
+
+    O primeiro ``[`` seguido (ignorando espaços) de ``{`` ou ``]`` abre o array
+    de competências. Dentro dele chaves e strings (em qualquer nível) são
+    acompanhadas, então ``]`` ou ``}`` dentro de strings e objetos aninhados
+    não confundem a leitura, e
+    cada objeto é devolvido por alimentar() assim que fecha. O texto após o
+    ``]`` que fecha o array é a parte qualitativa.
+
+    Se o array não trouxer nenhum objeto válido, objetos planos ``{...}``
+    encontrados fora dele servem de alternativa (como o antigo fallback por regex).
+    """
+
+    def __init__(self):
+        self._trechos = []
+        self._tamanho = 0
+
+        self.array_aberto = False
+        self.array_fechado = False
+        self.inicio_qualitativo = None  # offset absoluto logo após o "]" do array
+        self.objetos = []  # objetos do array já decodificados
+
+        self._candidato_array = False  # viu "[" e espera o próximo caractere não branco
+        self._profundidade = 0  # chaves abertas dentro do array
+        self._em_string = False
+        self._escape = False
+        self._objeto_parcial = []  # trechos do objeto em andamento
+        self._inicio_objeto = None  # índice no trecho atual onde o objeto começou
+
+        self._inicio_solto = None  # offset absoluto do último "{" fora do array
+        self._spans_soltos = []  # (inicio, fim) de objetos planos fora do array
+
+    def alimentar(self, trecho):
+        """Processa mais um trecho e retorna a lista de objetos do array que fecharam nele"""
+        novos = []
+        base = self._tamanho
+        self._trechos.append(trecho)
+        self._tamanho += len(trecho)
+        if self.array_fechado and self.objetos:
+            return novos
+
+        pos = 0
+        n = len(trecho)
+        while pos < n:
+            if self.array_aberto and not self.array_fechado:
+                pos = self._ler_array(trecho, pos, base, novos)
+                continue
+
+            if self._candidato_array:
+                m = _RE_NAO_ESPACO.search(trecho, pos)
+                if m is None:
+                    break
+                self._candidato_array = False
+                c = m.group()
+                if c == "{":
+                    self.array_aberto = True
+                    self._inicio_solto = None
+                    pos = m.start()
+                    continue
+                if c == "]":
+                    self.array_aberto = self.array_fechado = True
+                    self.inicio_qualitativo = base + m.end()
+                    pos = m.end()
+                    continue
+                pos = m.start()
+
+            m = _RE_FORA.search(trecho, pos)
+            if m is None:
+                break
+            c = m.group()
+            if c == "[":
+                if not self.array_aberto:
+                    self._candidato_array = True
+            elif c == "{":
+                self._inicio_solto = base + m.start()
+            elif self._inicio_solto is not None:
+                self._spans_soltos.append((self._inicio_solto, base + m.end()))
+                self._inicio_solto = None
+            pos = m.end()
+
+        # Objeto ainda aberto no fim do trecho: guarda o pedaço para o próximo
+        if self._inicio_objeto is not None:
+            self._objeto_parcial.append(trecho[self._inicio_objeto:])
+            self._inicio_objeto = 0
+        return novos
+
+    def _ler_array(self, trecho, pos, base, novos):
+        """Avança dentro do array até o próximo caractere relevante; retorna a nova posição"""
+        if self._em_string:
+            if self._escape:
+                self._escape = False
+                return pos + 1
+            m = _RE_STRING.search(trecho, pos)
+            if m is None:
+                return len(trecho)
+            if m.group() == "\\":
+                if m.end() == len(trecho):
+                    self._escape = True
+                return m.end() + 1
+            self._em_string = False
+            return m.end()
+
+        m = _RE_ARRAY.search(trecho, pos)
+        if m is None:
+            return len(trecho)
+        c = m.group()
+        i = m.start()
+        if c == '"':
+            # Strings soltas entre os objetos também contam: um "]" dentro delas não fecha o array
+            self._em_string = True
+        elif c == "{":
+            if self._profundidade == 0:
+                # Caminho rápido: objeto completo e válido neste trecho é decodificado em C
+                try:
+                    objeto, fim = _DECODER.raw_decode(trecho, i)
+                except ValueError:
+                    pass
+                else:
+                    self.objetos.append(objeto)
+                    novos.append(objeto)
+                    return fim
+                self._inicio_objeto = i
+                self._objeto_parcial = []
+            self._profundidade += 1
+        elif c == "}":
+            if self._profundidade > 0:
+                self._profundidade -= 1
+                if self._profundidade == 0:
+                    texto_objeto = "".join(self._objeto_parcial) + trecho[self._inicio_objeto:i + 1]
+                    self._inicio_objeto = None
+                    self._objeto_parcial = []
+                    try:
+                        objeto = json.loads(texto_objeto)
+                    except json.JSONDecodeError:
+                        pass
+                    else:
+                        self.objetos.append(objeto)
+                        novos.append(objeto)
+        elif self._profundidade == 0:
+            self.array_fechado = True
+            self.inicio_qualitativo = base + i + 1
+        return m.end()
+
+    def texto(self):
+        """Resposta recebida até agora"""
+        return "".join(self._trechos)
+
+    def texto_qualitativo(self):
+        """Texto após o array de competências, ou None enquanto o array não fechar"""
+        if self.inicio_qualitativo is None:
+            return None
+        return _limpar_qualitativo(self.texto()[self.inicio_qualitativo:])
+
+    def competencias(self):
+        """Objetos do array ou, se não houver, objetos planos encontrados fora dele"""
+        if self.objetos:
+            return list(self.objetos)
+        texto = self.texto()
+        soltos = []
+        for inicio, fim in self._spans_soltos:
+            try:
+                soltos.append(json.loads(texto[inicio:fim]))
+            except json.JSONDecodeError:
+                continue
+        return soltos
+
+
+def separar_resposta(resposta_completa):
+    """Retorna (objetos de competência ou None, texto qualitativo ou None) da resposta inteira
+
+    Com a resposta completa em mãos, um array JSON válido só de objetos é
+    decodificado de uma vez em C; o ParserIncremental, feito para o
+    streaming, só lê as respostas malformadas, com o mesmo resultado.
+    """
+    m = _RE_INICIO_ARRAY.search(resposta_completa)
+    if m is not None:
+        try:
+            objetos, fim = _DECODER.raw_decode(resposta_completa, m.start())
+        except ValueError:
+            pass
+        else:
+            if objetos and all(isinstance(objeto, dict) for objeto in objetos):
+                return objetos, _limpar_qualitativo(resposta_completa[fim:])
+
+    parser = ParserIncremental()
+    parser.alimentar(resposta_completa)
+    return parser.competencias() or None, parser.texto_qualitativo()
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""Leitura da parte qualitativa da resposta
+
+Os cabeçalhos de seção (**Pontos Fortes:**, **Pontos de Melhoria:**,
+**Sugestões:** e **Recomendações:**) são localizados por uma varredura
+com um único padrão; o conteúdo de cada seção vai do seu primeiro
+cabeçalho até o primeiro cabeçalho que a encerra. Sem nenhum desses
+cabeçalhos, vale o formato por linhas ("### **Pontos Fortes**",
+"- **Sugestões**" etc.), lido por uma máquina de estados linha a linha a
+partir da linha do primeiro "**" (antes dele não há cabeçalho possível).
+
+O resultado é o mesmo da implementação anterior por expressões com
+.*? e lookaheads, inclusive nas combinações pouco usuais de ordem das
+seções; benchmarks.fuzz_qualitativa compara as duas.
+"""
+
+import re
+
+# Ordem das seções no resultado quando os cabeçalhos com dois-pontos são encontrados
+SECOES = ("pontos fortes", "pontos de melhoria", "sugestões", "recomendações")
+
+# Cabeçalhos que encerram cada seção (Pontos Fortes não termina em Recomendações)
+TERMINADORES = {
+    "pontos fortes": ("pontos de melhoria", "sugestões"),
+    "pontos de melhoria": ("sugestões", "recomendações"),
+    "sugestões": ("recomendações",),
+    "recomendações": (),
+}
+
+_GRUPOS = {"pf": "pontos fortes", "pm": "pontos de melhoria", "su": "sugestões", "re": "recomendações"}
+
+# Só o "**" de abertura é consumido, para cabeçalhos sobrepostos ("**Sugestões:**Recomendações:**")
+_CABECALHO = re.compile(
+    r"\*\*(?=(?:(?P<pf>Pontos Fortes)|(?P<pm>Pontos de Melhoria)|(?P<su>Sugestões)|(?P<re>Recomendações)):\*\*)",
+    re.IGNORECASE,
+)
+
+# Cabeçalhos do formato por linhas, na ordem em que são testados
+_SECOES_LINHA = ("pontos fortes", "pontos de melhoria", "sugestões")
+
+# Fronteiras de ponto dentro de uma linha: antes de "•" e antes de "- "
+_FRONTEIRA_PONTO = re.compile(r"(?=•)|(?=- )")
+
+
+def _secoes_por_linha(texto):
+    """Máquina de estados do formato sem dois-pontos: um cabeçalho por linha"""
+    secoes = {}
+    secao_atual = None
+    conteudo_atual = []
+    for linha in texto.split("\n"):
+        linha = linha.strip()
+        if not linha:
+            continue
+        secao = None
+        if "**" in linha:
+            minuscula = linha.lower()
+            secao = next((s for s in _SECOES_LINHA if s in minuscula), None)
+        if secao is not None:
+            # Uma seção repetida só substitui a anterior se tiver conteúdo
+            if secao_atual and conteudo_atual:
+                secoes[secao_atual] = "\n".join(conteudo_atual)
+            secao_atual = secao
+            conteudo_atual = []
+        elif secao_atual:
+            conteudo_atual.append(linha)
+    if secao_atual and conteudo_atual:
+        secoes[secao_atual] = "\n".join(conteudo_atual)
+    return secoes
+
+
+def ler_secoes(texto):
+    """{seção: conteúdo} na ordem de exibição; {} se nenhuma seção for reconhecida"""
+    if not texto:
+        return {}
+
+    # Todos os cabeçalhos em ordem de posição: (início, fim, seção); o fim inclui ":**"
+    cabecalhos = [(m.start(), m.end(m.lastgroup) + 3, _GRUPOS[m.lastgroup]) for m in _CABECALHO.finditer(texto)]
+    if not cabecalhos:
+        primeiro = texto.find("**")
+        if primeiro == -1:
+            return {}
+        return _secoes_por_linha(texto[texto.rfind("\n", 0, primeiro) + 1:])
+
+    primeiro = {}
+    for i, (_, _, secao) in enumerate(cabecalhos):
+        primeiro.setdefault(secao, i)
+
+    secoes = {}
+    for secao in SECOES:
+        if secao not in primeiro:
+            continue
+        i = primeiro[secao]
+        fim = cabecalhos[i][1]
+        terminadores = TERMINADORES[secao]
+        # Fim: primeiro cabeçalho terminador que começa depois deste cabeçalho
+        limite = len(texto)
+        for j in range(i + 1, len(cabecalhos)):
+            inicio, _, outra = cabecalhos[j]
+            if inicio >= fim and outra in terminadores:
+                limite = inicio
+                break
+        secoes[secao] = texto[fim:limite].strip()
+    return secoes
+
+
+def dividir_pontos(conteudo):
+    """Lista de pontos de uma seção: separa por linha, antes de "•" e antes de "- " """
+    if "•" not in conteudo and "-" not in conteudo and "\n" not in conteudo:
+        return [conteudo]
+    pontos = []  # cada ponto como lista de trechos, unidos no fim (continuações longas não viram O(n²))
+    for linha in conteudo.split("\n"):
+        recuada = linha.lstrip()
+        if not recuada:
+            continue
+        if recuada[0] == "•":
+            recuada = "-" + recuada[1:]
+        # O espaço final conta: "texto - " também abre um ponto (vazio)
+        if "•" in recuada or recuada.find("- ", 2 if recuada.startswith("- ") else 0) != -1:
+            # Marcadores no meio da linha: cada um abre um ponto
+            trechos = [t.strip() for t in _FRONTEIRA_PONTO.split(linha)]
+        else:
+            trechos = (recuada.rstrip(),)
+        for trecho in trechos:
+            if not trecho:
+                continue
+            if trecho[0] == "•":
+                trecho = "-" + trecho[1:].rstrip()
+            if trecho.startswith("- "):
+                pontos.append([trecho[2:].strip()])
+            elif trecho[0] != "-":
+                # Continuação do ponto anterior
+                if pontos:
+                    pontos[-1].append(trecho)
+                else:
+                    pontos.append([trecho])
+    return [" ".join(partes) for partes in pontos]
+
+
+def analisar_qualitativa(texto):
+    """{seção: [pontos]} a partir do texto qualitativo"""
+    return {secao: dividir_pontos(conteudo) for secao, conteudo in ler_secoes(texto).items()}
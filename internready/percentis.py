@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""Percentil de um candidato em cada competência, comparado ao histórico
+
+As distribuições de todas as competências ficam em um único array NumPy
+ordenado de chaves ``índice_da_área * ESCALA + pontuação``: cada área
+ocupa uma faixa contígua, e um par de searchsorted responde o percentil de
+todas as competências de um candidato de uma vez. Novas pontuações entram
+em um buffer e são intercaladas no array na consulta seguinte.
+"""
+
+import threading
+
+from . import config
+
+# Maior que qualquer pontuação válida (0-100), para as faixas das áreas não se misturarem
+ESCALA = 1000.0
+
+# Distribuição das médias por candidato, comparada à "Pontuação Média"
+AREA_MEDIA = "__media__"
+
+
+def normalizar_area(area):
+    """Chave da área: o modelo varia maiúsculas e espaços entre respostas"""
+    return " ".join(str(area).split()).casefold()
+
+
+class MotorPercentis:
+    """Distribuições ordenadas por competência com atualização incremental"""
+
+    def __init__(self, min_amostras=None):
+        import numpy as np
+
+        self._np = np
+        self.min_amostras = config.PERCENTIL_MIN_AMOSTRAS if min_amostras is None else min_amostras
+        self._lock = threading.Lock()
+        self._indices = {}  # área normalizada -> índice
+        self._chaves = np.empty(0, dtype=np.float64)
+        self._inicios = np.empty(0, dtype=np.int64)
+        self._tamanhos = np.empty(0, dtype=np.int64)
+        self._pendentes = []  # chaves ainda não intercaladas
+        self._sujo = False
+
+    def _indice(self, area):
+        chave = normalizar_area(area)
+        indice = self._indices.get(chave)
+        if indice is None:
+            indice = self._indices[chave] = len(self._indices)
+        return indice
+
+    def adicionar(self, pares):
+        """Acrescenta pares (área, pontuação) às distribuições"""
+        with self._lock:
+            self._pendentes.extend(self._indice(area) * ESCALA + float(pontuacao) for area, pontuacao in pares)
+            self._sujo = True
+
+    def carregar(self, distribuicoes):
+        """Acrescenta {área: [pontuações]} de uma vez (ex.: HistoricoAnalises.pontuacoes_por_area)"""
+        self.adicionar((area, p) for area, pontuacoes in distribuicoes.items() for p in pontuacoes)
+
+    def carregar_historico(self, historico):
+        """Carrega as distribuições por área e das médias de um HistoricoAnalises"""
+        self.carregar(historico.pontuacoes_por_area())
+        self.carregar({AREA_MEDIA: historico.medias_por_candidato()})
+
+    def _consolidar(self):
+        if not self._sujo:
+            return
+        np = self._np
+        if self._pendentes:
+            novos = np.sort(np.asarray(self._pendentes, dtype=np.float64))
+            self._pendentes = []
+            # Intercalação: cada nova chave entra na sua posição no array já ordenado
+            self._chaves = np.insert(self._chaves, np.searchsorted(self._chaves, novos), novos)
+        # Faixa de cada área no array: [início, início + tamanho)
+        posicoes = np.searchsorted(self._chaves, np.arange(len(self._indices) + 1, dtype=np.float64) * ESCALA)
+        self._inicios = posicoes[:-1]
+        self._tamanhos = np.diff(posicoes)
+        self._sujo = False
+
+    def percentis(self, areas, pontuacoes):
+        """Percentil (0-100, posição média nos empates) de cada pontuação na distribuição da sua área
+
+        Devolve um array NumPy; NaN onde a área tem menos de min_amostras no histórico.
+        """
+        np = self._np
+        valores = np.asarray(pontuacoes, dtype=np.float64)
+        with self._lock:
+            self._consolidar()
+            if not self._indices:
+                return np.full(valores.shape, np.nan)
+            indices = np.fromiter((self._indices.get(normalizar_area(a), -1) for a in areas), dtype=np.int64,
+                                  count=len(valores))
+            conhecidas = indices >= 0
+            seguros = np.where(conhecidas, indices, 0)
+            chaves = seguros * ESCALA + valores
+            esquerda = np.searchsorted(self._chaves, chaves, side="left")
+            direita = np.searchsorted(self._chaves, chaves, side="right")
+            inicios = self._inicios[seguros]
+            tamanhos = self._tamanhos[seguros]
+
+        validos = conhecidas & (tamanhos >= max(self.min_amostras, 1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            resultado = ((esquerda - inicios) + 0.5 * (direita - esquerda)) / tamanhos * 100
+        return np.where(validos, resultado, np.nan)
+
+    def percentil_media(self, media):
+        """Percentil da pontuação média entre as médias dos candidatos do histórico"""
+        return float(self.percentis([AREA_MEDIA], [media])[0])
+
+    def amostras(self, area):
+        """Quantidade de pontuações no histórico para a área"""
+        with self._lock:
+            self._consolidar()
+            indice = self._indices.get(normalizar_area(area))
+            return 0 if indice is None else int(self._tamanhos[indice])
+
+    def registrar_candidato(self, competencias):
+        """Acrescenta as competências ({"Área", "Pontuação"}) e a média de um novo candidato"""
+        if not competencias:
+            return
+        pares = [(c["Área"], c["Pontuação"]) for c in competencias]
+        media = sum(p for _, p in pares) / len(pares)
+        self.adicionar(pares + [(AREA_MEDIA, media)])
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""API do pipeline de análise, utilizável sem Streamlit
+
+Importar este módulo não carrega streamlit, matplotlib, openai, pandas
+nem PyMuPDF; cada um é importado apenas na primeira chamada que o usa.
+"""
+
+import logging
+import time
+
+from .analise import (
+    SECOES_CONFIG, extrair_json_robusto, interpretar_estruturada, parametros_chamada,
+    separar_texto_qualitativo, validar_competencias,
+)
+from .extracao import ErroExtracao, extrair_texto
+from .metricas import uso_tokens
+from .parser_qualitativo import analisar_qualitativa
+from .roteador import chave_cache, resposta_aceita
+from .taxonomia import canonizar_competencias
+
+logger = logging.getLogger(__name__)
+
+
+def _ler_pdf(pdf):
+    # Caminhos são lidos do disco; bytes e buffers seguem sem cópia
+    if isinstance(pdf, str) or hasattr(pdf, "__fspath__"):
+        with open(pdf, "rb") as f:
+            return f.read()
+    return pdf
+
+
+def extract_text(pdf, **limites):
+    """Extrai o texto de um PDF (caminho, bytes ou buffer) respeitando o orçamento configurado"""
+    return extrair_texto(_ler_pdf(pdf), **limites)
+
+
+def _cliente(client, api_key):
+    if client is None:
+        from openai import OpenAI
+        client = OpenAI(api_key=api_key)
+    return client
+
+
+def analyze(texto_curriculo, client=None, api_key=None, estruturado=False, **modelo):
+    """Envia o currículo ao modelo e retorna a resposta completa em texto
+
+    Com estruturado=True a resposta é um JSON que segue ESQUEMA_ANALISE.
+    modelo, temperatura e max_tokens (opcionais) substituem os padrões.
+    """
+    client = _cliente(client, api_key)
+    response = client.chat.completions.create(**parametros_chamada(texto_curriculo, estruturado, **modelo))
+    return response.choices[0].message.content
+
+
+def analyze_stream(texto_curriculo, client=None, api_key=None, ao_fragmento=None, estruturado=False,
+                   agendador=None, ao_aguardar=None, **modelo):
+    """Como analyze, mas com stream=True: ao_fragmento(trecho) é chamado a cada trecho recebido
+
+    Com agendador (limites.AgendadorLimites) a chamada passa pela fila de
+    RPM/TPM da chave do cliente e ao_aguardar(posicao, espera_s) informa a
+    posição na fila.
+    Retorna (resposta_completa, tempos), com o tempo até o primeiro token
+    (ttft_s) e até o último token (ttlt_s) em segundos e o consumo de
+    tokens em uso ({"prompt", "completion", "cached"}, ou None). O tempo na
+    fila do agendador fica em espera_s e é descontado de ttft_s e ttlt_s,
+    que medem sempre requisição, cabeçalhos e geração, com ou sem fila.
+    """
+    client = _cliente(client, api_key)
+    # O último trecho do stream traz response.usage
+    parametros = {
+        **parametros_chamada(texto_curriculo, estruturado, **modelo), "stream_options": {"include_usage": True}
+    }
+    medicao = {"espera_s": 0.0}
+    inicio = time.perf_counter()
+    if agendador is None:
+        stream = client.chat.completions.create(**parametros, stream=True)
+    else:
+        from .limites import conta_do_cliente, tokens_estimados
+
+        # As novas tentativas ficam com o agendador, não com o SDK
+        completions = client.with_options(max_retries=0).chat.completions
+        stream = agendador.executar(
+            lambda: completions.with_raw_response.create(**parametros, stream=True),
+            tokens_estimados(parametros), ao_aguardar, medicao, conta=conta_do_cliente(client),
+        )
+
+    partes = []
+    ttft = None
+    uso = None
+    for evento in stream:
+        if getattr(evento, "usage", None) is not None:
+            uso = uso_tokens(evento.usage)
+        if not evento.choices:
+            continue
+        trecho = evento.choices[0].delta.content
+        if not trecho:
+            continue
+        if ttft is None:
+            ttft = time.perf_counter() - inicio - medicao["espera_s"]
+        partes.append(trecho)
+        if ao_fragmento:
+            ao_fragmento(trecho)
+
+    tempos = {
+        "ttft_s": ttft, "ttlt_s": time.perf_counter() - inicio - medicao["espera_s"],
+        "espera_s": medicao["espera_s"], "uso": uso,
+    }
+    logger.info("analise em streaming: ttft=%.3fs ttlt=%.3fs espera=%.3fs", ttft or 0.0, tempos["ttlt_s"],
+                tempos["espera_s"])
+    return "".join(partes), tempos
+
+
+def parse_competencias(resposta_completa):
+    """Lista de {"Área", "Pontuação"} válidos encontrados na resposta, com as áreas canônicas"""
+    return canonizar_competencias(validar_competencias(extrair_json_robusto(resposta_completa)))
+
+
+def parse_qualitativa(resposta_completa):
+    """Seções qualitativas da resposta como {titulo: [pontos]}, ou {} se não houver"""
+    secoes = analisar_qualitativa(separar_texto_qualitativo(resposta_completa))
+    return {SECOES_CONFIG[secao]["titulo"]: [p for p in pontos if p.strip()] for secao, pontos in secoes.items()}
+
+
+def interpretar_resposta(resposta_completa, estruturado=False):
+    """(competências válidas, {titulo: [pontos]}) para uma resposta de qualquer modo"""
+    if not estruturado:
+        return parse_competencias(resposta_completa), parse_qualitativa(resposta_completa)
+    objetos, secoes = interpretar_estruturada(resposta_completa)
+    return canonizar_competencias(validar_competencias(objetos)), {
+        SECOES_CONFIG[secao]["titulo"]: pontos for secao, pontos in secoes.items()
+    }
+
+
+def analyze_pdf(pdf, client=None, api_key=None, cache=None, estruturado=False, voo_unico=None):
+    """Pipeline completo de um PDF: extração, modelo (ou cache) e interpretação
+
+    Com voo_unico (voo_unico.VooUnico), chamadas simultâneas para o mesmo
+    PDF e configuração compartilham uma única chamada ao modelo.
+    """
+    pdf = _ler_pdf(pdf)
+    chave = chave_cache(pdf, estruturado) if cache or voo_unico else None
+    resposta = cache.obter(chave) if cache else None
+    do_cache = resposta is not None
+    if not do_cache:
+        def chamar_modelo():
+            nonlocal do_cache
+            # Outra líder pode ter gravado a resposta entre a consulta ao cache e a entrada no voo
+            resposta = cache.obter(chave) if cache and voo_unico is not None else None
+            if resposta is not None:
+                do_cache = True
+                return resposta
+            texto_curriculo = extract_text(pdf)
+            if not texto_curriculo.strip():
+                raise ErroExtracao("Não foi possível extrair texto do PDF")
+            resposta = analyze(texto_curriculo, client=client, api_key=api_key, estruturado=estruturado)
+            # Gravada antes de a líder liberar quem aguarda, para quem chegar depois encontrar o cache
+            if cache and resposta_aceita(interpretar_resposta(resposta, estruturado)[0]):
+                cache.gravar(chave, resposta)
+            return resposta
+
+        if voo_unico is not None:
+            resposta, _ = voo_unico.executar(chave, chamar_modelo)
+        else:
+            resposta = chamar_modelo()
+
+    competencias, qualitativa = interpretar_resposta(resposta, estruturado)
+    return {
+        "competencias": competencias,
+        "qualitativa": qualitativa,
+        "resposta": resposta,
+        "do_cache": do_cache,
+    }
@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+"""Cascata de modelos: o mais barato primeiro, escalando só quando a resposta não serve
+
+Os backends são tentados em ordem. A resposta de um backend é aceita
+quando rende ao menos ROTEADOR_MIN_COMPETENCIAS competências válidas;
+senão (ou se a chamada falhar) a análise passa ao próximo. O último
+backend sempre decide. Sem configuração a cascata tem só o modelo padrão:
+escalar para um modelo mais caro (na chave do usuário) é opcional e
+aparece na interface. Cada backend é um servidor compatível com a API
+da OpenAI: sem base_url é a própria OpenAI; com base_url pode ser um
+servidor interno que absorve o volume do lote.
+
+A configuração vem de INTERNREADY_ROTEADOR_BACKENDS, uma lista JSON:
+
+    [{"nome": "interno", "base_url": "http://llm.interno:8000/v1", "modelo": "qwen2.5-14b-instruct",
+      "api_key_env": "LLM_INTERNO_KEY"},
+     {"nome": "gpt-4o-mini", "modelo": "gpt-4o-mini"},
+     {"nome": "gpt-4o", "modelo": "gpt-4o", "max_tokens": 3000}]
+
+Campos opcionais: temperatura, max_tokens e api_key_env (variável com a
+chave do backend). A chave do usuário só é enviada à própria OpenAI: um
+backend em outro servidor precisa de api_key_env, e se a variável estiver
+vazia ele é pulado na cascata. O roteador registra
+por backend chamadas, escalações, erros e latência, para ajustar a ordem
+com dados.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+from . import config
+from .analise import MAX_TOKENS, MODELO, TEMPERATURA, versao_prompt
+from .cache import chave_analise
+from .extracao import versao_extracao
+
+logger = logging.getLogger(__name__)
+
+BACKENDS_PADRAO = ({"nome": MODELO, "modelo": MODELO},)
+
+# Latências guardadas por backend para os percentis
+_JANELA_LATENCIAS = 1000
+
+_HOST_OPENAI = "api.openai.com"
+
+
+class ErroConfiguracaoBackend(ValueError):
+    """Backend sem uma chave própria configurada"""
+
+
+def backend_openai(backend):
+    """Se o backend é a própria API da OpenAI (a única que pode receber a chave do usuário)"""
+    return not backend["base_url"] or urlparse(backend["base_url"]).hostname == _HOST_OPENAI
+
+
+def carregar_backends(texto=None):
+    """Backends de INTERNREADY_ROTEADOR_BACKENDS (ou de texto), completados com os padrões"""
+    texto = config.ROTEADOR_BACKENDS if texto is None else texto
+    try:
+        backends = json.loads(texto) if texto else list(BACKENDS_PADRAO)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"INTERNREADY_ROTEADOR_BACKENDS não é um JSON válido: {e}") from e
+    if not backends:
+        raise ValueError("INTERNREADY_ROTEADOR_BACKENDS não tem nenhum backend")
+    completos = []
+    for backend in backends:
+        completo = completar_backend(backend)
+        if any(c["nome"] == completo["nome"] for c in completos):
+            raise ValueError(
+                f"INTERNREADY_ROTEADOR_BACKENDS repete o backend {completo['nome']!r}: dê um nome a cada um"
+            )
+        completos.append(completo)
+    return completos
+
+
+def completar_backend(backend):
+    """Backend com os campos opcionais preenchidos pelos padrões de analise"""
+    modelo = backend.get("modelo") or MODELO
+    nome = backend.get("nome") or modelo
+    completo = {
+        "nome": nome,
+        "modelo": modelo,
+        "base_url": backend.get("base_url"),
+        "api_key_env": backend.get("api_key_env"),
+        "temperatura": TEMPERATURA if backend.get("temperatura") is None else backend["temperatura"],
+        "max_tokens": backend.get("max_tokens") or MAX_TOKENS,
+    }
+    if not completo["api_key_env"] and not backend_openai(completo):
+        raise ErroConfiguracaoBackend(
+            f"o backend {nome!r} usa {completo['base_url']} e precisa de api_key_env: "
+            "a chave do usuário só é enviada à OpenAI"
+        )
+    return completo
+
+
+def backend_padrao():
+    """O modelo padrão na OpenAI, chamado sem cascata pelo CLI, pelo lote sem roteador e pela Batch API"""
+    return completar_backend({"modelo": MODELO})
+
+
+def descritor_backend(backend):
+    """Modelo (e servidor) de um backend; na própria OpenAI é só o nome do modelo"""
+    return f"{backend['modelo']}@{backend['base_url']}" if backend["base_url"] else backend["modelo"]
+
+
+def identificador_backends(backends):
+    """Modelos (e servidores) da cascata em ordem"""
+    return ">".join(descritor_backend(b) for b in backends)
+
+
+def chave_cache(dados_pdf, estruturado=False, backend=None):
+    """Chave do cache da resposta de um backend a um PDF, a mesma na interface, no CLI, no lote e na Batch API
+
+    A chave nomeia quem respondeu: modelo (e servidor), temperatura e
+    max_tokens do backend (sem backend, o modelo padrão), além da versão
+    do prompt e dos limites de extração e compressão (extracao.versao_extracao).
+    """
+    backend = backend_padrao() if backend is None else backend
+    return chave_analise(dados_pdf, descritor_backend(backend), backend["temperatura"], backend["max_tokens"],
+                         versao_prompt(estruturado), versao_extracao())
+
+
+def chaves_cascata(dados_pdf, estruturado=False, roteador=None):
+    """Chaves de cache de cada backend da cascata, em ordem (sem roteador, só a do modelo padrão)"""
+    backends = roteador.backends if roteador is not None else [backend_padrao()]
+    return [chave_cache(dados_pdf, estruturado, backend) for backend in backends]
+
+
+def obter_do_cache(cache, chaves):
+    """(chave, resposta) da primeira resposta em cache na ordem da cascata, ou (None, None)
+
+    Só respostas aceitas (resposta_aceita) são gravadas, então a de um
+    backend anterior é a que a cascata daria sem escalar.
+    """
+    for chave in chaves:
+        resposta = cache.obter(chave)
+        if resposta is not None:
+            return chave, resposta
+    return None, None
+
+
+def resposta_aceita(competencias, min_competencias=None):
+    """Se a resposta encerra a cascata sem escalar; a mesma regra decide o que vai para o cache"""
+    minimo = config.ROTEADOR_MIN_COMPETENCIAS if min_competencias is None else min_competencias
+    return len(competencias) >= max(1, minimo)
+
+
+def _nova_estatistica():
+    return {"chamadas": 0, "aceitas": 0, "escalacoes": 0, "erros": 0, "latencia_s": 0.0,
+            "latencias": deque(maxlen=_JANELA_LATENCIAS)}
+
+
+class Roteador:
+    """Tenta os backends em ordem até uma resposta com competências suficientes"""
+
+    def __init__(self, backends=None, min_competencias=None, registro_clientes=None):
+        self.backends = carregar_backends() if backends is None else backends
+        self.min_competencias = (config.ROTEADOR_MIN_COMPETENCIAS if min_competencias is None
+                                 else min_competencias)
+        self.registro_clientes = registro_clientes
+        self._lock = threading.Lock()
+        self._estatisticas = {b["nome"]: _nova_estatistica() for b in self.backends}
+
+    @property
+    def identificador(self):
+        """Configuração da cascata (o voo único de uma análise depende da cascata inteira)"""
+        return identificador_backends(self.backends)
+
+    def backend(self, nome):
+        """Configuração do backend com esse nome (o que respondeu, segundo tempos["backend"])"""
+        return next(b for b in self.backends if b["nome"] == nome)
+
+    def aceita(self, competencias):
+        """resposta_aceita com o mínimo de competências desta cascata"""
+        return resposta_aceita(competencias, self.min_competencias)
+
+    def _api_key(self, backend, api_key):
+        # A chave do usuário nunca vai para outro servidor: sem a chave própria o backend é pulado
+        if backend["api_key_env"]:
+            chave = os.environ.get(backend["api_key_env"])
+            if chave:
+                return chave
+        if backend_openai(backend):
+            return api_key
+        raise ErroConfiguracaoBackend(
+            f"a variável {backend['api_key_env']} do backend {backend['nome']!r} está vazia"
+        )
+
+    def _opcoes(self, backend):
+        return {"modelo": backend["modelo"], "temperatura": backend["temperatura"],
+                "max_tokens": backend["max_tokens"]}
+
+    def _cliente(self, backend, api_key):
+        api_key = self._api_key(backend, api_key)
+        if self.registro_clientes is not None:
+            return self.registro_clientes.obter(api_key, base_url=backend["base_url"])
+        from openai import OpenAI
+        return OpenAI(api_key=api_key, base_url=backend["base_url"])
+
+    def preparar_clientes(self, api_key):
+        """Cria (ou reutiliza) o cliente de cada backend, para falhas de configuração aparecerem cedo
+
+        Backends sem chave são pulados (como na cascata); sem nenhum backend
+        utilizável levanta ErroConfiguracaoBackend.
+        """
+        clientes = []
+        for backend in self.backends:
+            try:
+                clientes.append(self._cliente(backend, api_key))
+            except ErroConfiguracaoBackend as e:
+                logger.warning("backend %s indisponível: %s", backend["nome"], e)
+        if not clientes:
+            raise ErroConfiguracaoBackend("nenhum backend da cascata tem uma chave configurada")
+        return clientes
+
+    def _cliente_async(self, backend, api_key, clientes):
+        # Clientes assíncronos ficam presos ao loop de eventos: quem chama guarda um dict por loop
+        api_key = self._api_key(backend, api_key)
+        chave = (api_key, backend["base_url"])
+        cliente = clientes.get(chave)
+        if cliente is None:
+            from openai import AsyncOpenAI
+            cliente = clientes[chave] = AsyncOpenAI(api_key=api_key, base_url=backend["base_url"])
+        return cliente
+
+    def _registrar(self, backend, duracao, resultado):
+        with self._lock:
+            estatistica = self._estatisticas[backend["nome"]]
+            estatistica["chamadas"] += 1
+            estatistica[resultado] += 1
+            estatistica["latencia_s"] += duracao
+            estatistica["latencias"].append(duracao)
+
+    def _suficiente(self, resposta, estruturado):
+        from .pipeline import interpretar_resposta
+
+        try:
+            return self.aceita(interpretar_resposta(resposta, estruturado)[0])
+        except Exception:
+            return False
+
+    def _avaliar(self, backend, ultimo, inicio, resposta, estruturado):
+        """True se a resposta do backend encerra a cascata (registrando aceite ou escalação)"""
+        duracao = time.perf_counter() - inicio
+        if ultimo or self._suficiente(resposta, estruturado):
+            self._registrar(backend, duracao, "aceitas")
+            return True
+        self._registrar(backend, duracao, "escalacoes")
+        logger.info("resposta insuficiente de %s, escalando", backend["nome"])
+        return False
+
+    def _falhou(self, backend, ultimo, inicio, erro):
+        self._registrar(backend, time.perf_counter() - inicio, "erros")
+        if ultimo:
+            raise erro
+        logger.warning("backend %s falhou (%s), escalando", backend["nome"], erro)
+
+    def _backends_agendados(self, agendador):
+        # O agendador controla os limites da conta OpenAI: servidores próprios não passam por ele
+        for i, backend in enumerate(self.backends):
+            yield backend, i == len(self.backends) - 1, agendador if backend_openai(backend) else None
+
+    def analisar(self, texto_curriculo, api_key=None, estruturado=False, ao_fragmento=None, agendador=None,
+                 ao_aguardar=None, ao_escalar=None):
+        """Como pipeline.analyze_stream, passando pela cascata
+
+        Retorna (resposta_completa, tempos); tempos traz também backend e
+        modelo (de quem respondeu), escalacoes, o uso somado de todas as
+        tentativas e chamadas (modelo, backend, uso e ttft_s de cada uma).
+        ao_escalar(backend, proximo) avisa que a resposta de um backend foi
+        descartada (os fragmentos já entregues deixam de valer).
+        """
+        from .pipeline import analyze_stream
+
+        escalacoes = 0
+        uso_total = None
+        chamadas = []
+        for (backend, ultimo, agendador_backend), proximo in zip(
+            self._backends_agendados(agendador), [*self.backends[1:], None]
+        ):
+            inicio = time.perf_counter()
+            try:
+                resposta, tempos = analyze_stream(
+                    texto_curriculo, client=self._cliente(backend, api_key), ao_fragmento=ao_fragmento,
+                    estruturado=estruturado, agendador=agendador_backend, ao_aguardar=ao_aguardar,
+                    **self._opcoes(backend)
+                )
+            except Exception as e:
+                self._falhou(backend, ultimo, inicio, e)
+            else:
+                uso_total = _somar_uso(uso_total, tempos["uso"])
+                chamadas.append({"modelo": backend["modelo"], "backend": backend["nome"], "uso": tempos["uso"],
+                                 "ttft_s": tempos["ttft_s"]})
+                if self._avaliar(backend, ultimo, inicio, resposta, estruturado):
+                    return resposta, {**tempos, "uso": uso_total, "backend": backend["nome"],
+                                      "modelo": backend["modelo"], "escalacoes": escalacoes, "chamadas": chamadas}
+            escalacoes += 1
+            if ao_escalar:
+                ao_escalar(backend["nome"], proximo["nome"])
+
+    async def analisar_async(self, texto_curriculo, api_key=None, estruturado=False, clientes=None,
+                             agendador=None):
+        """Cascata sem streaming com AsyncOpenAI (para o lote)
+
+        clientes é o dict, compartilhado pelas chamadas do mesmo loop de
+        eventos, onde os AsyncOpenAI de cada backend são reutilizados. Com
+        agendador, as chamadas à OpenAI passam pela fila de RPM/TPM, como em analisar.
+        Retorna (resposta, detalhes) com uso, backend, modelo, escalacoes e chamadas.
+        """
+        from .analise import parametros_chamada
+        from .limites import criar_async
+        from .metricas import uso_tokens
+
+        clientes = {} if clientes is None else clientes
+        escalacoes = 0
+        uso_total = None
+        chamadas = []
+        for backend, ultimo, agendador_backend in self._backends_agendados(agendador):
+            inicio = time.perf_counter()
+            try:
+                response = await criar_async(
+                    self._cliente_async(backend, api_key, clientes),
+                    parametros_chamada(texto_curriculo, estruturado, **self._opcoes(backend)), agendador_backend,
+                )
+            except Exception as e:
+                self._falhou(backend, ultimo, inicio, e)
+            else:
+                resposta = response.choices[0].message.content
+                uso = uso_tokens(response.usage)
+                uso_total = _somar_uso(uso_total, uso)
+                chamadas.append({"modelo": backend["modelo"], "backend": backend["nome"], "uso": uso, "ttft_s": None})
+                if self._avaliar(backend, ultimo, inicio, resposta, estruturado):
+                    return resposta, {"uso": uso_total, "backend": backend["nome"], "modelo": backend["modelo"],
+                                      "escalacoes": escalacoes, "chamadas": chamadas}
+            escalacoes += 1
+
+    def estatisticas(self):
+        """Por backend: chamadas, aceitas, escalações, erros, taxa de escalação e latência (média e p95)"""
+        with self._lock:
+            resultado = {}
+            for nome, e in self._estatisticas.items():
+                latencias = sorted(e["latencias"])
+                resultado[nome] = {
+                    "chamadas": e["chamadas"],
+                    "aceitas": e["aceitas"],
+                    "escalacoes": e["escalacoes"],
+                    "erros": e["erros"],
+                    "taxa_escalacao": (e["escalacoes"] + e["erros"]) / e["chamadas"] if e["chamadas"] else 0.0,
+                    "latencia_media_s": e["latencia_s"] / e["chamadas"] if e["chamadas"] else 0.0,
+                    "latencia_p95_s": latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))]
+                    if latencias else 0.0,
+                }
+            return resultado
+
+    def linhas_prometheus(self):
+        """Contadores e latência por backend no formato de exposição do Prometheus"""
+        with self._lock:
+            estatisticas = {nome: dict(e) for nome, e in self._estatisticas.items()}
+        linhas = [
+            "# HELP internready_roteador_chamadas_total Chamadas por backend e desfecho",
+            "# TYPE internready_roteador_chamadas_total counter",
+        ]
+        for nome, e in estatisticas.items():
+            for desfecho in ("aceitas", "escalacoes", "erros"):
+                linhas.append(f'internready_roteador_chamadas_total{{backend="{nome}",desfecho="{desfecho}"}} '
+                              f'{e[desfecho]}')
+        linhas += [
+            "# HELP internready_roteador_latencia_segundos_total Tempo somado das chamadas por backend",
+            "# TYPE internready_roteador_latencia_segundos_total counter",
+        ]
+        linhas += [f'internready_roteador_latencia_segundos_total{{backend="{nome}"}} {e["latencia_s"]:.6f}'
+                   for nome, e in estatisticas.items()]
+        return linhas
+
+
+def _somar_uso(total, uso):
+    if uso is None:
+        return total
+    if total is None:
+        return dict(uso)
+    return {tipo: total.get(tipo, 0) + quantidade for tipo, quantidade in uso.items()}
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Resultados já exibidos em uma sessão, para redesenhar a página sem refazer a análise
+
+Um clique em st.download_button (ou em qualquer widget) refaz o script
+inteiro. A sessão guarda, por documento, tudo o que a página de
+resultados precisa (DataFrame, seções lidas, PNGs dos gráficos e o CSV)
+e os reruns apenas redesenham a partir daí. O número de análises
+guardadas por sessão é limitado (as mais antigas saem primeiro).
+"""
+
+from collections import OrderedDict
+
+from . import config
+from .analise import versao_prompt
+
+
+def chave_resultado(hash_doc, estruturado=False):
+    """Chave de uma análise na sessão: hash do documento e versão do prompt do modo"""
+    return f"{hash_doc}:{versao_prompt(estruturado)}"
+
+
+class ResultadosSessao:
+    """Últimas análises da sessão por chave do documento (LRU com limite de itens)"""
+
+    def __init__(self, max_itens=None):
+        self.max_itens = max(1, config.SESSAO_MAX_ANALISES if max_itens is None else max_itens)
+        self._itens = OrderedDict()  # chave -> visualização pronta
+
+    def __contains__(self, chave):
+        return chave in self._itens
+
+    def __len__(self):
+        return len(self._itens)
+
+    def obter(self, chave):
+        """Visualização guardada, ou None"""
+        visualizacao = self._itens.get(chave)
+        if visualizacao is not None:
+            self._itens.move_to_end(chave)
+        return visualizacao
+
+    def guardar(self, chave, visualizacao):
+        """Guarda a visualização e descarta as mais antigas além do limite"""
+        self._itens[chave] = visualizacao
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.max_itens:
+            self._itens.popitem(last=False)
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""Servidor local compatível com a API de chat da OpenAI, para testes e benchmarks
+
+Responde a POST /v1/chat/completions com uma análise determinística do
+currículo enviado, no formato de texto livre do prompt ou, quando
+response_format traz um json_schema, no formato estruturado. Suporta
+stream=True (Server-Sent Events) e devolve usage como a API real.
+
+processar_arquivo_lote faz o mesmo para um arquivo de requisições da
+Batch API, gravando o JSONL de saída que o endpoint real devolveria.
+
+Uso:
+    python -m internready.stub_openai --porta 8765 --latencia 0.3
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 streamlit run codigo.py
+    python -m internready.stub_openai --lote requisicoes.jsonl saida.jsonl
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Competência -> palavras-chave que a ativam no texto do currículo
+PALAVRAS_CHAVE = {
+    "Valuation": ("valuation", "fluxo de caixa", "dcf"),
+    "Modelagem Financeira": ("modelagem", "modelo financeiro"),
+    "Excel Avançado": ("excel", "vba"),
+    "Python": ("python", "pandas"),
+    "Contabilidade": ("contabilidade", "contábil", "ifrs"),
+    "Mercado de Capitais": ("mercado de capitais", "renda fixa", "ações", "liga de mercado"),
+    "M&A": ("m&a", "fusões", "aquisições"),
+    "Inglês": ("inglês", "english", "fluente"),
+}
+COMPETENCIAS_PADRAO = ("Comunicação", "Trabalho em Equipe", "Análise de Dados")
+
+PONTOS = {
+    "pontos_fortes": [
+        "Formação acadêmica alinhada ao setor financeiro",
+        "Experiência prática com ferramentas de análise",
+        "Boa apresentação das atividades realizadas",
+    ],
+    "pontos_de_melhoria": [
+        "Quantificar resultados obtidos nas experiências",
+        "Detalhar o nível de proficiência em ferramentas",
+        "Incluir certificações do mercado financeiro",
+    ],
+    "sugestoes": [
+        "Buscar a certificação CPA-20",
+        "Participar de uma liga de mercado financeiro",
+        "Desenvolver um projeto de valuation de uma empresa listada",
+        "Aprofundar conhecimentos em Python para finanças",
+    ],
+}
+
+
+def _nota(semente, area):
+    h = hashlib.sha256(f"{semente}:{area}".encode("utf-8")).digest()
+    return 40 + h[0] % 56
+
+
+def gerar_analise(texto_usuario):
+    """Competências e pontos determinísticos a partir do texto enviado ao modelo"""
+    minusculo = texto_usuario.lower()
+    areas = [area for area, chaves in PALAVRAS_CHAVE.items() if any(c in minusculo for c in chaves)]
+    for area in COMPETENCIAS_PADRAO:
+        if len(areas) >= 3:
+            break
+        areas.append(area)
+    semente = hashlib.sha256(texto_usuario.encode("utf-8")).hexdigest()
+    return {
+        "competencias": [{"Área": area, "Pontuação": _nota(semente, area)} for area in areas],
+        **PONTOS,
+    }
+
+
+def formatar_texto_livre(analise):
+    """Resposta no formato pedido pelo prompt de texto livre"""
+    linhas_json = ",\n".join(f"  {json.dumps(c, ensure_ascii=False)}" for c in analise["competencias"])
+    secoes = [("Pontos Fortes", "pontos_fortes"), ("Pontos de Melhoria", "pontos_de_melhoria"),
+              ("Sugestões", "sugestoes")]
+    partes = [f"**Parte 1 – Análise Quantitativa (JSON)**\n[\n{linhas_json}\n]\n\n**Parte 2 – Análise Qualitativa**"]
+    for titulo, campo in secoes:
+        partes.append(f"- **{titulo}:**\n" + "\n".join(f"  - {p}" for p in analise[campo]))
+    return "\n\n".join(partes)
+
+
+def gerar_conteudo(corpo):
+    """Conteúdo da resposta para o corpo de uma requisição de chat"""
+    texto_usuario = "\n".join(
+        m.get("content") or "" for m in corpo.get("messages", []) if m.get("role") == "user"
+    )
+    # Considera só o currículo, entre as aspas triplas do prompt, e não as instruções
+    partes = texto_usuario.split('"""')
+    analise = gerar_analise(partes[1] if len(partes) >= 3 else texto_usuario)
+    if (corpo.get("response_format") or {}).get("type") == "json_schema":
+        return json.dumps(analise, ensure_ascii=False)
+    return formatar_texto_livre(analise)
+
+
+# Cache de prefixo como o da API: mensagens de sistema já vistas, prefixos a partir de 1024 tokens
+# e tokens em cache contados em blocos de 128 (só o prefixo repetido conta, não o prompt inteiro)
+_prefixos_vistos = set()
+_PREFIXO_MIN_TOKENS = 1024
+_PREFIXO_BLOCO = 128
+
+
+def _tokens_em_cache(corpo):
+    sistema = "".join(m.get("content") or "" for m in corpo.get("messages", []) if m.get("role") == "system")
+    prefixo = len(sistema) // 4
+    if prefixo < _PREFIXO_MIN_TOKENS:
+        return 0
+    chave = hashlib.sha256(f"{corpo.get('model')}\0{sistema}".encode("utf-8")).hexdigest()
+    visto = chave in _prefixos_vistos
+    _prefixos_vistos.add(chave)
+    return prefixo // _PREFIXO_BLOCO * _PREFIXO_BLOCO if visto else 0
+
+
+def _uso(corpo, conteudo):
+    prompt = sum(len(m.get("content") or "") for m in corpo.get("messages", [])) // 4
+    completion = len(conteudo) // 4
+    return {
+        "prompt_tokens": prompt,
+        "completion_tokens": completion,
+        "total_tokens": prompt + completion,
+        "prompt_tokens_details": {"cached_tokens": _tokens_em_cache(corpo)},
+    }
+
+
+def resposta_completa(corpo):
+    """Corpo de resposta de chat.completions (sem streaming) para uma requisição"""
+    conteudo = gerar_conteudo(corpo)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": corpo.get("model", "gpt-4o-mini"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": conteudo}, "finish_reason": "stop"}],
+        "usage": _uso(corpo, conteudo),
+    }
+
+
+def processar_arquivo_lote(caminho_requisicoes, caminho_saida, falhar=()):
+    """Substituto local do endpoint da Batch API: lê as requisições e grava o JSONL de saída
+
+    Os custom_id em falhar recebem uma resposta de erro HTTP 500, como uma
+    requisição que falhou dentro do lote. Retorna a quantidade de linhas.
+    """
+    linhas = 0
+    with open(caminho_requisicoes, encoding="utf-8") as entrada, \
+            open(caminho_saida, "w", encoding="utf-8") as saida:
+        for texto in entrada:
+            if not texto.strip():
+                continue
+            requisicao = json.loads(texto)
+            if requisicao["custom_id"] in falhar:
+                response = {"status_code": 500, "request_id": uuid.uuid4().hex,
+                            "body": {"error": {"message": "falha simulada", "type": "server_error"}}}
+            else:
+                response = {"status_code": 200, "request_id": uuid.uuid4().hex,
+                            "body": resposta_completa(requisicao["body"])}
+            linha = {"id": f"batch_req_{uuid.uuid4().hex[:24]}", "custom_id": requisicao["custom_id"],
+                     "response": response, "error": None}
+            saida.write(json.dumps(linha, ensure_ascii=False) + "\n")
+            linhas += 1
+    return linhas
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder_json(self, status, dados):
+        corpo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._responder_json(404, {"error": {"message": f"rota desconhecida: {self.path}"}})
+            return
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        try:
+            corpo = json.loads(self.rfile.read(tamanho) or b"{}")
+        except json.JSONDecodeError:
+            self._responder_json(400, {"error": {"message": "JSON inválido"}})
+            return
+
+        with self.server.trava:
+            self.server.requisicoes += 1
+        conteudo = gerar_conteudo(corpo)
+        identificador = f"chatcmpl-stub-{uuid.uuid4().hex[:12]}"
+        modelo = corpo.get("model", "stub")
+        time.sleep(self.server.latencia)
+
+        if not corpo.get("stream"):
+            self._responder_json(200, {
+                "id": identificador,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": modelo,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": conteudo},
+                    "finish_reason": "stop",
+                }],
+                "usage": _uso(corpo, conteudo),
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def evento(delta, fim=None):
+            dados = {
+                "id": identificador,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": modelo,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": fim}],
+            }
+            self.wfile.write(f"data: {json.dumps(dados, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        evento({"role": "assistant", "content": ""})
+        for i in range(0, len(conteudo), self.server.tamanho_trecho):
+            evento({"content": conteudo[i:i + self.server.tamanho_trecho]})
+            if self.server.intervalo_trechos:
+                time.sleep(self.server.intervalo_trechos)
+        evento({}, fim="stop")
+        if (corpo.get("stream_options") or {}).get("include_usage"):
+            # Como a API real: um último trecho sem choices, só com usage
+            dados = {"id": identificador, "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": modelo, "choices": [], "usage": _uso(corpo, conteudo)}
+            self.wfile.write(f"data: {json.dumps(dados, ensure_ascii=False)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class ServidorStub(ThreadingHTTPServer):
+    """Servidor HTTP do stub; url_base aponta para a raiz /v1"""
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", porta=0, latencia=0.0, tamanho_trecho=16, intervalo_trechos=0.0):
+        super().__init__((host, porta), _Handler)
+        self.latencia = latencia
+        self.tamanho_trecho = tamanho_trecho
+        self.intervalo_trechos = intervalo_trechos
+        self.requisicoes = 0
+        self.trava = threading.Lock()
+
+    @property
+    def url_base(self):
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}/v1"
+
+
+def iniciar_stub(**opcoes):
+    """Inicia o stub em uma thread de fundo e retorna o servidor (pare com .shutdown())"""
+    servidor = ServidorStub(**opcoes)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local compatível com a API de chat da OpenAI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0.0, help="atraso antes da resposta (s)")
+    parser.add_argument("--intervalo-trechos", type=float, default=0.0, help="atraso entre trechos no streaming (s)")
+    parser.add_argument("--lote", nargs=2, metavar=("REQUISICOES", "SAIDA"),
+                        help="processa um arquivo da Batch API localmente em vez de iniciar o servidor")
+    args = parser.parse_args(argv)
+
+    if args.lote:
+        linhas = processar_arquivo_lote(*args.lote)
+        print(f"{linhas} requisições processadas em {args.lote[1]}")
+        return
+
+    servidor = ServidorStub(args.host, args.porta, args.latencia, intervalo_trechos=args.intervalo_trechos)
+    print(f"Stub OpenAI em {servidor.url_base} (Ctrl+C para sair)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
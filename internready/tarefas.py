@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""Fila de análises em segundo plano, independente dos reruns do Streamlit
+
+Cada análise é submetida a um pool de threads do processo e recebe um id;
+a interface guarda o id (em st.session_state e na URL) e consulta o
+progresso a cada rerun, de modo que mexer em um widget ou recarregar a
+página não interrompe a chamada ao modelo. O pool tem no máximo
+TAREFAS_MAX_SIMULTANEAS análises rodando no servidor; as demais aguardam
+na fila até TAREFAS_MAX_FILA, e além disso a submissão é recusada.
+Tarefas encerradas ficam disponíveis por TAREFAS_RETENCAO_SEGUNDOS.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# Estados de uma tarefa
+NA_FILA = "na_fila"
+EXECUTANDO = "executando"
+CONCLUIDA = "concluida"
+FALHOU = "falhou"
+
+
+class FilaCheia(RuntimeError):
+    """O servidor já tem o máximo de análises rodando e aguardando"""
+
+
+class ErroTarefa(Exception):
+    """Falha esperada de uma análise, com mensagem e dica para o usuário
+
+    detalhe é um texto opcional exibido à parte (ex.: a resposta do modelo).
+    """
+
+    def __init__(self, mensagem, dica=None, detalhe=None):
+        super().__init__(mensagem)
+        self.mensagem = mensagem
+        self.dica = dica
+        self.detalhe = detalhe
+
+
+class Tarefa:
+    """Estado de uma análise; atualizada pela thread de trabalho e lida pela interface"""
+
+    def __init__(self, descricao=None):
+        self.id = uuid.uuid4().hex
+        self.descricao = descricao
+        self.estado = NA_FILA
+        self.criada_em = time.time()
+        self.encerrada_em = None
+        self.progresso = 0
+        self.mensagem = "⏳ Na fila..."
+        self.parcial = {}
+        self.resultado = None
+        self.erro = None  # {"mensagem", "dica", "detalhe", "tipo"}
+        self._lock = threading.Lock()
+
+    @property
+    def encerrada(self):
+        with self._lock:
+            return self.estado in (CONCLUIDA, FALHOU)
+
+    def atualizar(self, progresso=None, mensagem=None, **parcial):
+        """Progresso (0-100), texto de status e dados parciais para a interface"""
+        with self._lock:
+            if progresso is not None:
+                self.progresso = progresso
+            if mensagem is not None:
+                self.mensagem = mensagem
+            self.parcial.update(parcial)
+
+    def instantaneo(self):
+        """Cópia consistente do estado para renderizar"""
+        with self._lock:
+            return {
+                "id": self.id, "estado": self.estado, "progresso": self.progresso, "mensagem": self.mensagem,
+                "parcial": dict(self.parcial), "resultado": self.resultado, "erro": self.erro,
+                "descricao": self.descricao,
+            }
+
+
+class FilaTarefas:
+    """Pool de análises compartilhado entre sessões (uma instância por servidor)"""
+
+    def __init__(self, max_simultaneas=None, max_fila=None, retencao_segundos=None):
+        self.max_simultaneas = max_simultaneas or config.TAREFAS_MAX_SIMULTANEAS
+        self.max_fila = config.TAREFAS_MAX_FILA if max_fila is None else max_fila
+        self.retencao_segundos = (config.TAREFAS_RETENCAO_SEGUNDOS if retencao_segundos is None
+                                  else retencao_segundos)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_simultaneas, thread_name_prefix="internready-tarefa")
+        self._tarefas = {}  # id -> Tarefa
+        self._fila = []  # ids na ordem de chegada, ainda não iniciados
+        self._lock = threading.Lock()
+        self.recusadas = 0
+
+    def _limpar(self, agora):
+        expiradas = [
+            i for i, t in self._tarefas.items()
+            if t.encerrada and agora - t.encerrada_em > self.retencao_segundos
+        ]
+        for i in expiradas:
+            del self._tarefas[i]
+
+    def submeter(self, funcao, *args, descricao=None, **kwargs):
+        """Agenda funcao(tarefa, *args, **kwargs); retorna o id da tarefa
+
+        O valor retornado pela função vira tarefa.resultado; um ErroTarefa
+        (ou outra exceção) vira tarefa.erro. Levanta FilaCheia se o servidor
+        já tiver max_simultaneas + max_fila tarefas ativas.
+        """
+        tarefa = Tarefa(descricao)
+        with self._lock:
+            self._limpar(time.time())
+            ativas = sum(not t.encerrada for t in self._tarefas.values())
+            if ativas >= self.max_simultaneas + self.max_fila:
+                self.recusadas += 1
+                raise FilaCheia(
+                    f"O servidor já está processando {ativas} análises. Tente novamente em alguns minutos."
+                )
+            self._tarefas[tarefa.id] = tarefa
+            self._fila.append(tarefa.id)
+        self._executor.submit(self._executar, tarefa, funcao, args, kwargs)
+        return tarefa.id
+
+    def _executar(self, tarefa, funcao, args, kwargs):
+        with self._lock:
+            self._fila.remove(tarefa.id)
+        with tarefa._lock:
+            tarefa.estado = EXECUTANDO
+            tarefa.mensagem = "🚀 Iniciando análise..."
+        try:
+            resultado = funcao(tarefa, *args, **kwargs)
+        except ErroTarefa as e:
+            erro = {"mensagem": e.mensagem, "dica": e.dica, "detalhe": e.detalhe, "tipo": None}
+            estado = FALHOU
+        except Exception as e:
+            logger.exception("tarefa %s falhou", tarefa.id)
+            erro = {"mensagem": str(e), "dica": None, "detalhe": None, "tipo": type(e).__name__}
+            estado = FALHOU
+        else:
+            erro = None
+            estado = CONCLUIDA
+        with tarefa._lock:
+            tarefa.resultado = None if erro else resultado
+            tarefa.erro = erro
+            tarefa.progresso = 100
+            tarefa.encerrada_em = time.time()
+            tarefa.estado = estado
+
+    def obter(self, tarefa_id):
+        """Tarefa pelo id, ou None se não existe ou já expirou"""
+        with self._lock:
+            return self._tarefas.get(tarefa_id)
+
+    def posicao(self, tarefa_id):
+        """Posição na fila (1 = próxima a iniciar), ou 0 se não está aguardando"""
+        with self._lock:
+            try:
+                return self._fila.index(tarefa_id) + 1
+            except ValueError:
+                return 0
+
+    def estatisticas(self):
+        """Tarefas rodando, aguardando e recusadas"""
+        with self._lock:
+            executando = sum(t.estado == EXECUTANDO for t in self._tarefas.values())
+            return {"executando": executando, "na_fila": len(self._fila), "recusadas": self.recusadas,
+                    "max_simultaneas": self.max_simultaneas}
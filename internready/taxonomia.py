@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""Nomes canônicos para as áreas de competência devolvidas pelo modelo
+
+O modelo escreve a mesma competência de várias formas ("Modelagem
+Financeira", "Financial Modeling", "Modelagem financeira (Excel)"), o que
+impede comparar candidatos e alinhar os eixos do radar. Cada rótulo é
+comparado às variantes de uma taxonomia curada de competências do setor
+financeiro por similaridade de trigramas de caracteres (coeficiente de
+Dice), usando um índice invertido trigrama -> variantes; acima do limiar,
+o rótulo vira o nome canônico. Os resultados ficam memorizados por rótulo.
+
+A comparação ignora palavras de ligação ("de", "em") e os substantivos
+genéricos que abrem muitos rótulos ("Gestão", "Análise", "Experiência"):
+sem isso "Gestão de Tempo" e "Gestão de Caixa" pareceriam a mesma coisa.
+Esses substantivos ainda contam como núcleo do rótulo: "Análise de
+Investimentos" não casa com "Gestão de Investimentos". Competências de
+um mesmo currículo com o mesmo nome canônico viram uma só, então cada
+nome canônico reúne apenas variantes da mesma competência (VBA não é
+Excel, Tableau não é Power BI).
+"""
+
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from . import config
+
+# Nome canônico -> variantes conhecidas (português e inglês); o próprio nome já é uma variante
+TAXONOMIA = {
+    "Modelagem Financeira": ("financial modeling", "financial modelling", "modelagem de dados financeiros",
+                             "modelos financeiros", "projeções financeiras", "financial projections"),
+    "Valuation": ("avaliação de empresas", "avaliação de ativos", "company valuation", "fluxo de caixa descontado",
+                  "dcf", "discounted cash flow", "análise de múltiplos", "valuation de empresas",
+                  "business valuation"),
+    "Análise Financeira": ("financial analysis", "análise de demonstrações financeiras",
+                           "financial statement analysis", "análise de balanços", "análise fundamentalista",
+                           "fundamental analysis"),
+    "Contabilidade": ("accounting", "contabilidade financeira", "financial accounting", "ifrs", "us gaap",
+                      "normas contábeis"),
+    "Finanças Corporativas": ("corporate finance", "finanças empresariais", "estrutura de capital",
+                              "capital structure", "gestão financeira"),
+    "Fusões e Aquisições": ("m&a", "mergers and acquisitions", "fusões & aquisições", "m & a",
+                            "due diligence"),
+    "Mercado de Capitais": ("capital markets", "mercados de capitais", "mercado financeiro", "financial markets",
+                            "dcm", "ecm", "ofertas públicas"),
+    "Investment Banking": ("banco de investimento", "banco de investimentos", "ib", "assessoria financeira"),
+    "Análise de Crédito": ("credit analysis", "análise de risco de crédito", "credit risk analysis",
+                           "concessão de crédito", "underwriting"),
+    "Gestão de Riscos": ("risk management", "gerenciamento de riscos", "gestão de risco", "risco de mercado",
+                         "market risk", "var", "gestão de riscos financeiros", "financial risk management",
+                         "gerenciamento de riscos financeiros"),
+    "Gestão de Portfólio": ("portfolio management", "gestão de carteiras", "gestão de investimentos",
+                            "asset management", "alocação de ativos", "asset allocation"),
+    "Private Equity e Venture Capital": ("private equity", "venture capital", "pe/vc", "pe", "vc"),
+    "Renda Fixa": ("fixed income", "títulos de renda fixa", "bonds", "crédito privado"),
+    "Renda Variável": ("equities", "ações", "equity research", "análise de ações", "mercado de ações"),
+    "Derivativos": ("derivatives", "opções e futuros", "options and futures", "swaps", "hedge"),
+    "Economia": ("economics", "macroeconomia", "macroeconomics", "microeconomia", "análise macroeconômica",
+                 "economia de empresas"),
+    "Matemática Financeira": ("financial mathematics", "matemática aplicada a finanças", "cálculo financeiro",
+                              "hp 12c"),
+    "Estatística e Econometria": ("statistics", "estatística", "econometria", "econometrics",
+                                  "análise estatística", "statistical analysis", "análise quantitativa",
+                                  "quantitative analysis"),
+    "Excel": ("microsoft excel", "excel avançado", "advanced excel", "planilhas", "spreadsheets"),
+    "VBA": ("excel vba", "macros vba", "macros em excel", "visual basic for applications"),
+    "Python": ("programação em python", "python programming"),
+    "Pandas": ("python pandas", "biblioteca pandas"),
+    "SQL e Bancos de Dados": ("sql", "banco de dados", "bancos de dados", "databases", "consultas sql"),
+    "Business Intelligence": ("bi", "visualização de dados", "data visualization", "dashboards"),
+    "Power BI": ("microsoft power bi", "powerbi", "power bi desktop"),
+    "Tableau": ("tableau desktop", "tableau software"),
+    "Análise de Dados": ("data analysis", "data analytics", "análise de dados financeiros", "ciência de dados",
+                         "data science"),
+    "Bloomberg e Terminais de Mercado": ("bloomberg", "bloomberg terminal", "capital iq", "refinitiv",
+                                         "eikon", "factset", "economatica"),
+    "Controladoria": ("controllership", "controladoria financeira", "fp&a", "planejamento financeiro",
+                      "financial planning", "orçamento", "budgeting", "planejamento orçamentário"),
+    "Tesouraria": ("treasury", "gestão de caixa", "cash management", "gestão de tesouraria"),
+    "Fluxo de Caixa": ("cash flow", "análise de fluxo de caixa", "gestão de fluxo de caixa", "cash flow management",
+                       "projeção de fluxo de caixa"),
+    "Auditoria": ("audit", "auditing", "auditoria externa", "auditoria interna", "internal audit"),
+    "Tributação": ("tax", "taxation", "planejamento tributário", "tax planning", "direito tributário"),
+    "Compliance e Regulação": ("compliance", "regulação financeira", "regulatory compliance", "regulação",
+                               "governança corporativa", "corporate governance", "prevenção à lavagem de dinheiro",
+                               "aml"),
+    "Certificações do Mercado Financeiro": ("cfa", "cpa-10", "cpa-20", "cea", "cga", "frm", "certificações",
+                                            "certifications", "anbima"),
+    "Inglês": ("english", "língua inglesa", "inglês fluente", "fluent english", "idioma inglês",
+               "inglês avançado"),
+    "Espanhol": ("spanish", "língua espanhola", "espanhol fluente", "fluent spanish", "espanhol avançado"),
+    "Francês": ("french", "língua francesa", "francês fluente", "fluent french", "francês avançado"),
+    "Idiomas": ("languages", "línguas estrangeiras", "idiomas estrangeiros", "foreign languages"),
+    "Comunicação": ("communication", "comunicação oral", "comunicação escrita", "apresentações",
+                    "presentation skills", "oratória"),
+    "Liderança": ("leadership", "gestão de equipes", "team management", "gestão de pessoas",
+                  "people management"),
+    "Trabalho em Equipe": ("teamwork", "colaboração", "collaboration", "trabalho em grupo"),
+    "Negociação": ("negotiation", "habilidades de negociação", "negotiation skills"),
+    "Resolução de Problemas": ("problem solving", "pensamento crítico", "critical thinking",
+                               "raciocínio analítico", "analytical thinking", "capacidade analítica",
+                               "analytical skills"),
+    "Gestão de Projetos": ("project management", "gerenciamento de projetos", "pmo", "scrum",
+                           "metodologias ágeis"),
+    "Relacionamento com Clientes": ("client relationship", "customer relationship", "atendimento ao cliente",
+                                    "relacionamento comercial", "vendas", "sales"),
+    "Experiência Profissional em Finanças": ("experiência no setor financeiro", "finance experience",
+                                             "experiência em finanças", "estágio em finanças",
+                                             "experiência profissional"),
+    "Formação Acadêmica": ("education", "formação", "educação", "academic background", "graduação",
+                           "histórico acadêmico"),
+}
+
+_PARENTESES = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_NAO_ALFANUMERICO = re.compile(r"[^0-9a-z&+#]+")
+# Palavras de ligação, descartadas antes da comparação
+_LIGACAO = frozenset(("de", "da", "do", "das", "dos", "em", "e", "a", "o", "no", "na", "para", "com",
+                      "of", "in", "and", "the", "for", "with"))
+# Substantivos genéricos: fora dos trigramas, mas rótulos com núcleos diferentes nunca casam
+_NUCLEOS = frozenset(("gestao", "gerenciamento", "analise", "analises", "experiencia", "experiencias",
+                      "management", "analysis", "experience"))
+# Prefixos que não mudam a competência ("Conhecimento em Python", "Noções de SQL"), já normalizados
+_PREFIXOS = re.compile(
+    r"^(?:conhecimentos?|nocoes|habilidades?|dominio|proficiencia|knowledge|skills?) (?:em|de|of|in|with) "
+)
+
+
+def normalizar_rotulo(rotulo):
+    """Minúsculas, sem acentos, sem pontuação e com espaços simples"""
+    texto = unicodedata.normalize("NFKD", str(rotulo).casefold())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(_NAO_ALFANUMERICO.sub(" ", texto).split())
+
+
+def separar_nucleo(normalizado):
+    """(palavras de conteúdo, núcleos genéricos) de um rótulo normalizado"""
+    palavras = [p for p in normalizado.split() if p not in _LIGACAO]
+    conteudo = " ".join(p for p in palavras if p not in _NUCLEOS)
+    # Um rótulo só de palavras genéricas ("Análise") é comparado inteiro
+    return conteudo or " ".join(palavras), frozenset(p for p in palavras if p in _NUCLEOS)
+
+
+def trigramas(texto):
+    """Conjunto de trigramas de caracteres, com as bordas de cada palavra marcadas"""
+    texto = f"  {texto} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceTaxonomia:
+    """Índice invertido de trigramas sobre as variantes da taxonomia, com memorização por rótulo"""
+
+    def __init__(self, taxonomia=None, limiar=None, max_memoria=None):
+        self.limiar = config.TAXONOMIA_LIMIAR / 100 if limiar is None else limiar
+        self.max_memoria = config.TAXONOMIA_MAX_MEMORIA if max_memoria is None else max_memoria
+        self._lock = threading.Lock()
+        self._memoria = OrderedDict()  # rótulo original -> resultado
+        self.acertos = 0
+        self.falhas = 0
+
+        self._canonicas = []  # por variante: nome canônico
+        self._nomes = []  # por variante: texto normalizado
+        self._tamanhos = []  # por variante: quantidade de trigramas do conteúdo
+        self._nucleos = []  # por variante: núcleos genéricos
+        self._exatas = {}  # variante normalizada -> índice da variante
+        self._indice = {}  # trigrama -> [variantes]
+        for canonica, variantes in (TAXONOMIA if taxonomia is None else taxonomia).items():
+            for variante in (canonica, *variantes):
+                normalizada = normalizar_rotulo(variante)
+                if not normalizada or normalizada in self._exatas:
+                    continue
+                self._exatas[normalizada] = len(self._canonicas)
+                conteudo, nucleos = separar_nucleo(normalizada)
+                gramas = trigramas(conteudo)
+                for grama in gramas:
+                    self._indice.setdefault(grama, []).append(len(self._canonicas))
+                self._canonicas.append(canonica)
+                self._nomes.append(normalizada)
+                self._tamanhos.append(len(gramas))
+                self._nucleos.append(nucleos)
+
+    def _melhor(self, normalizado):
+        """(índice da variante mais parecida ou None, similaridade de Dice)"""
+        if normalizado in self._exatas:
+            return self._exatas[normalizado], 1.0
+        conteudo, nucleos = separar_nucleo(normalizado)
+        gramas = trigramas(conteudo)
+        comuns = {}
+        for grama in gramas:
+            for variante in self._indice.get(grama, ()):
+                comuns[variante] = comuns.get(variante, 0) + 1
+        melhor, similaridade = None, 0.0
+        for variante, n in comuns.items():
+            # "Análise de X" e "Gestão de X" são competências diferentes
+            if nucleos != self._nucleos[variante]:
+                continue
+            dice = 2 * n / (len(gramas) + self._tamanhos[variante])
+            if dice > similaridade:
+                melhor, similaridade = variante, dice
+        return melhor, similaridade
+
+    def _calcular(self, rotulo):
+        normalizado = normalizar_rotulo(rotulo)
+        # "Modelagem financeira (Excel)": o complemento entre parênteses só é usado se ajudar
+        sem_complemento = _PREFIXOS.sub("", normalizar_rotulo(_PARENTESES.sub(" ", str(rotulo))))
+        variante, similaridade = self._melhor(sem_complemento or normalizado)
+        if sem_complemento and sem_complemento != normalizado:
+            alternativa = self._melhor(normalizado)
+            if alternativa[1] > similaridade:
+                variante, similaridade = alternativa
+        if variante is None or similaridade < self.limiar:
+            return {"rotulo": rotulo, "canonica": None, "variante": None, "similaridade": round(similaridade, 4)}
+        return {"rotulo": rotulo, "canonica": self._canonicas[variante], "variante": self._nomes[variante],
+                "similaridade": round(similaridade, 4)}
+
+    def canonizar(self, rotulo):
+        """{"rotulo", "canonica" e "variante" (None abaixo do limiar), "similaridade" (0-1)} de um rótulo"""
+        with self._lock:
+            resultado = self._memoria.get(rotulo)
+            if resultado is not None:
+                self._memoria.move_to_end(rotulo)
+                self.acertos += 1
+                return resultado
+        resultado = self._calcular(rotulo)
+        with self._lock:
+            self.falhas += 1
+            self._memoria[rotulo] = resultado
+            while len(self._memoria) > self.max_memoria:
+                self._memoria.popitem(last=False)
+        return resultado
+
+    def area_canonica(self, rotulo):
+        """Nome canônico do rótulo, ou o próprio rótulo (sem espaços extras) se não for reconhecido"""
+        return self.canonizar(rotulo)["canonica"] or " ".join(str(rotulo).split())
+
+    def canonizar_competencias(self, competencias):
+        """Competências com a Área canônica, o rótulo original e a similaridade
+
+        Rótulos com o mesmo nome canônico ("Modelagem Financeira" e
+        "Financial Modeling") viram uma competência só, com a maior
+        pontuação; rótulos não reconhecidos só se juntam se normalizam para
+        o mesmo texto e ficam com o próprio rótulo como Área. "Rótulo
+        original" é o da competência que deu a pontuação.
+        """
+        grupos = {}  # nome canônico (ou rótulo normalizado) -> (competência, resultado, rótulo)
+        for competencia in competencias:
+            rotulo = " ".join(str(competencia["Área"]).split())
+            resultado = self.canonizar(competencia["Área"])
+            if resultado["canonica"]:
+                chave = ("canonica", resultado["canonica"])
+            else:
+                chave = ("rotulo", normalizar_rotulo(rotulo))
+            anterior = grupos.get(chave)
+            if anterior is None or competencia["Pontuação"] > anterior[0]["Pontuação"]:
+                grupos[chave] = (competencia, resultado, rotulo)
+
+        return [
+            {
+                **competencia,
+                "Área": resultado["canonica"] or rotulo,
+                "Rótulo original": rotulo,
+                "Similaridade": resultado["similaridade"] if resultado["canonica"] else None,
+            }
+            for competencia, resultado, rotulo in grupos.values()
+        ]
+
+    def estatisticas(self):
+        """Tamanho da taxonomia e uso da memória de rótulos"""
+        with self._lock:
+            return {"variantes": len(self._canonicas), "memorizados": len(self._memoria),
+                    "acertos": self.acertos, "falhas": self.falhas}
+
+
+_padrao = None
+_lock_padrao = threading.Lock()
+
+
+def indice_padrao():
+    """Índice da TAXONOMIA com a configuração do ambiente, criado uma vez por processo"""
+    global _padrao
+    with _lock_padrao:
+        if _padrao is None:
+            _padrao = IndiceTaxonomia()
+        return _padrao
+
+
+def canonizar_competencias(competencias):
+    """Competências com a Área canônica pelo índice padrão (sem efeito se INTERNREADY_TAXONOMIA=0)"""
+    if not config.TAXONOMIA_ATIVA:
+        return competencias
+    return indice_padrao().canonizar_competencias(competencias)
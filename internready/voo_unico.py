@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""Coalescência de análises idênticas em andamento (single-flight)
+
+Quando o mesmo currículo é enviado por várias sessões ao mesmo tempo, só a
+primeira (a líder) chama o modelo; as demais aguardam o Future da líder e
+recebem a mesma resposta. A chave é a mesma do cache de análises (hash do
+PDF + modelo, temperatura e versão do prompt).
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class LiderDesistiu(RuntimeError):
+    """A chamada líder terminou sem resposta; quem aguardava deve tentar por conta própria"""
+
+
+class Voo:
+    """Participação em uma análise: lider indica quem deve chamar o modelo"""
+
+    def __init__(self, registro, chave, futuro, lider):
+        self._registro = registro
+        self.chave = chave
+        self.futuro = futuro
+        self.lider = lider
+
+    def aguardar(self, timeout=None):
+        """Resposta da líder (somente para quem não é líder)"""
+        return self.futuro.result(timeout)
+
+    def concluir(self, resposta):
+        """A líder publica a resposta para quem está aguardando"""
+        self._registro._encerrar(self, resposta=resposta)
+
+    def abandonar(self, erro=None):
+        """A líder encerra sem resposta (idempotente após concluir)"""
+        self._registro._encerrar(self, erro=erro or LiderDesistiu("A análise em andamento foi interrompida"))
+
+
+class VooUnico:
+    """Registro de análises em andamento, compartilhado entre sessões e threads"""
+
+    def __init__(self):
+        self._em_andamento = {}  # chave -> Future
+        self._lock = threading.Lock()
+
+        self.lideres = 0
+        self.coalescidas = 0
+
+    def entrar(self, chave):
+        """Voo líder se ninguém está analisando a chave; senão um voo que aguarda o líder"""
+        with self._lock:
+            futuro = self._em_andamento.get(chave)
+            if futuro is not None:
+                return Voo(self, chave, futuro, lider=False)
+            futuro = Future()
+            self._em_andamento[chave] = futuro
+            self.lideres += 1
+            return Voo(self, chave, futuro, lider=True)
+
+    def participar(self, chave, ao_aguardar=None):
+        """(voo líder, None) para quem deve chamar o modelo, ou (None, resposta) de outra líder
+
+        Se a líder desistir sem resposta (LiderDesistiu), volta a entrar até
+        virar líder ou receber a resposta de uma nova líder; outras falhas da
+        líder chegam a quem aguardava. ao_aguardar() avisa cada espera.
+        """
+        while True:
+            voo = self.entrar(chave)
+            if voo.lider:
+                return voo, None
+            if ao_aguardar:
+                ao_aguardar()
+            try:
+                resposta = voo.aguardar()
+            except LiderDesistiu:
+                continue
+            # Contada uma vez por requisição, por mais líderes que tenha aguardado
+            with self._lock:
+                self.coalescidas += 1
+            return None, resposta
+
+    def _encerrar(self, voo, resposta=None, erro=None):
+        if not voo.lider:
+            return
+        with self._lock:
+            if self._em_andamento.get(voo.chave) is voo.futuro:
+                del self._em_andamento[voo.chave]
+            if voo.futuro.done():
+                return
+            if erro is None:
+                voo.futuro.set_result(resposta)
+            else:
+                voo.futuro.set_exception(erro)
+
+    def executar(self, chave, funcao):
+        """Executa funcao() uma única vez por chave entre chamadas simultâneas
+
+        Retorna (resposta, coalescida). Se a líder falhar, quem aguardava
+        recebe a mesma exceção.
+        """
+        voo, resposta = self.participar(chave)
+        if voo is None:
+            return resposta, True
+        try:
+            resposta = funcao()
+        except BaseException as e:
+            voo.abandonar(e if isinstance(e, Exception) else None)
+            raise
+        voo.concluir(resposta)
+        return resposta, False
+
+    def estatisticas(self):
+        """Análises líderes, requisições que receberam a resposta de uma líder e voos em andamento"""
+        with self._lock:
+            return {
+                "lideres": self.lideres,
+                "coalescidas": self.coalescidas,
+                "em_andamento": len(self._em_andamento),
+            }
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from internready.analise import montar_mensagens, prefixo_prompt, versao_prompt
+from internready.extracao import estimar_tokens
+from internready.taxonomia import TAXONOMIA
+
+# Mínimo de prefixo que o cache de prompt da OpenAI aproveita, com folga para a estimativa por caracteres
+MIN_TOKENS_PREFIXO = 1024 * 1.2
+
+
+@pytest.mark.parametrize("estruturado", [False, True])
+def test_prefixo_fixo_passa_do_minimo_do_cache_de_prompt(estruturado):
+    assert estimar_tokens(prefixo_prompt(estruturado)) >= MIN_TOKENS_PREFIXO
+
+
+@pytest.mark.parametrize("estruturado", [False, True])
+def test_prefixo_nao_depende_do_curriculo(estruturado):
+    um, outro = montar_mensagens("cv A", estruturado), montar_mensagens("cv B", estruturado)
+    assert um[0] == outro[0]
+    assert "cv A" not in um[0]["content"]
+
+
+def test_prefixo_lista_os_nomes_da_taxonomia():
+    for canonica in TAXONOMIA:
+        assert f"- {canonica}\n" in prefixo_prompt()
+
+
+def test_versoes_dos_modos_sao_diferentes():
+    assert versao_prompt(False) != versao_prompt(True)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from internready import config, lote, lote_offline, stub_openai
+from internready.analise import MODELO
+from internready.cache import CacheAnalises
+from internready.roteador import Roteador, carregar_backends, chave_cache, chaves_cascata, obter_do_cache
+
+TEXTO = "Estágio em valuation e modelagem financeira com Excel, Python e contabilidade IFRS. Inglês fluente."
+
+
+def test_lote_ingerido_e_encontrado_pela_chave_da_interface(tmp_path, monkeypatch):
+    monkeypatch.setattr(lote_offline, "_extrair", lambda dados: (TEXTO, None))
+    dados = b"%PDF-1.4 curriculo"
+    requisicoes = tmp_path / "requisicoes.jsonl"
+    saida = tmp_path / "saida.jsonl"
+    manifesto = lote_offline.gerar_requisicoes([("cv.pdf", dados)], str(requisicoes), max_workers=0)
+    stub_openai.processar_arquivo_lote(str(requisicoes), str(saida))
+
+    cache = CacheAnalises(caminho_db=str(tmp_path / "cache.db"))
+    resultados = list(lote_offline.ingerir(str(saida), manifesto, cache=cache))
+    assert [r["status"] for r in resultados] == [lote_offline.CONCLUIDO]
+
+    # A interface percorre a cascata e encontra a resposta na chave do modelo padrão
+    roteador = Roteador(carregar_backends('[{"nome": "interno", "modelo": "qwen", "base_url": "http://llm:8000/v1",'
+                                          ' "api_key_env": "LLM_KEY"}, {"modelo": "%s"}]' % MODELO))
+    chave, resposta = obter_do_cache(cache, chaves_cascata(dados, False, roteador))
+    assert resposta is not None
+    assert chave == chave_cache(dados, False, roteador.backends[1]) == chave_cache(dados, False)
+
+
+def test_chave_nomeia_o_backend_e_seus_parametros():
+    roteador = Roteador(carregar_backends(
+        f'[{{"modelo": "{MODELO}"}}, {{"nome": "longo", "modelo": "{MODELO}", "max_tokens": 4000}},'
+        ' {"nome": "frio", "modelo": "gpt-4o", "temperatura": 0}]'
+    ))
+    chaves = chaves_cascata(b"pdf", False, roteador)
+    assert chaves[0].split(":")[1] == MODELO
+    assert len(set(chaves)) == 3
+
+
+def test_escalar_e_opcional(monkeypatch):
+    monkeypatch.setattr(config, "ROTEADOR_BACKENDS", "")
+    assert [b["modelo"] for b in Roteador().backends] == [MODELO]
+
+
+def test_limites_de_extracao_mudam_a_chave(monkeypatch):
+    chave = chave_cache(b"pdf", False)
+    monkeypatch.setattr(config, "TEXTO_MAX_CARACTERES", config.TEXTO_MAX_CARACTERES + 1000)
+    assert chave_cache(b"pdf", False) != chave
+    monkeypatch.undo()
+    monkeypatch.setattr(config, "TEXTO_COMPRIMIR", int(not config.TEXTO_COMPRIMIR))
+    assert chave_cache(b"pdf", False) != chave
+
+
+@pytest.mark.parametrize("resposta, gravada", [
+    ('[{"Área": "Excel", "Pontuação": 80}]', False),
+    ('[{"Área": "Excel", "Pontuação": 80}, {"Área": "Python", "Pontuação": 70}, '
+     '{"Área": "Valuation", "Pontuação": 60}]', True),
+])
+def test_lote_com_cascata_grava_so_respostas_aceitas_na_chave_de_quem_respondeu(tmp_path, monkeypatch, resposta,
+                                                                                gravada):
+    roteador = Roteador(carregar_backends(f'[{{"modelo": "{MODELO}"}}, {{"modelo": "gpt-4o"}}]'), 3)
+
+    async def analisar_async(*args, **kwargs):
+        return resposta, {"uso": None, "backend": "gpt-4o", "modelo": "gpt-4o", "escalacoes": 1, "chamadas": []}
+
+    monkeypatch.setattr(roteador, "analisar_async", analisar_async)
+    monkeypatch.setattr(lote, "extrair_texto_com_relatorio", lambda dados: (TEXTO, None))
+    cache = CacheAnalises(caminho_db=str(tmp_path / "cache.db"))
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        resultados = asyncio.run(lote.analisar_lote([("cv.pdf", b"pdf")], cache=cache, executor=executor,
+                                                    roteador=roteador))
+    assert resultados[0]["status"] == lote.CONCLUIDO
+    chave_mini, chave_4o = chaves_cascata(b"pdf", False, roteador)
+    assert cache.obter(chave_mini) is None
+    assert (cache.obter(chave_4o) is not None) == gravada
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from internready.clientes import RegistroClientes
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("openai")
+
+
+def test_pool_compartilhado_nao_guarda_cookies_entre_chaves():
+    registro = RegistroClientes(timeout_segundos=30)
+    http = registro._cliente_http()
+    requisicao = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    http.cookies.extract_cookies(httpx.Response(200, headers={"set-cookie": "__cf_bm=conta-a; Path=/"},
+                                                request=requisicao))
+    assert len(http.cookies.jar) == 0
+    assert registro.obter("sk-a")._client is registro.obter("sk-b")._client is http
+    assert http.timeout.read == 30
+    registro.fechar()
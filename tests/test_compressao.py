@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from internready.compressao import comprimir, dividir_secoes, normalizar_linhas
+from internready.extracao import estimar_tokens
+
+
+def _linha(texto, tamanho=10.0, negrito=False):
+    return (texto, tamanho, negrito)
+
+
+def _curriculo():
+    return [[
+        _linha("Maria Silva", 16.0, True),
+        _linha("maria@email.com"),
+        _linha("RESUMO", 12.0, True),
+        *[_linha(f"Estudante motivada com interesse em finanças corporativas, frase {i}.") for i in range(8)],
+        _linha("EXPERIÊNCIA PROFISSIONAL", 12.0, True),
+        *[_linha(f"- Estágio no banco {i}: modelagem em Excel, valuation por DCF e relatórios.") for i in range(8)],
+        _linha("FORMAÇÃO ACADÊMICA", 12.0, True),
+        _linha("Bacharelado em Economia, USP (2022-2026)"),
+    ]]
+
+
+def test_sem_orcamento_mantem_todas_as_secoes_em_ordem():
+    texto, relatorio = comprimir(_curriculo())
+    assert relatorio["secoes"] == ["cabecalho", "resumo", "experiencia", "formacao"]
+    assert relatorio["secoes_cortadas"] == relatorio["secoes_omitidas"] == []
+    assert texto.index("RESUMO") < texto.index("EXPERIÊNCIA") < texto.index("FORMAÇÃO")
+
+
+@pytest.mark.parametrize("max_tokens", [60, 120, 200, 300])
+def test_orcamento_prioriza_experiencia_e_nunca_e_excedido(max_tokens):
+    texto, relatorio = comprimir(_curriculo(), max_tokens=max_tokens)
+    assert estimar_tokens(texto) <= max_tokens
+    assert relatorio["tokens_enviados"] == estimar_tokens(texto)
+    assert relatorio["tokens_economizados"] == relatorio["tokens_originais"] - relatorio["tokens_enviados"]
+    assert "experiencia" in relatorio["secoes"]
+    # O resumo é a seção de menor prioridade: só entra depois de experiência e formação inteiras
+    if "resumo" in relatorio["secoes"]:
+        assert "experiencia" not in relatorio["secoes_cortadas"]
+        assert "formacao" in relatorio["secoes"] and "formacao" not in relatorio["secoes_cortadas"]
+
+
+def test_orcamento_apertado_corta_a_secao_e_omite_as_demais():
+    texto, relatorio = comprimir(_curriculo(), max_tokens=60)
+    assert relatorio["secoes_cortadas"] == ["experiencia"]
+    assert set(relatorio["secoes_omitidas"]) == {"cabecalho", "resumo", "formacao"}
+    assert texto.startswith("EXPERIÊNCIA PROFISSIONAL\n- Estágio no banco 0")
+
+
+def test_paginas_nao_lidas_entram_nos_tokens_originais():
+    _, completo = comprimir(_curriculo())
+    _, relatorio = comprimir(_curriculo(), tokens_nao_lidos=500)
+    assert relatorio["tokens_originais"] == completo["tokens_originais"] + 500
+
+
+def test_normalizacao_junta_hifenizacao_e_remove_rodape_repetido():
+    paginas = [
+        [_linha("Analis-"), _linha("ta de dados"), _linha("Página de Maria Silva")],
+        [_linha("•  Python   e SQL"), _linha("Página de Maria Silva")],
+    ]
+    assert [t for t, _, _ in normalizar_linhas(paginas)] == [
+        "Analista de dados", "Página de Maria Silva", "- Python e SQL",
+    ]
+
+
+def test_titulo_por_prefixo_so_com_destaque():
+    linhas = [_linha("Texto do corpo " * 5), _linha("Experiência em bancos de investimento"),
+              _linha("Idiomas: inglês e espanhol", negrito=True), _linha("Inglês fluente")]
+    assert [s["chave"] for s in dividir_secoes(linhas)] == ["cabecalho", "idiomas"]
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from internready.historico import HistoricoAnalises
+
+
+@pytest.fixture
+def historico(tmp_path):
+    return HistoricoAnalises(caminho_db=str(tmp_path / "historico.db"))
+
+
+def _competencias(**pontuacoes):
+    return [{"Área": area, "Pontuação": p} for area, p in pontuacoes.items()]
+
+
+def test_analise_gravada_volta_completa(historico):
+    candidato_id = historico.gravar(
+        "hash-a", _competencias(Excel=80, Valuation=65),
+        qualitativa={"Pontos Fortes": ["Excel avançado", "Estágio em M&A"]},
+        arquivo="ana.pdf", modelo="gpt-4o-mini", versao_prompt="4.abc",
+    )
+    analise = historico.obter(candidato_id)
+    assert analise["competencias"] == _competencias(Excel=80.0, Valuation=65.0)
+    assert analise["qualitativa"] == {"Pontos Fortes": ["Excel avançado", "Estágio em M&A"]}
+    assert (analise["arquivo"], analise["modelo"], analise["versao_prompt"]) == ("ana.pdf", "gpt-4o-mini", "4.abc")
+    assert historico.obter(candidato_id + 1) is None
+
+
+def test_busca_por_competencia_filtra_e_ordena(historico):
+    historico.gravar_lote([
+        {"hash_documento": "a", "competencias": _competencias(Valuation=90), "criado_em": 100.0},
+        {"hash_documento": "b", "competencias": _competencias(Valuation=70, Excel=95), "criado_em": 200.0},
+        {"hash_documento": "c", "competencias": _competencias(Valuation=85), "criado_em": 300.0},
+    ])
+    assert [c["hash_documento"] for c in historico.buscar_por_competencia("Valuation", minimo=80)] == ["a", "c"]
+    assert [c["hash_documento"] for c in historico.buscar_por_competencia("Valuation", desde=150)] == ["c", "b"]
+    assert [c["pontuacao"] for c in historico.buscar_por_competencia("Valuation", maximo=85, limite=1)] == [85.0]
+
+
+def test_distribuicoes_para_os_percentis(historico):
+    historico.gravar("a", _competencias(Excel=60, SQL=80))
+    historico.gravar("a", _competencias(Excel=40))
+    assert historico.pontuacoes_por_area() == {"Excel": [40.0, 60.0], "SQL": [80.0]}
+    assert sorted(historico.medias_por_candidato()) == [40.0, 70.0]
+    assert len(historico.por_documento("a")) == 2
+    assert historico.estatisticas() == {"candidatos": 2, "competencias": 3}
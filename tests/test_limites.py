@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+from types import SimpleNamespace
+
+from internready.limites import AgendadorLimites, conta_do_cliente
+from internready.pipeline import analyze_stream
+from internready.roteador import Roteador, carregar_backends
+
+RESPOSTA = ('[{"Área": "Excel", "Pontuação": 80}, {"Área": "Python", "Pontuação": 70}, '
+            '{"Área": "Valuation", "Pontuação": 60}]')
+
+
+class Bruta:
+    """Resposta crua do SDK: cabeçalhos e parse() (corrotina nos clientes assíncronos)"""
+
+    def __init__(self, resposta, assincrona=False):
+        self.headers = {}
+        self._resposta = resposta
+        self._assincrona = assincrona
+
+    def parse(self):
+        if not self._assincrona:
+            return self._resposta
+
+        async def interpretar():
+            return self._resposta
+        return interpretar()
+
+
+class ErroTaxa(Exception):
+    status_code = 429
+    response = SimpleNamespace(headers={"retry-after": "0"})
+
+
+def _cliente(create):
+    completions = SimpleNamespace(create=create, with_raw_response=SimpleNamespace(create=create))
+    cliente = SimpleNamespace(chat=SimpleNamespace(completions=completions), api_key="sk-usuario")
+    cliente.with_options = lambda **opcoes: cliente
+    return cliente
+
+
+def _resposta_completa():
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=RESPOSTA))], usage=None)
+
+
+def test_espera_na_fila_fica_fora_do_ttft():
+    def create(**parametros):
+        trecho = SimpleNamespace(delta=SimpleNamespace(content=RESPOSTA))
+        return Bruta(iter([SimpleNamespace(usage=None, choices=[trecho])]))
+
+    cliente = _cliente(create)
+    agendador = AgendadorLimites()
+    agendador._pausar(0.1, conta_do_cliente(cliente))  # como depois de um 429 desta chave
+    resposta, tempos = analyze_stream("cv", client=cliente, agendador=agendador)
+    assert resposta == RESPOSTA
+    assert tempos["espera_s"] >= 0.09
+    assert tempos["ttft_s"] < 0.05
+    assert tempos["ttlt_s"] < 0.05
+
+
+def test_executar_async_repete_apos_429():
+    chamadas = []
+
+    async def create(**parametros):
+        chamadas.append(parametros)
+        if len(chamadas) == 1:
+            raise ErroTaxa()
+        return Bruta(_resposta_completa(), assincrona=True)
+
+    agendador = AgendadorLimites(backoff_base=0.01)
+    medicao = {}
+    response = asyncio.run(agendador.executar_async(lambda: create(), 100, medicao=medicao))
+    assert response.choices[0].message.content == RESPOSTA
+    assert (agendador.admitidas, agendador.repeticoes) == (2, 1)
+    assert medicao["espera_s"] > 0
+
+
+def test_cascata_assincrona_passa_pelo_agendador():
+    async def create(**parametros):
+        return Bruta(_resposta_completa(), assincrona=True)
+
+    agendador = AgendadorLimites()
+    roteador = Roteador(carregar_backends('[{"modelo": "gpt-4o"}]'), 3)
+    clientes = {("sk-usuario", None): _cliente(create)}
+    resposta, detalhes = asyncio.run(
+        roteador.analisar_async("cv", "sk-usuario", clientes=clientes, agendador=agendador)
+    )
+    assert resposta == RESPOSTA
+    assert detalhes["backend"] == "gpt-4o"
+    assert agendador.admitidas == 1
+
+
+def test_pausa_e_calibragem_de_uma_chave_nao_afetam_as_outras():
+    agendador = AgendadorLimites(rpm=100)
+    agendador._pausar(30, "chave-a")
+    agendador.calibrar({"x-ratelimit-limit-requests": "3", "x-ratelimit-remaining-requests": "0",
+                        "x-ratelimit-reset-requests": "20s"}, "chave-a")
+    inicio = time.perf_counter()
+    agendador.admitir(10, conta="chave-b")
+    assert time.perf_counter() - inicio < 0.05
+    assert agendador.estatisticas("chave-b")["rpm_limite"] == 100
+    assert agendador.estatisticas("chave-a")["rpm_limite"] == 3
+
+
+def test_admissao_assincrona_aguarda_no_loop_em_ordem(monkeypatch):
+    def sem_threads(*args, **kwargs):
+        raise AssertionError("a admissão assíncrona não deve ocupar threads")
+
+    monkeypatch.setattr(asyncio, "to_thread", sem_threads)
+    agendador = AgendadorLimites(rpm=6000)  # uma ficha a cada 10 ms depois de esvaziar o balde
+    ordem = []
+
+    async def chamada(i):
+        await agendador.admitir_async(1, conta="chave")
+        ordem.append(i)
+
+    async def principal():
+        await agendador.admitir_async(1, conta="chave")
+        agendador._contas["chave"].rpm.nivel = 0
+        await asyncio.gather(*(chamada(i) for i in range(20)))
+
+    asyncio.run(principal())
+    assert ordem == list(range(20))
+    assert agendador.estatisticas()["fila"] == 0
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from internready import lote
+from internready.cache import CacheAnalises
+
+RESPOSTA = ('[{"Área": "Excel", "Pontuação": 80}, {"Área": "Python", "Pontuação": 70}, '
+            '{"Área": "Valuation", "Pontuação": 60}]\n**Pontos Fortes:** - Modelagem')
+
+
+def test_diretorio_fora_da_raiz_e_recusado(tmp_path):
+    raiz = tmp_path / "curriculos"
+    (raiz / "turma").mkdir(parents=True)
+    (raiz / "turma" / "cv.pdf").write_bytes(b"%PDF turma")
+    (tmp_path / "segredo.pdf").write_bytes(b"%PDF segredo")
+
+    assert lote.coletar_pdfs(diretorio="turma", diretorio_raiz=str(raiz)) == [("cv.pdf", b"%PDF turma")]
+    for diretorio in ("..", str(tmp_path), "turma/../.."):
+        with pytest.raises(lote.DiretorioNaoPermitido):
+            lote.coletar_pdfs(diretorio=diretorio, diretorio_raiz=str(raiz))
+
+
+def test_link_para_fora_da_raiz_e_recusado(tmp_path):
+    raiz = tmp_path / "curriculos"
+    raiz.mkdir()
+    (tmp_path / "segredo.pdf").write_bytes(b"%PDF segredo")
+    os.symlink(tmp_path / "segredo.pdf", raiz / "cv.pdf")
+    with pytest.raises(lote.DiretorioNaoPermitido):
+        lote.coletar_pdfs(diretorio=".", diretorio_raiz=str(raiz))
+
+
+def _cliente_async(chamadas):
+    async def create(**parametros):
+        chamadas.append(parametros)
+        mensagem = SimpleNamespace(content=RESPOSTA)
+        return SimpleNamespace(choices=[SimpleNamespace(message=mensagem)], usage=None)
+
+    completions = SimpleNamespace(create=create)
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions), api_key="sk-usuario")
+
+
+def _analisar(itens, **kwargs):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        return asyncio.run(lote.analisar_lote(itens, executor=executor, **kwargs))
+
+
+def test_lote_analisa_cada_arquivo_e_reaproveita_o_cache(tmp_path, monkeypatch):
+    textos = {b"a": "Currículo A", b"b": "Currículo B", b"vazio": "  "}
+    monkeypatch.setattr(lote, "extrair_texto_com_relatorio", lambda dados: (textos[dados], None))
+    cache = CacheAnalises(caminho_db=str(tmp_path / "cache.db"))
+    chamadas = []
+    estados = []
+    itens = [("a.pdf", b"a"), ("b.pdf", b"b"), ("vazio.pdf", b"vazio")]
+
+    resultados = _analisar(itens, cache=cache, client=_cliente_async(chamadas),
+                           ao_atualizar=lambda r: estados.append((r["arquivo"], r["status"])))
+    assert [r["status"] for r in resultados] == [lote.CONCLUIDO, lote.CONCLUIDO, lote.ERRO]
+    assert [c["Área"] for c in resultados[0]["competencias"]] == ["Excel", "Python", "Valuation"]
+    assert resultados[0]["qualitativa"]
+    assert len(chamadas) == 2
+    assert [s for a, s in estados if a == "a.pdf"] == [lote.EXTRAINDO, lote.ANALISANDO, lote.CONCLUIDO]
+
+    # Segunda rodada: as respostas aceitas vêm do cache, sem chamar o modelo
+    resultados = _analisar(itens[:2], cache=cache, client=_cliente_async(chamadas))
+    assert [r["do_cache"] for r in resultados] == [True, True]
+    assert len(chamadas) == 2
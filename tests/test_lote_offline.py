@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+
+from internready import lote_offline
+from internready.lote import CONCLUIDO, ERRO
+
+RESPOSTA = ('[{"Área": "Excel", "Pontuação": 55}, {"Área": "Valuation", "Pontuação": 90}]\n'
+            '**Pontos Fortes:** - Modelagem')
+
+
+def _textos(monkeypatch, textos):
+    monkeypatch.setattr(lote_offline, "_extrair",
+                        lambda dados: (textos[dados], None) if dados in textos else (None, "PDF corrompido"))
+
+
+def _linha_ok(identificador, conteudo):
+    return {"custom_id": identificador, "response": {"status_code": 200, "body": {
+        "choices": [{"message": {"content": conteudo}}], "usage": None}}}
+
+
+def test_pdfs_iguais_viram_uma_requisicao_e_falhas_vao_ao_manifesto(tmp_path, monkeypatch):
+    _textos(monkeypatch, {b"pdf-a": "Currículo A", b"pdf-b": "   "})
+    caminho = tmp_path / "requisicoes.jsonl"
+    manifesto = lote_offline.gerar_requisicoes(
+        [("a.pdf", b"pdf-a"), ("copia.pdf", b"pdf-a"), ("b.pdf", b"pdf-b"), ("c.pdf", b"pdf-c")],
+        str(caminho), max_workers=0,
+    )
+    linhas = [json.loads(t) for t in caminho.read_text(encoding="utf-8").splitlines()]
+    assert len(linhas) == 1
+    assert [e["arquivos"] for e in manifesto["requisicoes"].values()] == [["a.pdf", "copia.pdf"]]
+    assert [e["arquivo"] for e in manifesto["erros"]] == ["b.pdf", "c.pdf"]
+    assert lote_offline.ler_manifesto(lote_offline.caminho_manifesto(str(caminho))) == manifesto
+    # Gerar de novo produz as mesmas linhas
+    outro = tmp_path / "de_novo.jsonl"
+    lote_offline.gerar_requisicoes([("a.pdf", b"pdf-a")], str(outro), max_workers=0)
+    assert outro.read_text(encoding="utf-8") == caminho.read_text(encoding="utf-8")
+
+
+def test_ingestao_reporta_erros_e_requisicoes_sem_resposta(tmp_path, monkeypatch):
+    _textos(monkeypatch, {b"a": "A", b"b": "B", b"c": "C"})
+    manifesto = lote_offline.gerar_requisicoes([("a.pdf", b"a"), ("b.pdf", b"b"), ("c.pdf", b"c")],
+                                               str(tmp_path / "req.jsonl"), max_workers=0)
+    id_a, id_b, _ = manifesto["requisicoes"]
+    saida = tmp_path / "saida.jsonl"
+    saida.write_text("\n".join(json.dumps(linha) for linha in [
+        _linha_ok(id_a, RESPOSTA),
+        _linha_ok(id_a, RESPOSTA),  # linha repetida é ignorada
+        {"custom_id": id_b, "response": {"status_code": 429, "body": {"error": {"message": "limite"}}}},
+    ]), encoding="utf-8")
+
+    resultados = {r["arquivo"]: r for r in lote_offline.ingerir(str(saida), manifesto)}
+    assert len(resultados) == 3
+    assert resultados["a.pdf"]["status"] == CONCLUIDO
+    assert resultados["a.pdf"]["qualitativa"]
+    assert (resultados["b.pdf"]["status"], resultados["b.pdf"]["erro"]) == (ERRO, "HTTP 429: limite")
+    assert (resultados["c.pdf"]["status"], resultados["c.pdf"]["erro"]) == (ERRO, "sem resposta no arquivo de saída")
+
+
+def test_csv_em_fluxo_com_niveis():
+    resultados = [
+        lote_offline._resultado("a.pdf", "h", competencias=[{"Área": "Excel", "Pontuação": 55},
+                                                            {"Área": "Valuation", "Pontuação": 90}]),
+        lote_offline._resultado("b.pdf", None, status=ERRO, erro="falhou"),
+    ]
+    arquivo = io.StringIO()
+    assert list(lote_offline.gravar_csv(iter(resultados), arquivo)) == resultados
+    linhas = arquivo.getvalue().splitlines()
+    assert linhas[0] == "Arquivo,Área,Pontuação,Nível"
+    assert [linha.split(",")[:3] for linha in linhas[1:]] == [["a.pdf", "Valuation", "90"], ["a.pdf", "Excel", "55"]]
+    assert [lote_offline.nivel(p) for p in (0, 100)] == [lote_offline.NIVEIS_LABELS[0], lote_offline.NIVEIS_LABELS[-1]]
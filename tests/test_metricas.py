@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+import subprocess
+import sys
+
+from internready.metricas import Rastreador, RegistroMetricas, ler_log
+
+
+def test_importar_o_pacote_nao_carrega_http_server():
+    codigo = "import sys, internready; print('http.server' in sys.modules)"
+    assert subprocess.check_output([sys.executable, "-c", codigo], text=True).strip() == "False"
+
+
+def test_log_rotaciona_ao_passar_do_limite(tmp_path):
+    caminho = tmp_path / "metricas.jsonl"
+    registro = RegistroMetricas(caminho_log=str(caminho), caminho_prom="", max_bytes_log=500)
+    for _ in range(20):
+        Rastreador(registro, modo="unico").finalizar()
+    assert caminho.stat().st_size < 1000
+    assert (tmp_path / "metricas.jsonl.1").exists()
+    assert not (tmp_path / "metricas.jsonl.2").exists()
+    assert 0 < len(list(ler_log(str(caminho)))) < 20
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from internready.parser_incremental import ParserIncremental, separar_resposta
+
+
+def _em_trechos(texto, tamanho=7):
+    parser = ParserIncremental()
+    for i in range(0, len(texto), tamanho):
+        parser.alimentar(texto[i:i + tamanho])
+    return parser.competencias() or None, parser.texto_qualitativo()
+
+
+@pytest.mark.parametrize("texto", [
+    '```json\n[{"Área": "Excel", "Pontuação": 80}, {"Área": "SQL", "Pontuação": 60}]\n```\n**Pontos Fortes:** x',
+    'Segue: [ {"Área": "a]b", "Pontuação": 50, "extra": [1, {"x": "}"}]} ]\nResto',
+    '[{"Área": "Excel", "Pontuação": 80},]\nvírgula sobrando',
+    '[{"Área": "Excel", "Pontuação": 80} {"Área": "SQL", "Pontuação": 60}]\nsem vírgula',
+    'sem array {"Área": "Excel", "Pontuação": 80} e {"Área": "SQL", "Pontuação": 60}',
+    '[]\nvazio {"Área": "Excel", "Pontuação": 80}',
+    '["texto ] solto", {"Área": "Excel", "Pontuação": 80}]\nfim',
+    '[{"Área": "Excel", "Pontuação": 80}, "C++ [avançado]", '
+    '{"Área": "Derivativos [opções]", "Pontuação": 70}]\nfim',
+    "nada aqui",
+])
+def test_resposta_inteira_igual_ao_streaming(texto):
+    assert separar_resposta(texto) == _em_trechos(texto)
+
+
+def test_colchete_em_string_solta_nao_fecha_o_array_no_streaming():
+    texto = ('[{"Área": "Excel", "Pontuação": 80}, "nota ] solta",\n'
+             ' {"Área": "Derivativos [opções]", "Pontuação": 70}]\n**Pontos Fortes:** x')
+    for tamanho in (1, 3, 7, len(texto)):
+        competencias, qualitativo = _em_trechos(texto, tamanho)
+        assert [c["Área"] for c in competencias] == ["Excel", "Derivativos [opções]"]
+        assert qualitativo == "**Pontos Fortes:** x"
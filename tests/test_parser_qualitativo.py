@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+from internready.parser_qualitativo import analisar_qualitativa, dividir_pontos, ler_secoes
+
+
+def test_secoes_com_dois_pontos():
+    texto = ("Análise do candidato.\n**Pontos Fortes:**\n- Excel avançado\n- Estágio em M&A\n"
+             "**Pontos de Melhoria:** - Inglês intermediário\n**Sugestões:** - Fazer CFA")
+    assert analisar_qualitativa(texto) == {
+        "pontos fortes": ["Excel avançado", "Estágio em M&A"],
+        "pontos de melhoria": ["Inglês intermediário"],
+        "sugestões": ["Fazer CFA"],
+    }
+
+
+def test_pontos_fortes_nao_terminam_em_recomendacoes():
+    texto = "**Pontos Fortes:** - Python\n**Recomendações:** - Estudar SQL\n**Sugestões:** - Networking"
+    secoes = ler_secoes(texto)
+    assert secoes["pontos fortes"] == "- Python\n**Recomendações:** - Estudar SQL"
+    assert secoes["recomendações"] == "- Estudar SQL\n**Sugestões:** - Networking"
+    assert secoes["sugestões"] == "- Networking"
+
+
+def test_formato_por_linhas_sem_dois_pontos():
+    texto = ("Resumo inicial sem seção\n### **Pontos Fortes**\n• Valuation por DCF\n\n"
+             "- **Pontos de Melhoria**\n- Pouca experiência\n### **Pontos Fortes**\n")
+    assert analisar_qualitativa(texto) == {
+        "pontos fortes": ["Valuation por DCF"],
+        "pontos de melhoria": ["Pouca experiência"],
+    }
+
+
+def test_pontos_no_meio_da_linha_e_continuacoes():
+    assert dividir_pontos("- Excel • Python - SQL\n  continuação do SQL\n-sem espaço") == [
+        "Excel", "Python", "SQL continuação do SQL",
+    ]
+    assert dividir_pontos("Texto corrido sem marcadores") == ["Texto corrido sem marcadores"]
+
+
+def test_sem_cabecalhos_nao_ha_secoes():
+    assert ler_secoes("") == {}
+    assert ler_secoes("texto **em negrito** sem seções") == {}
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from internready.historico import HistoricoAnalises  # noqa: E402
+from internready.percentis import MotorPercentis  # noqa: E402
+
+
+def _percentil_ingenuo(distribuicao, valor):
+    abaixo = sum(p < valor for p in distribuicao)
+    iguais = sum(p == valor for p in distribuicao)
+    return (abaixo + 0.5 * iguais) / len(distribuicao) * 100
+
+
+def test_percentis_iguais_a_contagem_direta():
+    distribuicoes = {"Excel": [40, 55, 55, 70, 90], "Valuation": [20, 30, 80]}
+    motor = MotorPercentis(min_amostras=1)
+    motor.carregar(distribuicoes)
+    consultas = [("Excel", 55), ("Valuation", 80), ("Excel", 100), ("Valuation", 0), (" excel ", 70)]
+    resultado = motor.percentis([a for a, _ in consultas], [p for _, p in consultas])
+    esperado = [_percentil_ingenuo(distribuicoes[a.strip().capitalize()], p) for a, p in consultas]
+    assert resultado.tolist() == pytest.approx(esperado)
+
+
+def test_poucas_amostras_ou_area_desconhecida_dao_nan():
+    motor = MotorPercentis(min_amostras=3)
+    motor.carregar({"Excel": [50, 60, 70], "SQL": [80]})
+    resultado = motor.percentis(["Excel", "SQL", "Python"], [60, 80, 50])
+    assert resultado[0] == pytest.approx(50.0)
+    assert np.isnan(resultado[1]) and np.isnan(resultado[2])
+
+
+def test_candidato_registrado_entra_na_consulta_seguinte(tmp_path):
+    historico = HistoricoAnalises(caminho_db=str(tmp_path / "historico.db"))
+    historico.gravar("a", [{"Área": "Excel", "Pontuação": 40}])
+    motor = MotorPercentis(min_amostras=1)
+    motor.carregar_historico(historico)
+    assert motor.percentis(["Excel"], [60])[0] == pytest.approx(100.0)
+
+    motor.registrar_candidato([{"Área": "Excel", "Pontuação": 80}])
+    assert motor.amostras("Excel") == 2
+    assert motor.percentis(["Excel"], [60])[0] == pytest.approx(50.0)
+    assert motor.percentil_media(60) == pytest.approx(50.0)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+from types import SimpleNamespace
+
+import pytest
+
+from internready.roteador import ErroConfiguracaoBackend, Roteador, carregar_backends
+
+RESPOSTA = ('[{"Área": "Excel", "Pontuação": 80}, {"Área": "Python", "Pontuação": 70}, '
+            '{"Área": "Valuation", "Pontuação": 60}]')
+
+
+class RegistroFalso:
+    """Registra as chaves entregues a cada servidor e responde sempre RESPOSTA"""
+
+    def __init__(self):
+        self.chaves = []
+
+    def obter(self, api_key, base_url=None):
+        self.chaves.append((base_url, api_key))
+
+        def create(**parametros):
+            trecho = SimpleNamespace(delta=SimpleNamespace(content=RESPOSTA))
+            return iter([SimpleNamespace(usage=None, choices=[trecho])])
+
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_backend_externo_exige_api_key_env():
+    with pytest.raises(ErroConfiguracaoBackend):
+        carregar_backends('[{"modelo": "interno", "base_url": "http://llm.interno:8000/v1"}]')
+
+
+def test_chave_do_usuario_nao_vai_para_backend_externo(monkeypatch):
+    monkeypatch.delenv("LLM_INTERNO_KEY", raising=False)
+    backends = carregar_backends(
+        '[{"nome": "interno", "modelo": "interno", "base_url": "http://llm.interno:8000/v1",'
+        ' "api_key_env": "LLM_INTERNO_KEY"}, {"modelo": "gpt-4o"}]'
+    )
+    registro = RegistroFalso()
+    resposta, tempos = Roteador(backends, 3, registro).analisar("cv", "sk-usuario")
+    assert tempos["backend"] == "gpt-4o"
+    assert registro.chaves == [(None, "sk-usuario")]
+
+
+def test_backend_externo_usa_a_propria_chave(monkeypatch):
+    monkeypatch.setenv("LLM_INTERNO_KEY", "chave-interna")
+    backends = carregar_backends(
+        '[{"nome": "interno", "modelo": "interno", "base_url": "http://llm.interno:8000/v1",'
+        ' "api_key_env": "LLM_INTERNO_KEY"}]'
+    )
+    registro = RegistroFalso()
+    Roteador(backends, 3, registro).analisar("cv", "sk-usuario")
+    assert registro.chaves == [("http://llm.interno:8000/v1", "chave-interna")]
+
+
+def test_host_da_openai_recebe_a_chave_do_usuario():
+    backends = carregar_backends('[{"modelo": "gpt-4o", "base_url": "https://api.openai.com/v1"}]')
+    registro = RegistroFalso()
+    Roteador(backends, 3, registro).analisar("cv", "sk-usuario")
+    assert registro.chaves == [("https://api.openai.com/v1", "sk-usuario")]
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from internready.sessao import ResultadosSessao, chave_resultado
+
+
+def test_guarda_as_ultimas_analises_usadas():
+    sessao = ResultadosSessao(max_itens=2)
+    sessao.guardar("a", {"arquivo": "a.pdf"})
+    sessao.guardar("b", {"arquivo": "b.pdf"})
+    assert sessao.obter("a") == {"arquivo": "a.pdf"}  # "a" volta a ser a mais recente
+    sessao.guardar("c", {"arquivo": "c.pdf"})
+    assert "b" not in sessao
+    assert ("a" in sessao, "c" in sessao, len(sessao)) == (True, True, 2)
+    assert sessao.obter("b") is None
+
+
+def test_guardar_de_novo_substitui_sem_duplicar():
+    sessao = ResultadosSessao(max_itens=2)
+    sessao.guardar("a", {"versao": 1})
+    sessao.guardar("a", {"versao": 2})
+    assert len(sessao) == 1
+    assert sessao.obter("a") == {"versao": 2}
+
+
+def test_limite_minimo_de_uma_analise():
+    sessao = ResultadosSessao(max_itens=0)
+    sessao.guardar("a", {})
+    sessao.guardar("b", {})
+    assert len(sessao) == 1 and "b" in sessao
+
+
+def test_modo_estruturado_tem_chave_propria():
+    assert chave_resultado("hash") != chave_resultado("hash", estruturado=True)
+    assert chave_resultado("hash").startswith("hash:")
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from internready import stub_openai
+from internready.analise import parametros_chamada
+
+
+def _cached(corpo):
+    return stub_openai.resposta_completa(corpo)["usage"]["prompt_tokens_details"]["cached_tokens"]
+
+
+def test_prefixo_curto_nao_entra_no_cache_mesmo_com_prompt_longo():
+    corpo = {"model": "gpt-4o-mini", "messages": [{"role": "system", "content": "instruções curtas"},
+                                                  {"role": "user", "content": "valuation e excel " * 2000}]}
+    assert stub_openai.resposta_completa(corpo)["usage"]["prompt_tokens"] >= 1024
+    assert _cached(corpo) == 0
+    assert _cached(corpo) == 0
+
+
+@pytest.mark.parametrize("estruturado", [False, True])
+def test_prompt_real_entra_no_cache_a_partir_da_segunda_chamada(estruturado):
+    primeiro = parametros_chamada("cv de uma pessoa", estruturado)
+    segundo = parametros_chamada("cv de outra pessoa, bem diferente", estruturado)
+    _cached(primeiro)
+    assert _cached(segundo) >= 1024
+
+
+def test_prefixo_longo_repetido_entra_no_cache_em_blocos():
+    sistema = "instruções fixas " * 400
+    corpo = {"model": "gpt-4o-mini", "messages": [{"role": "system", "content": sistema},
+                                                  {"role": "user", "content": "cv"}]}
+    assert _cached(corpo) == 0
+    cached = _cached(corpo)
+    assert cached >= 1024
+    assert cached % 128 == 0
+    assert cached <= len(sistema) // 4
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import threading
+
+from internready import tarefas
+from internready.tarefas import ErroTarefa, FilaTarefas
+
+
+def _esperar(fila, tarefa_id):
+    tarefa = fila.obter(tarefa_id)
+    for _ in range(200):
+        if tarefa.encerrada:
+            return tarefa.instantaneo()
+        threading.Event().wait(0.01)
+    raise AssertionError("a tarefa não terminou")
+
+
+def test_estado_passa_por_executando_ate_concluir():
+    fila = FilaTarefas(max_simultaneas=1)
+    liberar = threading.Event()
+    vistos = []
+
+    def analisar(tarefa):
+        vistos.append(tarefa.instantaneo()["estado"])
+        liberar.wait(1)
+        return {"ok": True}
+
+    tarefa_id = fila.submeter(analisar)
+    liberar.set()
+    estado = _esperar(fila, tarefa_id)
+    assert vistos == [tarefas.EXECUTANDO]
+    assert (estado["estado"], estado["resultado"], estado["progresso"]) == (tarefas.CONCLUIDA, {"ok": True}, 100)
+
+
+def test_erro_da_tarefa_fica_registrado():
+    fila = FilaTarefas(max_simultaneas=1)
+
+    def analisar(tarefa):
+        raise ErroTarefa("PDF ilegível", "Envie outro arquivo.")
+
+    estado = _esperar(fila, fila.submeter(analisar))
+    assert estado["estado"] == tarefas.FALHOU
+    assert estado["erro"]["mensagem"] == "PDF ilegível"
+    assert estado["resultado"] is None
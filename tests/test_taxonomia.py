@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from internready.taxonomia import IndiceTaxonomia
+
+
+@pytest.fixture(scope="module")
+def indice():
+    return IndiceTaxonomia(limiar=0.8)
+
+
+@pytest.mark.parametrize("rotulo", [
+    "Gestão de Tempo", "Gestão de Custos", "Análise de Risco", "Risco de Crédito", "Experiência em Vendas",
+    "Experiência Internacional", "Análise de Investimentos", "Análise de Mercado",
+])
+def test_rotulos_parecidos_nao_viram_outra_competencia(indice, rotulo):
+    assert indice.canonizar(rotulo)["canonica"] is None
+
+
+@pytest.mark.parametrize("rotulo, canonica", [
+    ("Financial Modelling", "Modelagem Financeira"),
+    ("Modelagem financeira (Excel)", "Modelagem Financeira"),
+    ("Modelagem Finaceira", "Modelagem Financeira"),
+    ("Conhecimento em Python", "Python"),
+    ("Risk Management", "Gestão de Riscos"),
+    ("Analise de dados", "Análise de Dados"),
+])
+def test_variantes_reconhecidas(indice, rotulo, canonica):
+    assert indice.canonizar(rotulo)["canonica"] == canonica
+
+
+def test_rotulos_parecidos_nao_sao_fundidos(indice):
+    rotulos = ["Gestão de Tempo", "Gestão de Custos", "Análise de Risco", "Risco de Crédito",
+               "Experiência em Vendas", "Experiência Internacional"]
+    competencias = [{"Área": r, "Pontuação": 50 + i} for i, r in enumerate(rotulos)]
+    resultado = indice.canonizar_competencias(competencias)
+    assert [c["Área"] for c in resultado] == rotulos
+    assert [c["Pontuação"] for c in resultado] == [c["Pontuação"] for c in competencias]
+
+
+def test_mesma_canonica_vira_uma_competencia_com_a_maior_pontuacao(indice):
+    resultado = indice.canonizar_competencias([
+        {"Área": "Modelagem Financeira", "Pontuação": 80}, {"Área": "Financial Modeling", "Pontuação": 70},
+        {"Área": "Excel", "Pontuação": 90}, {"Área": "VBA", "Pontuação": 60},
+    ])
+    assert [(c["Área"], c["Pontuação"], c["Rótulo original"]) for c in resultado] == [
+        ("Modelagem Financeira", 80, "Modelagem Financeira"), ("Excel", 90, "Excel"), ("VBA", 60, "VBA"),
+    ]
+
+
+def test_mesmo_nome_em_curriculos_diferentes(indice):
+    um = indice.canonizar_competencias([{"Área": "Financial Modeling", "Pontuação": 70}])
+    outro = indice.canonizar_competencias([{"Área": "Modelagem financeira (Excel)", "Pontuação": 65},
+                                           {"Área": "Projeções Financeiras", "Pontuação": 75}])
+    assert [c["Área"] for c in um] == [c["Área"] for c in outro] == ["Modelagem Financeira"]
+    assert outro[0]["Pontuação"] == 75
+
+
+@pytest.mark.parametrize("rotulo, canonica", [
+    ("VBA", "VBA"), ("Excel/VBA", "VBA"), ("Pandas", "Pandas"), ("Tableau", "Tableau"), ("Power BI", "Power BI"),
+    ("Espanhol", "Espanhol"), ("Fluxo de Caixa", "Fluxo de Caixa"), ("Valuation de Empresas", "Valuation"),
+    ("Gestão de Riscos Financeiros", "Gestão de Riscos"),
+])
+def test_competencias_distintas_tem_nome_proprio(indice, rotulo, canonica):
+    assert indice.canonizar(rotulo)["canonica"] == canonica
+
+
+def test_registro_guarda_rotulo_original_e_similaridade(indice):
+    excel, culinaria = indice.canonizar_competencias([
+        {"Área": "Microsoft Excel (avançado)", "Pontuação": 75}, {"Área": "Culinária", "Pontuação": 40},
+    ])
+    assert excel == {"Área": "Excel", "Pontuação": 75, "Rótulo original": "Microsoft Excel (avançado)",
+                     "Similaridade": 1.0}
+    assert culinaria["Área"] == "Culinária"
+    assert culinaria["Rótulo original"] == "Culinária"
+    assert culinaria["Similaridade"] is None
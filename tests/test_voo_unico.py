@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from internready.voo_unico import VooUnico
+
+
+def _aguardando(voo_unico, chave):
+    """Inicia participar() em outra thread e espera ela ficar aguardando a líder"""
+    aguardou = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=1)
+    futuro = pool.submit(voo_unico.participar, chave, aguardou.set)
+    assert aguardou.wait(1)
+    pool.shutdown(wait=False)
+    return futuro
+
+
+def test_quem_aguardava_assume_quando_a_lider_desiste():
+    voo_unico = VooUnico()
+    lider = voo_unico.entrar("cv")
+    seguidora = _aguardando(voo_unico, "cv")
+
+    lider.abandonar()
+    voo, resposta = seguidora.result(1)
+    assert voo is not None and voo.lider
+    assert resposta is None
+
+    # A nova líder atende quem chegar depois
+    outra = _aguardando(voo_unico, "cv")
+    voo.concluir("resposta")
+    assert outra.result(1) == (None, "resposta")
+
+
+def test_falha_da_lider_chega_a_quem_aguardava():
+    voo_unico = VooUnico()
+    lider = voo_unico.entrar("cv")
+    seguidora = _aguardando(voo_unico, "cv")
+    lider.abandonar(ValueError("erro da API"))
+    with pytest.raises(ValueError):
+        seguidora.result(1)
+
+
+def test_coalescida_conta_uma_vez_por_requisicao():
+    voo_unico = VooUnico()
+    lider = voo_unico.entrar("cv")
+    esperas = threading.Semaphore(0)
+    pool = ThreadPoolExecutor(max_workers=1)
+    seguidora = pool.submit(voo_unico.participar, "cv", esperas.release)
+    assert esperas.acquire(timeout=1)
+
+    # Uma nova líder assume antes de a seguidora voltar a entrar
+    with voo_unico._lock:
+        del voo_unico._em_andamento["cv"]
+    nova_lider = voo_unico.entrar("cv")
+    lider.abandonar()
+    assert esperas.acquire(timeout=1)  # a seguidora agora aguarda a nova líder
+    nova_lider.concluir("resposta")
+    assert seguidora.result(1) == (None, "resposta")
+    pool.shutdown()
+    assert voo_unico.estatisticas()["coalescidas"] == 1
+
+
+def test_lider_grava_o_cache_antes_de_liberar_quem_aguarda(monkeypatch):
+    from internready import pipeline
+
+    resposta = ('[{"Área": "Excel", "Pontuação": 80}, {"Área": "Python", "Pontuação": 70}, '
+                '{"Área": "Valuation", "Pontuação": 60}]')
+    voo_unico = VooUnico()
+    em_andamento_ao_gravar = []
+
+    class Cache:
+        def obter(self, chave):
+            return None
+
+        def gravar(self, chave, valor):
+            em_andamento_ao_gravar.append(voo_unico.estatisticas()["em_andamento"])
+
+    monkeypatch.setattr(pipeline, "extract_text", lambda pdf: "cv")
+    monkeypatch.setattr(pipeline, "analyze", lambda texto, **kwargs: resposta)
+    pipeline.analyze_pdf(b"%PDF", cache=Cache(), voo_unico=voo_unico)
+    assert em_andamento_ao_gravar == [1]